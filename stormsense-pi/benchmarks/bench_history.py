@@ -0,0 +1,105 @@
+"""Benchmark /api/history query paths over a full 7-day database.
+
+Usage (from stormsense-pi/):
+
+    python -m benchmarks.bench_history
+
+Builds a throwaway SQLite database holding 7 days of 5-second readings
+(120,960 rows), then times each HistoryStore query path, and the full
+read-plus-encode cost of a 5000-row response with and without a
+``fields=`` projection.  Only numbers from a run on the Pi itself say
+anything about the request latency budget there.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable
+
+from storm_sense.history_store import HistoryStore
+
+DAYS = 7
+INTERVAL_S = 5
+REPEATS = 5
+
+
+def _build_store(path: str) -> tuple[HistoryStore, float]:
+    """Fill a fresh store with DAYS of synthetic readings."""
+    store = HistoryStore(db_path=path, flush_max_rows=5000)
+    n = DAYS * 86400 // INTERVAL_S
+    start = time.time() - n * INTERVAL_S
+    for i in range(n):
+        temp = 21.0 + 3.0 * math.sin(i / 8640.0)
+        store.add_reading({
+            'timestamp': start + i * INTERVAL_S,
+            'temperature': temp,
+            'temperature_f': temp * 9.0 / 5.0 + 32.0,
+            'raw_temperature': temp + 6.0,
+            'pressure': 1013.0 + 8.0 * math.sin(i / 30000.0) + (i % 7) * 0.01,
+            'storm_level': 1,
+        })
+    store.flush()
+    return store, start
+
+
+def _time(fn: Callable[[], list]) -> tuple[float, int]:
+    """Median wall time in ms over REPEATS runs, plus len() of the result."""
+    samples = []
+    rows = 0
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        rows = len(fn())
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples), rows
+
+
+def main() -> None:
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    os.unlink(path)
+    try:
+        print(f'Building {DAYS}-day database...')
+        store, start = _build_store(path)
+        since = start - 1
+        cases: list[tuple[str, Callable[[], list]]] = [
+            ('bucketed (auto), limit=1000',
+             lambda: store.get_history(limit=1000, since=since)),
+            ('lttb, 12 h, limit=1000 (raw)',
+             lambda: store.get_history_lttb(
+                 limit=1000, since=start + (DAYS * 86400 - 43200),
+             )),
+            ('lttb, limit=1000',
+             lambda: store.get_history_lttb(limit=1000, since=since)),
+            ('lttb, limit=5000',
+             lambda: store.get_history_lttb(limit=5000, since=since)),
+        ]
+        print(f'{store.count()} rows')
+        print(f'{"query":<34} {"median ms":>10} {"rows":>6}')
+        for label, fn in cases:
+            ms, rows = _time(fn)
+            print(f'{label:<34} {ms:>10.1f} {rows:>6}')
+
+        # Query + JSON encoding of the newest 5000 rows, as /api/history does
+        print(f'{"5000 rows + json":<34} {"median ms":>10} {"bytes":>8}')
+        for label, fields in (
+            ('all fields', None),
+            ('fields=pressure', ('pressure',)),
+        ):
+            ms, size = _time(
+                lambda: json.dumps(store.get_latest(limit=5000, fields=fields)),
+            )
+            print(f'{label:<34} {ms:>10.1f} {size:>8}')
+        store.close()
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
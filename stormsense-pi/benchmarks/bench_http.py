@@ -0,0 +1,140 @@
+"""Load-test the API under the development server and the pooled server.
+
+Usage (from stormsense-pi/):
+
+    python -m benchmarks.bench_http [clients] [seconds]
+
+Serves one ApiServer (real SensorService on a throwaway database, rate
+limits off) first with werkzeug's threaded development server, as
+``ApiServer.run`` does, then with ``PooledWSGIServer`` as ``ApiServer.serve``
+does.  Each client thread polls ``/api/status`` and ``/api/history`` over
+its own keep-alive connection (reconnecting when the server closes it).
+Reports throughput, latency percentiles, failed requests and the peak
+number of threads in the process.
+"""
+
+from __future__ import annotations
+
+import http.client
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+from storm_sense.api_server import ApiServer
+from storm_sense.sensor_service import SensorService
+from storm_sense.wsgi_server import PooledWSGIServer
+
+CLIENTS = 50
+DURATION_S = 10.0
+READINGS = 720        # one hour at 5 s
+POOL_THREADS = 32
+PATHS = ('/api/status', '/api/history?limit=500', '/api/history?since=1')
+
+
+def _client(port: int, stop: threading.Event, latencies: list, errors: list) -> None:
+    conn = None
+    i = 0
+    while not stop.is_set():
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            conn.request('GET', path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors.append(resp.status)
+            else:
+                latencies.append(time.perf_counter() - t0)
+            if resp.will_close:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException) as exc:
+            errors.append(type(exc).__name__)
+            if conn is not None:
+                conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+
+
+def _run_load(server, clients: int, duration_s: float) -> dict:
+    serve = threading.Thread(target=server.serve_forever, daemon=True)
+    serve.start()
+    stop = threading.Event()
+    latencies: list[float] = []
+    errors: list = []
+    workers = [
+        threading.Thread(
+            target=_client, args=(server.server_port, stop, latencies, errors),
+        )
+        for _ in range(clients)
+    ]
+    baseline = threading.active_count()
+    peak = 0
+    for worker in workers:
+        worker.start()
+    deadline = time.monotonic() + duration_s
+    while time.monotonic() < deadline:
+        peak = max(peak, threading.active_count() - baseline - clients)
+        time.sleep(0.05)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    server.shutdown()
+    server.server_close()
+    latencies.sort()
+    return {
+        'rps': len(latencies) / duration_s,
+        'p50': statistics.median(latencies) * 1000.0 if latencies else 0.0,
+        'p99': latencies[int(len(latencies) * 0.99)] * 1000.0 if latencies else 0.0,
+        'errors': len(errors),
+        'threads': peak,
+    }
+
+
+def main() -> None:
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else CLIENTS
+    duration_s = float(sys.argv[2]) if len(sys.argv) > 2 else DURATION_S
+    # Per-request access logs would dominate the timings
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    os.unlink(path)
+    sensor = SensorService(db_path=path)
+    try:
+        for _ in range(READINGS):
+            sensor.read()
+        api = ApiServer(sensor)
+        api._limiter.enabled = False
+        app = api.get_app()
+        servers = [
+            ('flask dev (threaded)',
+             lambda: make_server('127.0.0.1', 0, app, threaded=True)),
+            (f'pooled ({POOL_THREADS} threads)',
+             lambda: PooledWSGIServer('127.0.0.1', 0, app, threads=POOL_THREADS)),
+        ]
+        print(f'{clients} keep-alive clients, {duration_s:.0f} s per server')
+        print(f'{"server":<24} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8} '
+              f'{"errors":>7} {"threads":>8}')
+        for label, make in servers:
+            r = _run_load(make(), clients, duration_s)
+            print(f'{label:<24} {r["rps"]:>8.0f} {r["p50"]:>8.1f} {r["p99"]:>8.1f} '
+                  f'{r["errors"]:>7} {r["threads"]:>8}')
+    finally:
+        sensor.close()
+        for suffix in ('', '-wal', '-shm', '.snapshot'):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
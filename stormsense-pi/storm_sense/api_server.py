@@ -2,17 +2,104 @@
 
 from __future__ import annotations
 
-from flask import Flask, jsonify, request
+import hashlib
+import math
+import os
+from functools import partial
+from time import perf_counter
+from typing import Callable, Iterator
+
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_compress import Compress
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
-from storm_sense.config import API_HOST, API_PORT
+from storm_sense.config import (
+    API_BACKLOG,
+    API_HOST,
+    API_KEEPALIVE_S,
+    API_PORT,
+    API_THREADS,
+    StormLevel,
+)
+from storm_sense.event_stream import EventBroadcaster, format_event
+from storm_sense.frame import RowFrame
+from storm_sense.history_store import LTTB_FIELDS, CursorExpired, history_columns
+from storm_sense.metrics import (
+    CONTENT_TYPE as _METRICS_CONTENT_TYPE,
+    REGISTRY,
+    SIZE_BUCKETS,
+    counter,
+    gauge,
+    histogram,
+    total,
+)
+from storm_sense.payload import CODINGS, EncodedPayload
+from storm_sense.response_cache import APPEND, DROP, KEEP, ResponseCache
 from storm_sense.sensor_service import SensorService
+from storm_sense.wsgi_server import PooledWSGIServer
 
 # Default history limit — balances payload size vs. client needs.
 _DEFAULT_HISTORY_LIMIT = 1000
+# Widest bucket accepted by /api/history?bucket= (one week).
+_MAX_BUCKET_S = 7 * 24 * 3600
+# Mixed into every ETag so validators never collide across restarts.
+_BOOT_ID = os.urandom(8).hex()
+# /api/stream: concurrent subscribers, comment-line keepalive interval and
+# the reconnect delay suggested to clients.
+_STREAM_MAX_CLIENTS = 32
+_STREAM_KEEPALIVE_S = 15.0
+_STREAM_RETRY_MS = 5000
+# /api/history wire formats, chosen by ?format= or the Accept header.
+_JSON_MIMETYPE = 'application/json'
+_COLUMNS_MIMETYPE = 'application/vnd.stormsense.columns+json'
+_BINARY_MIMETYPE = 'application/vnd.stormsense.columns'
+_HISTORY_FORMATS = {
+    'json': _JSON_MIMETYPE,
+    'columns': _COLUMNS_MIMETYPE,
+    'binary': _BINARY_MIMETYPE,
+}
+
+# ── Metrics ─────────────────────────────────────────────────────
+
+_REQUEST_SECONDS = histogram(
+    'stormsense_http_request_duration_seconds',
+    'Time from request start until the response is ready, per route.',
+    ('route',),
+)
+_RESPONSE_BYTES = histogram(
+    'stormsense_http_response_size_bytes',
+    'Response body size on the wire (after compression), per route.',
+    ('route',),
+    buckets=SIZE_BUCKETS,
+)
+_REQUESTS = counter(
+    'stormsense_http_requests_total',
+    'Requests served, per route and status code.',
+    ('route', 'status'),
+)
+_BUFFER_ITEMS = gauge(
+    'stormsense_buffer_items',
+    'Items held in each in-memory buffer.',
+    ('buffer',),
+)
+_HISTORY_CACHE_BYTES = gauge(
+    'stormsense_history_cache_bytes',
+    'Memory used by cached /api/history responses.',
+)
+_HISTORY_CACHE_EVENTS = total(
+    'stormsense_history_cache_events_total',
+    '/api/history response cache lookups and maintenance, per event.',
+    ('event',),
+)
+_STREAM_SUBSCRIBERS = gauge(
+    'stormsense_stream_subscribers',
+    'Open /api/stream connections.',
+)
+_CACHE_EVENTS = (
+    'hits', 'misses', 'evictions', 'appended', 'invalidated', 'compressions',
+)
 
 
 class ApiServer:
@@ -21,6 +108,17 @@ class ApiServer:
     def __init__(self, sensor_service: SensorService) -> None:
         self._sensor_service = sensor_service
         self._app = Flask(__name__)
+        # Registered before the extensions: the start hook runs first and
+        # the finish hook (after_request runs in reverse) runs last, so it
+        # sees the compressed size and covers rate-limited requests too.
+        self._app.before_request(_start_timer)
+        self._app.after_request(_record_request)
+        # Never buffer the event stream for compression
+        self._app.config['COMPRESS_STREAMS'] = False
+        # Everything the API serves; the event stream is never compressed
+        self._app.config['COMPRESS_MIMETYPES'] = [
+            _JSON_MIMETYPE, _COLUMNS_MIMETYPE, _BINARY_MIMETYPE,
+        ]
         CORS(self._app)
         Compress(self._app)
         self._limiter = Limiter(
@@ -28,6 +126,14 @@ class ApiServer:
             key_func=get_remote_address,
             default_limits=["60 per minute"],
         )
+        self._events = EventBroadcaster()
+        self._history_cache = ResponseCache()
+        self._server: PooledWSGIServer | None = None
+        # Each open stream holds a worker thread; serve() caps streams at
+        # half the pool so polling clients are never starved.
+        self._stream_worker_cap: float = math.inf
+        sensor_service.add_listener(self._publish_reading)
+        sensor_service.add_listener(self._update_history_cache)
         self._register_routes()
 
     # ── Public API ──────────────────────────────────────────────
@@ -36,10 +142,80 @@ class ApiServer:
         """Start the Flask development server."""
         self._app.run(host=host, port=port, threaded=True)
 
+    def serve(
+        self,
+        host: str = API_HOST,
+        port: int = API_PORT,
+        threads: int = API_THREADS,
+        backlog: int = API_BACKLOG,
+        keepalive_s: float = API_KEEPALIVE_S,
+    ) -> None:
+        """Serve on a bounded worker pool until :meth:`stop` is called.
+
+        See :class:`~storm_sense.wsgi_server.PooledWSGIServer` for what
+        *threads*, *backlog* and *keepalive_s* control.
+        """
+        self._server = PooledWSGIServer(
+            host, port, self._app,
+            threads=threads, backlog=backlog, keepalive_s=keepalive_s,
+        )
+        self._stream_worker_cap = max(1, self._server.threads // 2)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        """End open streams and make :meth:`serve` return.
+
+        Must not be called from the thread running :meth:`serve` (e.g. a
+        signal handler); it blocks until the serve loop has exited.
+        """
+        self._events.close()
+        if self._server is not None:
+            self._server.shutdown()
+
     def get_app(self) -> Flask:
         """Return the Flask application instance (useful for testing)."""
         return self._app
 
+    @property
+    def events(self) -> EventBroadcaster:
+        """The /api/stream fan-out, for servers that stream natively."""
+        return self._events
+
+    @property
+    def stream_keepalive_s(self) -> float:
+        """Idle time after which a stream sends a keepalive comment."""
+        return _STREAM_KEEPALIVE_S
+
+    def stream_start(self, last_event_id: str | None) -> tuple[int, float, list[bytes]]:
+        """Opening frames of one /api/stream subscription.
+
+        Returns ``(cursor, replayed, frames)``: the broadcaster cursor to
+        follow from, the key of the last replayed reading (frames at or
+        before it were already sent) and the ``retry`` line plus replay.
+        May query SQLite.
+        """
+        # Take the cursor before replaying so nothing published in between
+        # is lost; frames the replay already covered are dropped later.
+        cursor = self._events.cursor
+        frames = [f'retry: {_STREAM_RETRY_MS}\n\n'.encode()]
+        replayed = -math.inf
+        for key, frame in self._replay(last_event_id):
+            replayed = key
+            frames.append(frame)
+        return cursor, replayed, frames
+
+    @property
+    def history_cache_stats(self) -> dict:
+        """Hit rate and memory use of the /api/history response cache."""
+        return self._history_cache.stats()
+
+    def close(self) -> None:
+        """End all open event streams."""
+        self._events.close()
+
     # ── Route Registration ──────────────────────────────────────
 
     def _register_routes(self) -> None:
@@ -48,22 +224,413 @@ class ApiServer:
         @self._app.route('/api/status')
         @self._limiter.limit("30 per minute")
         def api_status():
-            return jsonify(self._sensor_service.get_status())
+            payload = self._sensor_service.status_payload
+            etag = self._etag('status', version=payload.version)
+            not_modified = self._not_modified(etag)
+            if not_modified is not None:
+                return not_modified
+            return self._encoded_response(payload, etag)
 
         @self._app.route('/api/history')
         @self._limiter.limit("30 per minute")
         def api_history():
-            since = request.args.get('since', 0, type=float)
+            since = _history_since()
             limit = request.args.get('limit', _DEFAULT_HISTORY_LIMIT, type=int)
             limit = max(1, min(limit, 5000))
-            return jsonify(self._sensor_service.get_history(
-                since=since, limit=limit,
-            ))
+            fmt = _history_format()
+            if fmt is None:
+                return jsonify({'error': f"unknown format: {request.args['format']}"}), 400
+            try:
+                fields = _history_fields()
+            except ValueError as exc:
+                return jsonify({'error': str(exc)}), 400
+            sensor = self._sensor_service
+            after_id = request.args.get('after_id', type=int)
+            if after_id is not None:
+                # Paged sync is always the JSON envelope
+                try:
+                    return self._cached_history(
+                        ('after_id', after_id, limit, fields),
+                        partial(
+                            sensor.get_history_after_id,
+                            after_id=after_id, limit=limit, fields=fields,
+                        ),
+                    )
+                except CursorExpired as exc:
+                    # The missed readings are archived; resync them by time
+                    return jsonify({
+                        'error': str(exc),
+                        'resume_after_id': exc.resume_after_id,
+                    }), 410
+            frame_args: dict = {}
+            bucket = request.args.get('bucket', 0, type=int)
+            if request.args.get('mode') == 'lttb':
+                field = request.args.get('lttb_field', 'pressure')
+                if field not in LTTB_FIELDS:
+                    return jsonify({'error': f'unknown lttb_field: {field}'}), 400
+                key: tuple = ('lttb', since, limit, fields, field)
+                frame_args['lttb_field'] = field
+                produce = partial(
+                    sensor.get_history_lttb,
+                    since=since, limit=limit, field=field, fields=fields,
+                )
+            elif bucket > 0:
+                bucket = min(bucket, _MAX_BUCKET_S)
+                key = ('bucket', since, limit, fields, bucket)
+                frame_args['bucket_s'] = bucket
+                produce = partial(
+                    sensor.get_history_buckets,
+                    bucket_s=bucket, since=since, limit=limit, fields=fields,
+                )
+            else:
+                key = ('history', since, limit, fields)
+                produce = partial(
+                    sensor.get_history, since=since, limit=limit, fields=fields,
+                )
+            if fmt == 'json':
+                return self._cached_history(key, produce)
+            return self._cached_history(
+                (f'{key[0]}.{fmt}', *key[1:]),
+                partial(
+                    sensor.get_history_frame,
+                    since=since, limit=limit, fields=fields, **frame_args,
+                ),
+                mimetype=_HISTORY_FORMATS[fmt],
+                encode=self._encode_columns if fmt == 'columns' else RowFrame.pack,
+            )
+
+        @self._app.route('/api/stream')
+        @self._limiter.limit("10 per minute")
+        def api_stream():
+            last_event_id = request.headers.get('Last-Event-ID')
+            limit = min(_STREAM_MAX_CLIENTS, self._stream_worker_cap)
+            if not self._events.try_subscribe(limit):
+                return jsonify({'error': 'too many stream subscribers'}), 503
+            response = Response(
+                stream_with_context(self._stream(last_event_id)),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+            )
+            # Runs when the server closes the stream, even if never iterated
+            response.call_on_close(self._events.unsubscribe)
+            return response
+
+        @self._app.route('/api/metrics')
+        @self._limiter.limit("30 per minute")
+        def api_metrics():
+            self._refresh_gauges()
+            return Response(REGISTRY.render(), content_type=_METRICS_CONTENT_TYPE)
 
         @self._app.route('/api/health')
         @self._limiter.limit("10 per minute")
         def api_health():
             return jsonify({
                 'status': 'ok',
-                'uptime_samples': len(self._sensor_service._pressure_history),
+                'uptime_samples': self._sensor_service.state.samples_collected,
             })
+
+    # ── Metrics ─────────────────────────────────────────────────
+
+    def _refresh_gauges(self) -> None:
+        """Copy buffer sizes and cache counters into the registry."""
+        for name, size in self._sensor_service.buffer_sizes.items():
+            _BUFFER_ITEMS.set(size, name)
+        stats = self._history_cache.stats()
+        _BUFFER_ITEMS.set(stats['entries'], 'history_cache')
+        _HISTORY_CACHE_BYTES.set(stats['bytes'])
+        for event in _CACHE_EVENTS:
+            _HISTORY_CACHE_EVENTS.set(stats[event], event)
+        _STREAM_SUBSCRIBERS.set(self._events.subscriber_count)
+
+    # ── Conditional GET ─────────────────────────────────────────
+
+    def _etag(self, *key, version: int | None = None) -> str:
+        """Strong validator for the data version (default: current) plus *key*.
+
+        *key* holds the endpoint name and its normalised query parameters,
+        so every distinct response shape gets its own tag.
+        """
+        if version is None:
+            version = self._sensor_service.data_version
+        token = '|'.join(str(part) for part in (_BOOT_ID, version, *key))
+        return hashlib.sha1(token.encode()).hexdigest()[:24]
+
+    def _not_modified(self, etag: str) -> Response | None:
+        """A 304 response if the client's cached copy is current, else None.
+
+        Checked before any data is read or encoded.  If-None-Match wins over
+        If-Modified-Since, as RFC 9110 requires.  Compression appends
+        ``:<encoding>`` to strong tags, so that suffix is ignored.
+        If-Modified-Since only has whole seconds, so it is compared with the
+        exact ``last_modified``: a change later in the same second is never
+        mistaken for the copy the client holds.
+        """
+        last_modified = self._sensor_service.last_modified
+        if request.if_none_match:
+            if request.if_none_match.star_tag:
+                matched = etag
+            else:
+                matched = next(
+                    (tag for tag in request.if_none_match.as_set()
+                     if tag.split(':', 1)[0] == etag),
+                    None,
+                )
+            if matched is None:
+                return None
+        elif request.if_modified_since is not None and last_modified:
+            if last_modified > request.if_modified_since.timestamp():
+                return None
+            matched = etag
+        else:
+            return None
+        response = Response(status=304)
+        response.set_etag(matched)
+        response.last_modified = int(last_modified) or None
+        return response
+
+    def _conditional_json(self, etag: str, produce: Callable[[], object]) -> Response:
+        """304 if the client is current, else ``produce()`` as validated JSON."""
+        not_modified = self._not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+        return self._with_validators(jsonify(produce()), etag)
+
+    def _with_validators(self, response: Response, etag: str) -> Response:
+        """Attach the validators a later poll will send back."""
+        response.set_etag(etag)
+        last_modified = self._sensor_service.last_modified
+        if last_modified:
+            response.last_modified = int(last_modified)
+        # Polled data: caches may keep it but must revalidate every time
+        response.cache_control.no_cache = True
+        return response
+
+    def _encoded_response(self, payload: EncodedPayload, etag: str) -> Response:
+        """Serve *payload* in the client's preferred pre-built encoding."""
+        coding, body = payload.select(request.accept_encodings)
+        response = self._with_validators(
+            Response(body, mimetype='application/json'), etag,
+        )
+        if coding is not None:
+            _set_content_encoding(response, coding, etag)
+        return response
+
+    # ── History cache ───────────────────────────────────────────
+
+    def _cached_history(
+        self,
+        key: tuple,
+        produce: Callable[[], object],
+        mimetype: str = _JSON_MIMETYPE,
+        encode: Callable[[object], bytes] | None = None,
+    ):
+        """Conditional GET for history, served from the response cache.
+
+        *key* is the endpoint name plus normalised query parameters.  On a
+        miss, ``produce()`` runs and ``encode()`` (JSON by default) turns its
+        result into the cached body; None from ``produce()`` means the
+        history database is unavailable.
+        """
+        # Display-only changes leave history responses valid
+        version = self._sensor_service.history_version
+        etag = self._etag(*key, version=version)
+        not_modified = self._not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+        cache = self._history_cache
+        body = cache.get(key, version)
+        if body is None:
+            data = produce()
+            if data is None:
+                return jsonify({'error': 'history database unavailable'}), 503
+            if encode is None:
+                body = self._app.json.dumps(data).encode()
+            else:
+                body = encode(data)
+            cache.put(key, body, version, **_append_policy(key, data))
+        response = Response(body, mimetype=mimetype)
+        # The body depends on the negotiated format
+        response.vary.add('Accept')
+        self._with_validators(response, etag)
+        if len(body) < self._app.config['COMPRESS_MIN_SIZE']:
+            return response
+        # Compressed once per cached body; Flask-Compress only sees misses
+        for coding in CODINGS:
+            if request.accept_encodings[coding]:
+                encoded = cache.get_encoded(key, version, coding)
+                if encoded is not None:
+                    response.set_data(encoded)
+                    _set_content_encoding(response, coding, etag)
+                    break
+        return response
+
+    def _encode_columns(self, frame: RowFrame) -> bytes:
+        """Columnar JSON: one array per column instead of one object per row."""
+        return self._app.json.dumps(frame.to_columns()).encode()
+
+    def _update_history_cache(self, reading: dict, previous_level: StormLevel) -> None:
+        """Sensor-thread listener: extend or invalidate cached responses."""
+        self._history_cache.on_append(
+            reading,
+            self._app.json.dumps(reading).encode(),
+            self._sensor_service.history_version,
+        )
+
+    # ── Event stream ────────────────────────────────────────────
+
+    def _publish_reading(self, reading: dict, previous_level: StormLevel) -> None:
+        """Sensor-thread listener: encode the reading once, wake subscribers."""
+        self._events.publish(_reading_frames(reading, previous_level))
+
+    def _stream(self, last_event_id: str | None) -> Iterator[bytes]:
+        """Yield SSE frames for one subscriber until the server closes.
+
+        A reconnect with ``Last-Event-ID`` first replays every reading the
+        client missed from the in-memory session log; a fresh connection
+        starts with the latest reading.
+        """
+        cursor, replayed, frames = self.stream_start(last_event_id)
+        yield from frames
+        while not self._events.closed:
+            frames, cursor = self._events.wait(cursor, _STREAM_KEEPALIVE_S)
+            if not frames:
+                yield b': keepalive\n\n'
+                continue
+            for key, frame in frames:
+                if key > replayed:
+                    yield frame
+
+    def _replay(self, last_event_id: str | None) -> list[tuple[float, bytes]]:
+        """Frames for readings after *last_event_id* (or the latest one)."""
+        service = self._sensor_service
+        try:
+            since = float(last_event_id) if last_event_id else None
+        except ValueError:
+            since = None
+        if since is None:
+            rows = service.get_history(limit=1)
+            return [(row['timestamp'], _reading_frame(row)) for row in rows]
+        # Include the reading the client last saw, for its storm level
+        rows = service.get_session_log(since, inclusive=True)
+        frames: list[tuple[float, bytes]] = []
+        previous = None
+        for row in rows:
+            if row['timestamp'] > since:
+                level = StormLevel(row['storm_level'])
+                frames.extend(_reading_frames(
+                    row, level if previous is None else previous,
+                ))
+            previous = StormLevel(row['storm_level'])
+        return frames
+
+
+def _start_timer() -> None:
+    g.request_started = perf_counter()
+
+
+def _record_request(response: Response) -> Response:
+    """Observe latency and wire size for the matched route."""
+    started = g.get('request_started')
+    rule = request.url_rule
+    route = rule.rule if rule is not None else 'unmatched'
+    if started is not None:
+        _REQUEST_SECONDS.observe(perf_counter() - started, route)
+    size = response.content_length
+    if size is not None:
+        _RESPONSE_BYTES.observe(size, route)
+    _REQUESTS.inc(route, str(response.status_code))
+    return response
+
+
+def _set_content_encoding(response: Response, coding: str, etag: str) -> None:
+    """Mark *response*'s body as already encoded with *coding*.
+
+    Flask-Compress leaves responses with a Content-Encoding alone.  The
+    ETag gets the ``:<coding>`` suffix Flask-Compress would have added.
+    """
+    response.headers['Content-Encoding'] = coding
+    response.set_etag(f'{etag}:{coding}')
+
+
+def _history_format() -> str | None:
+    """The /api/history wire format for the current request.
+
+    An explicit ``?format=`` wins over the ``Accept`` header; JSON is the
+    default.  Returns None for an unknown ``format`` value.
+    """
+    fmt = request.args.get('format')
+    if fmt is not None:
+        return fmt if fmt in _HISTORY_FORMATS else None
+    mimetype = request.accept_mimetypes.best_match(
+        list(_HISTORY_FORMATS.values()), default=_JSON_MIMETYPE,
+    )
+    return next(name for name, mt in _HISTORY_FORMATS.items() if mt == mimetype)
+
+
+def _history_since() -> float:
+    """The ``?since=`` lower bound, normalised for the cache key.
+
+    Negative, NaN and unparsable values all mean the whole history and
+    become ``0.0``, so they share one cached response with the default.
+    """
+    since = request.args.get('since', 0.0, type=float)
+    return since if since > 0 else 0.0
+
+
+def _history_fields() -> tuple[str, ...] | None:
+    """The ``?fields=`` projection as canonical columns, None for all.
+
+    Raises:
+        ValueError: For an unknown field name.
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    columns = history_columns(name.strip() for name in raw.split(',') if name.strip())
+    return None if columns == history_columns(None) else columns
+
+
+def _append_policy(key: tuple, data) -> dict:
+    """How a cached response for *key* reacts to a newly appended reading.
+
+    A raw ``since=`` window under its limit grows by that reading; a full
+    ``after_id`` page that already has a successor is unaffected.  Any
+    other response is rebuilt.
+    """
+    kind = key[0]
+    if kind == 'history':
+        _, since, limit, fields = key
+        # since=0 serves the latest N, which pruning can shift; a reply
+        # bucketed automatically carries per-bucket counts; appended
+        # readings are never projected
+        if since > 0 and fields is None and not (data and 'count' in data[0]):
+            return {
+                'policy': APPEND,
+                'since': since,
+                'room': limit - len(data),
+                'last_ts': data[-1]['timestamp'] if data else since,
+            }
+    elif kind == 'after_id' and data['has_more']:
+        return {'policy': KEEP}
+    return {'policy': DROP}
+
+
+def _reading_frame(reading: dict) -> bytes:
+    return format_event('reading', reading, repr(reading['timestamp']))
+
+
+def _reading_frames(
+    reading: dict, previous_level: StormLevel,
+) -> list[tuple[float, bytes]]:
+    """The ``reading`` frame, plus a ``storm_level`` frame if it changed."""
+    ts = reading['timestamp']
+    frames = [(ts, _reading_frame(reading))]
+    level = StormLevel(reading['storm_level'])
+    if level != previous_level:
+        frames.append((ts, format_event('storm_level', {
+            'timestamp': ts,
+            'storm_level': int(level),
+            'storm_label': level.name,
+            'previous_level': int(previous_level),
+        })))
+    return frames
@@ -0,0 +1,259 @@
+"""ReadingArchive — compressed per-day archive of pruned readings.
+
+Rows that age out of the live SQLite table are appended to one file per UTC
+day.  Each file is a sequence of self-contained blocks; every block starts
+with a small summary header (row count, first and last timestamp, payload
+sizes) so range queries can skip whole blocks and only decode the ones they
+touch.
+
+Float columns are stored as the XOR of each value's IEEE-754 bits with the
+previous value's, byte-shuffled so that the (mostly zero) high-order bytes
+line up, then zlib-compressed.  Storm levels are stored as deltas.  All of
+it is exact: decoded rows are bit-identical to the rows that were archived.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIX = '.ssa'
+COMPRESSION_LEVEL = 6
+
+# Block header: magic, row count, first timestamp, last timestamp, followed
+# by one compressed payload length per column.
+_MAGIC = b'SSA1'
+_HEADER = struct.Struct('<4sIdd6I')
+_FLOAT_COLUMNS = 5  # timestamp .. pressure; storm_level is last
+
+
+class ReadingArchive:
+    """Append-only archive of readings, one file per UTC day.
+
+    Rows are tuples in the history store's column order: ``(timestamp,
+    temperature, temperature_f, raw_temperature, pressure, storm_level)``.
+
+    Args:
+        directory: Where day files live.  Created on first write.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self._dir = Path(directory)
+        self._lock = threading.Lock()
+        # path -> (file size, [(offset, n, t_min, t_max, lengths), ...])
+        self._index: dict[Path, tuple[int, list[tuple]]] = {}
+
+    @property
+    def directory(self) -> Path:
+        return self._dir
+
+    def append(self, rows: list[tuple]) -> int:
+        """Archive *rows* (ascending by timestamp); returns rows written.
+
+        Rows at or before the newest archived timestamp of their day are
+        skipped, so re-archiving a batch after a crash is harmless.
+        """
+        written = 0
+        with self._lock:
+            for path, day_rows in _split_by_day(self._dir, rows):
+                blocks = self._blocks(path)
+                if blocks:
+                    newest = blocks[-1][3]
+                    day_rows = [row for row in day_rows if row[0] > newest]
+                if not day_rows:
+                    continue
+                self._dir.mkdir(parents=True, exist_ok=True)
+                with open(path, 'ab') as f:
+                    f.write(_encode_block(day_rows))
+                    f.flush()
+                    os.fsync(f.fileno())
+                written += len(day_rows)
+        return written
+
+    def clear(self) -> None:
+        """Delete every day file."""
+        with self._lock:
+            for path in self._day_files(0, float('inf')):
+                path.unlink()
+            self._index.clear()
+
+    def rows(self, start: float, stop: float) -> list[tuple]:
+        """Archived rows with ``start <= timestamp < stop``, ascending."""
+        result: list[tuple] = []
+        for path in self._day_files(start, stop):
+            for block in self._blocks(path):
+                _, n, t_min, t_max, _ = block
+                if t_max < start or t_min >= stop:
+                    continue
+                decoded = self._decode(path, block)
+                if t_min >= start and t_max < stop:
+                    result.extend(decoded)
+                else:
+                    result.extend(
+                        row for row in decoded if start <= row[0] < stop
+                    )
+        return result
+
+    def count(self, start: float, stop: float) -> int:
+        """Number of archived rows with ``start <= timestamp < stop``.
+
+        Only blocks that straddle a boundary are decoded.
+        """
+        total = 0
+        for path in self._day_files(start, stop):
+            for block in self._blocks(path):
+                _, n, t_min, t_max, _ = block
+                if t_max < start or t_min >= stop:
+                    continue
+                if t_min >= start and t_max < stop:
+                    total += n
+                else:
+                    total += sum(
+                        1 for row in self._decode(path, block)
+                        if start <= row[0] < stop
+                    )
+        return total
+
+    def oldest(self) -> float | None:
+        """Timestamp of the oldest archived row, or None if empty."""
+        for path in self._day_files(0, float('inf')):
+            blocks = self._blocks(path)
+            if blocks:
+                return blocks[0][2]
+        return None
+
+    # ── Private helpers ─────────────────────────────────────────
+
+    def _day_files(self, start: float, stop: float) -> list[Path]:
+        """Existing day files that may hold rows in [start, stop)."""
+        try:
+            names = sorted(
+                name for name in os.listdir(self._dir)
+                if name.endswith(ARCHIVE_SUFFIX)
+            )
+        except OSError:
+            return []
+        first = _day_name(max(start, 0.0))
+        last = _day_name(stop) if stop < 253402300800.0 else '9999-12-31'
+        return [
+            self._dir / name for name in names
+            if first <= name[:-len(ARCHIVE_SUFFIX)] <= last
+        ]
+
+    def _blocks(self, path: Path) -> list[tuple]:
+        """Block summaries for *path*, re-scanned only when the file grows."""
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return []
+        cached = self._index.get(path)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        blocks = []
+        with open(path, 'rb') as f:
+            offset = 0
+            while offset + _HEADER.size <= size:
+                f.seek(offset)
+                magic, n, t_min, t_max, *lengths = _HEADER.unpack(
+                    f.read(_HEADER.size),
+                )
+                end = offset + _HEADER.size + sum(lengths)
+                if magic != _MAGIC or end > size:
+                    # Torn write from a crash: ignore the partial block
+                    logger.warning('Ignoring damaged archive block in %s', path)
+                    break
+                blocks.append((offset, n, t_min, t_max, tuple(lengths)))
+                offset = end
+        self._index[path] = (size, blocks)
+        return blocks
+
+    def _decode(self, path: Path, block: tuple) -> list[tuple]:
+        offset, n, _, _, lengths = block
+        with open(path, 'rb') as f:
+            f.seek(offset + _HEADER.size)
+            payload = f.read(sum(lengths))
+        return _decode_columns(payload, n, lengths)
+
+
+# ── Encoding ────────────────────────────────────────────────────
+
+
+def _day_name(ts: float) -> str:
+    t = time.gmtime(ts)
+    return f'{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}'
+
+
+def _split_by_day(directory: Path, rows: list[tuple]):
+    """Yield ``(day file path, rows)`` groups, preserving order."""
+    current = None
+    group: list[tuple] = []
+    for row in rows:
+        name = _day_name(row[0])
+        if name != current:
+            if group:
+                yield directory / (current + ARCHIVE_SUFFIX), group
+            current, group = name, []
+        group.append(row)
+    if group:
+        yield directory / (current + ARCHIVE_SUFFIX), group
+
+
+def _encode_block(rows: list[tuple]) -> bytes:
+    payloads = [
+        zlib.compress(_xor_encode([row[i] for row in rows]), COMPRESSION_LEVEL)
+        for i in range(_FLOAT_COLUMNS)
+    ]
+    levels = [row[_FLOAT_COLUMNS] for row in rows]
+    deltas = array('b', [levels[0]] + [b - a for a, b in zip(levels, levels[1:])])
+    payloads.append(zlib.compress(deltas.tobytes(), COMPRESSION_LEVEL))
+    header = _HEADER.pack(
+        _MAGIC, len(rows), rows[0][0], rows[-1][0], *map(len, payloads),
+    )
+    return header + b''.join(payloads)
+
+
+def _decode_columns(payload: bytes, n: int, lengths: tuple) -> list[tuple]:
+    columns = []
+    offset = 0
+    for i, length in enumerate(lengths):
+        raw = zlib.decompress(payload[offset:offset + length])
+        offset += length
+        if i < _FLOAT_COLUMNS:
+            columns.append(_xor_decode(raw, n))
+        else:
+            levels = []
+            level = 0
+            for delta in array('b', raw):
+                level += delta
+                levels.append(level)
+            columns.append(levels)
+    return list(zip(*columns))
+
+
+def _xor_encode(values: list[float]) -> bytes:
+    """XOR each float's bits with its predecessor's, then byte-shuffle."""
+    words = array('Q', array('d', values).tobytes())
+    xored = array('Q', [words[0]]) if words else array('Q')
+    xored.extend(b ^ a for a, b in zip(words, words[1:]))
+    raw = xored.tobytes()
+    return b''.join(raw[i::8] for i in range(8))
+
+
+def _xor_decode(shuffled: bytes, n: int) -> list[float]:
+    raw = bytearray(8 * n)
+    for i in range(8):
+        raw[i::8] = shuffled[i * n:(i + 1) * n]
+    words = array('Q', bytes(raw))
+    value = 0
+    for i, word in enumerate(words):
+        value ^= word
+        words[i] = value
+    return array('d', words.tobytes()).tolist()
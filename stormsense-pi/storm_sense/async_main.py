@@ -0,0 +1,170 @@
+"""Asyncio entry point — sampling, HAT output and the API on one event loop.
+
+An alternative to :mod:`storm_sense.main` for hosts that keep many
+``/api/stream`` clients open.  The sensor ticks, the actuator queue and every
+HTTP connection are coroutines on a single loop; the blocking parts (I2C
+reads, SQLite, Flask handlers and HAT writes) run on one bounded
+:class:`~concurrent.futures.ThreadPoolExecutor` of ``ASYNC_EXECUTOR_THREADS``
+threads, so the thread count stays fixed however many clients connect.
+
+Run with ``python -m storm_sense.async_main``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from storm_sense.async_server import AsyncAPIServer
+from storm_sense.config import (
+    API_BACKLOG,
+    API_HOST,
+    API_KEEPALIVE_S,
+    API_PORT,
+    ASYNC_EXECUTOR_THREADS,
+    ASYNC_STREAM_MAX_CLIENTS,
+    SAMPLE_INTERVAL_S,
+)
+from storm_sense.main import StormSenseApp
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncStormSenseApp(StormSenseApp):
+    """:class:`StormSenseApp` driven by an asyncio event loop."""
+
+    def __init__(self, threads: int = ASYNC_EXECUTOR_THREADS) -> None:
+        super().__init__()
+        self._threads = max(2, threads)
+        self._executor = ThreadPoolExecutor(
+            self._threads, thread_name_prefix='stormsense-io',
+        )
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._hat_wake: asyncio.Event | None = None
+        self._stop: asyncio.Event | None = None
+
+    def _wire_buttons(self) -> None:
+        """Run button handlers on the executor, not the touch thread."""
+        super()._wire_buttons()
+        for name in ('on_button_a', 'on_button_b', 'on_button_c'):
+            setattr(self._hat, name, self._dispatcher(getattr(self._hat, name)))
+
+    def _dispatcher(self, handler: Callable[[], None]) -> Callable[[], None]:
+        def dispatch() -> None:
+            future = self._executor.submit(handler)
+            future.add_done_callback(_log_failure)
+        return dispatch
+
+    # ── Coroutines ──────────────────────────────────────────────
+
+    async def _offload(self, fn: Callable, *args):
+        return await self._loop.run_in_executor(self._executor, fn, *args)
+
+    async def _sample_loop(self) -> None:
+        """Sub-sample every tick; read, store and display once per window."""
+        logger.info(
+            'Sensor loop started (interval: %ds, %d sub-samples per reading)',
+            SAMPLE_INTERVAL_S, self._sensor.oversample,
+        )
+        ticks = self._ticks
+        while await ticks.wait_next_async():
+            self._record_tick()
+            try:
+                if not await self._offload(self._sensor.sample):
+                    continue
+                await self._offload(self._sensor.read)
+                # Only queues HAT commands, so it stays on the loop
+                self._show_reading()
+            except Exception:
+                logger.exception('Error in sensor loop')
+                self._hat.show_text('ERR ')
+
+    async def _actuator_loop(self) -> None:
+        """Drain the HAT queue on the executor whenever commands arrive."""
+        while True:
+            await self._hat_wake.wait()
+            # Cleared first: commands queued mid-drain wake us again
+            self._hat_wake.clear()
+            try:
+                await self._offload(self._hat.run_queued)
+            except Exception:
+                logger.exception('HAT actuator error')
+
+    async def serve(self) -> None:
+        """Run until SIGINT/SIGTERM, then shut everything down in order."""
+        loop = self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._hat_wake = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self._request_stop, signum)
+
+        self._hat.attach_runner(
+            lambda: loop.call_soon_threadsafe(self._hat_wake.set),
+        )
+        actuator = loop.create_task(self._actuator_loop())
+        self._hat.show_text('INIT')
+        logger.info('StormSense (asyncio) starting...')
+
+        await self._offload(self._initial_reading)
+        sampler = loop.create_task(self._sample_loop())
+
+        server = AsyncAPIServer(
+            self._api,
+            self._executor,
+            host=API_HOST,
+            port=API_PORT,
+            threads=self._threads,
+            backlog=API_BACKLOG,
+            keepalive_s=API_KEEPALIVE_S,
+            max_streams=ASYNC_STREAM_MAX_CLIENTS,
+        )
+        try:
+            await server.start()
+            logger.info(
+                'API server listening on %s:%d (%d executor threads)',
+                API_HOST, server.port, self._threads,
+            )
+            await self._stop.wait()
+        except Exception:
+            logger.exception('API server error')
+        finally:
+            # Let an in-flight read finish rather than cancelling it
+            self._shutdown_event.set()
+            await sampler
+            await server.close()
+            await self._offload(self._sensor.close)
+            self._hat.detach_runner()
+            actuator.cancel()
+            # Anything still queued (e.g. a final alert) runs inline
+            self._hat.run_queued()
+            self._hat.clear_all()
+            self._executor.shutdown(wait=True)
+            logger.info('StormSense shutdown complete')
+
+    def _request_stop(self, signum: int) -> None:
+        logger.info('Received %s, shutting down...', signal.Signals(signum).name)
+        self._stop.set()
+
+    def run(self) -> None:
+        """Start StormSense on an asyncio event loop."""
+        asyncio.run(self.serve())
+
+
+def _log_failure(future) -> None:
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        logger.error('Button handler failed', exc_info=exc)
+
+
+def main():
+    app = AsyncStormSenseApp()
+    app.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+"""AsyncAPIServer — asyncio HTTP/1.1 front end for the REST API.
+
+Connections, keep-alive and ``/api/stream`` subscribers live on the event
+loop, so an idle connection costs a few kilobytes rather than a thread.
+Other requests are handed to the Flask app (plain WSGI) on a shared, bounded
+executor, one slot of which is always left free for the sensor and HAT work
+that shares it.  Response bodies are collected in the executor and written
+from the loop.
+
+``/api/stream`` is served natively: each subscriber awaits an
+:class:`asyncio.Event` that the :class:`~storm_sense.event_stream.EventBroadcaster`
+sets (via ``call_soon_threadsafe``) when a reading is published.  Native
+streams are capped by *max_streams* instead of the Flask rate limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import io
+import logging
+import sys
+from concurrent.futures import Executor
+from http import HTTPStatus
+from urllib.parse import unquote, unquote_to_bytes
+
+from werkzeug.exceptions import HTTPException
+
+from storm_sense.api_server import ApiServer
+from storm_sense.config import (
+    API_BACKLOG,
+    API_HOST,
+    API_KEEPALIVE_S,
+    API_PORT,
+    ASYNC_EXECUTOR_THREADS,
+    ASYNC_STREAM_MAX_CLIENTS,
+)
+
+logger = logging.getLogger(__name__)
+
+# View that serves /api/stream in the Flask app
+_STREAM_ENDPOINT = 'api_stream'
+# Request line plus headers; longer heads are refused
+_MAX_HEAD_BYTES = 16 * 1024
+_MAX_BODY_BYTES = 64 * 1024
+_STREAM_HEAD = (
+    b'HTTP/1.1 200 OK\r\n'
+    b'Content-Type: text/event-stream\r\n'
+    b'Cache-Control: no-cache\r\n'
+    b'X-Accel-Buffering: no\r\n'
+    b'Access-Control-Allow-Origin: *\r\n'
+    b'Connection: close\r\n'
+    b'\r\n'
+)
+
+
+class AsyncAPIServer:
+    """Serve an :class:`ApiServer` from an asyncio event loop.
+
+    Args:
+        api: The API whose Flask app and event stream are served.
+        executor: Runs the Flask handlers (and anything else blocking).
+        host: Interface to bind.
+        port: TCP port (0 picks a free one; see :attr:`port`).
+        threads: Worker threads in *executor*; at most ``threads - 1``
+            Flask requests run at once.
+        backlog: Listen queue length.
+        keepalive_s: Idle time after which a kept-alive connection (or a
+            client that is slow to send its request) is closed.
+        max_streams: Concurrent ``/api/stream`` subscribers.
+    """
+
+    def __init__(
+        self,
+        api: ApiServer,
+        executor: Executor,
+        host: str = API_HOST,
+        port: int = API_PORT,
+        threads: int = ASYNC_EXECUTOR_THREADS,
+        backlog: int = API_BACKLOG,
+        keepalive_s: float = API_KEEPALIVE_S,
+        max_streams: int = ASYNC_STREAM_MAX_CLIENTS,
+    ) -> None:
+        self._api = api
+        self._app = api.get_app()
+        # Flask's own routing decides what is a stream request, so encoded
+        # or unnormalized paths can't slip a stream into the executor
+        self._routes = self._app.url_map.bind(host)
+        self._executor = executor
+        self._host = host
+        self._port = port
+        self._backlog = max(1, backlog)
+        self._keepalive_s = keepalive_s
+        self._max_streams = max_streams
+        self._app_slots = max(1, threads - 1)
+        self._slots: asyncio.Semaphore | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._published: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def port(self) -> int:
+        """The bound port (useful with ``port=0``)."""
+        if self._server is None:
+            return self._port
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self) -> None:
+        """Bind and start accepting connections."""
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self._app_slots)
+        self._published = asyncio.Event()
+        self._api.events.add_waker(self._wake_threadsafe)
+        self._server = await asyncio.start_server(
+            self._handle, self._host, self._port,
+            backlog=self._backlog, limit=_MAX_HEAD_BYTES,
+        )
+
+    async def close(self) -> None:
+        """Stop listening, end every stream and drop open connections."""
+        if self._server is None:
+            return
+        self._server.close()
+        self._api.events.remove_waker(self._wake_threadsafe)
+        self._api.close()
+        self._on_publish()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    # ── Connections ─────────────────────────────────────────────
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+    ) -> None:
+        self._writers.add(writer)
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b'\r\n\r\n'), self._keepalive_s,
+                    )
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await _write_status(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+                    break
+                request = _parse_head(head)
+                if request is None:
+                    await _write_status(writer, HTTPStatus.BAD_REQUEST)
+                    break
+                method, target, version, headers = request
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= _MAX_BODY_BYTES:
+                    await _write_status(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                path, _, query = target.partition('?')
+                if self._is_stream(method, path):
+                    await self._stream(writer, headers.get('last-event-id'))
+                    break
+                keep_alive = _wants_keep_alive(version, headers)
+                await self._call_app(
+                    writer, method, path, query, version, headers, body, keep_alive,
+                )
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            logger.exception('Unhandled error serving connection')
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def _call_app(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        path: str,
+        query: str,
+        version: str,
+        headers: dict[str, str],
+        body: bytes,
+        keep_alive: bool,
+    ) -> None:
+        peer = writer.get_extra_info('peername') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': unquote_to_bytes(path).decode('latin-1'),
+            'QUERY_STRING': query,
+            'SERVER_NAME': self._host,
+            'SERVER_PORT': str(self.port),
+            'SERVER_PROTOCOL': version,
+            'REMOTE_ADDR': peer[0],
+            'REMOTE_PORT': str(peer[1]),
+            'CONTENT_LENGTH': str(len(body)) if body else '',
+            'CONTENT_TYPE': headers.get('content-type', ''),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in headers.items():
+            if name not in ('content-type', 'content-length'):
+                environ['HTTP_' + name.upper().replace('-', '_')] = value
+
+        async with self._slots:
+            status, response_headers, payload = await self._loop.run_in_executor(
+                self._executor, self._run_app, environ,
+            )
+        lines = [f'{version if version == "HTTP/1.0" else "HTTP/1.1"} {status}']
+        has_length = False
+        for name, value in response_headers:
+            lower = name.lower()
+            if lower == 'connection':
+                continue
+            has_length = has_length or lower == 'content-length'
+            lines.append(f'{name}: {value}')
+        if not has_length:
+            lines.append(f'Content-Length: {len(payload)}')
+        if not keep_alive:
+            lines.append('Connection: close')
+        elif version == 'HTTP/1.0':
+            lines.append('Connection: keep-alive')
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        status_code = int(status.split(' ', 1)[0])
+        no_body = method == 'HEAD' or status_code in (204, 304) or status_code < 200
+        writer.write(head if no_body else head + payload)
+        await writer.drain()
+
+    def _run_app(self, environ: dict) -> tuple[str, list[tuple[str, str]], bytes]:
+        """Call the WSGI app and collect its whole response (executor)."""
+        started: list = []
+        chunks: list[bytes] = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            started[:] = [status, headers]
+            return chunks.append
+
+        result = self._app(environ, start_response)
+        try:
+            chunks.extend(result)
+        finally:
+            close = getattr(result, 'close', None)
+            if close is not None:
+                close()
+        return started[0], started[1], b''.join(chunks)
+
+    # ── Event stream ────────────────────────────────────────────
+
+    async def _stream(
+        self, writer: asyncio.StreamWriter, last_event_id: str | None,
+    ) -> None:
+        events = self._api.events
+        if not events.try_subscribe(self._max_streams):
+            await _write_status(
+                writer, HTTPStatus.SERVICE_UNAVAILABLE,
+                b'{"error":"too many stream subscribers"}',
+            )
+            return
+        try:
+            cursor, replayed, frames = await self._loop.run_in_executor(
+                self._executor, self._api.stream_start, last_event_id,
+            )
+            writer.write(_STREAM_HEAD + b''.join(frames))
+            await writer.drain()
+            keepalive_s = self._api.stream_keepalive_s
+            while not events.closed:
+                published = self._published
+                frames, cursor = events.poll(cursor)
+                if not frames:
+                    try:
+                        await asyncio.wait_for(published.wait(), keepalive_s)
+                    except asyncio.TimeoutError:
+                        writer.write(b': keepalive\n\n')
+                        await writer.drain()
+                    continue
+                fresh = [frame for key, frame in frames if key > replayed]
+                if fresh:
+                    writer.write(b''.join(fresh))
+                    await writer.drain()
+        finally:
+            events.unsubscribe()
+
+    def _is_stream(self, method: str, path: str) -> bool:
+        """True if Flask would route this request to the /api/stream view."""
+        if method != 'GET':
+            return False
+        try:
+            endpoint, _ = self._routes.match(unquote(path), method='GET')
+        except HTTPException:
+            # 404s, and redirects (e.g. '//'), are left to the Flask app
+            return False
+        return endpoint == _STREAM_ENDPOINT
+
+    def _wake_threadsafe(self) -> None:
+        """Broadcaster waker; runs on the publishing thread."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._on_publish)
+
+    def _on_publish(self) -> None:
+        """Wake every waiting stream and arm a fresh event for the next."""
+        published = self._published
+        if published is not None:
+            self._published = asyncio.Event()
+            published.set()
+
+
+def _parse_head(head: bytes) -> tuple[str, str, str, dict[str, str]] | None:
+    """``(method, target, version, headers)`` or None if malformed.
+
+    Header names are lower-cased; repeated headers are joined with ``", "``.
+    """
+    lines = head.decode('latin-1').split('\r\n')
+    parts = lines[0].split(' ')
+    if len(parts) != 3 or not parts[2].startswith('HTTP/1.'):
+        return None
+    headers: dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(':')
+        if not sep or not name or name != name.strip():
+            return None
+        name = name.lower()
+        value = value.strip()
+        headers[name] = f'{headers[name]}, {value}' if name in headers else value
+    return parts[0], parts[1], parts[2], headers
+
+
+def _wants_keep_alive(version: str, headers: dict[str, str]) -> bool:
+    connection = headers.get('connection', '').lower()
+    if version == 'HTTP/1.0':
+        return 'keep-alive' in connection
+    return 'close' not in connection
+
+
+async def _write_status(
+    writer: asyncio.StreamWriter, status: HTTPStatus, body: bytes = b'',
+) -> None:
+    """Send an error response (JSON *body*, if any) and close."""
+    head = f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+    if body:
+        head += 'Content-Type: application/json\r\n'
+    head += f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'
+    writer.write(head.encode('latin-1') + body)
+    with contextlib.suppress(ConnectionError):
+        await writer.drain()
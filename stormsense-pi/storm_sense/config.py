@@ -5,6 +5,17 @@ SAMPLE_INTERVAL_S = 5              # Read BMP280 every 5 seconds
 HISTORY_WINDOW_S = 3 * 60 * 60    # 3-hour rolling window for storm detection
 HISTORY_MAX_SAMPLES = HISTORY_WINDOW_S // SAMPLE_INTERVAL_S  # 2160 samples
 SESSION_LOG_MAX = 86400 // SAMPLE_INTERVAL_S  # 24 hours of readings
+# Sub-samples per stored reading (1 Hz at 5 s); 1 disables oversampling.
+# Each window is reduced by OVERSAMPLE_REDUCER: 'mad_mean' (outlier-rejecting
+# mean) or 'median'.
+OVERSAMPLE_FACTOR = 5
+OVERSAMPLE_REDUCER = 'mad_mean'
+# Smallest spread the outlier test treats as real, per channel: about one
+# quantization step of the BMP280 (temperature, pressure at its lowest
+# oversampling setting) and of the SoC thermal sensor.
+OVERSAMPLE_NOISE_FLOOR_TEMPERATURE_C = 0.01
+OVERSAMPLE_NOISE_FLOOR_PRESSURE_HPA = 0.03
+OVERSAMPLE_NOISE_FLOOR_CPU_C = 0.5
 
 # ── Temperature Calibration ──────────────────────────────────
 # The BMP280 sits near the CPU and reads hot. This factor controls
@@ -25,6 +36,12 @@ DRY_THRESHOLD = 2.0                # Dry: pressure rising
 # ── API Configuration ────────────────────────────────────────
 API_HOST = '0.0.0.0'
 API_PORT = 5000
+API_THREADS = 32                   # Connections served at once
+API_BACKLOG = 64                   # Connections queued while all workers are busy
+API_KEEPALIVE_S = 5.0              # Idle keep-alive connections closed after this
+# asyncio entry point (python -m storm_sense.async_main)
+ASYNC_EXECUTOR_THREADS = 4         # Threads for SQLite, I2C and Flask handlers
+ASYNC_STREAM_MAX_CLIENTS = 512     # /api/stream connections held on the loop
 
 # ── Enums ────────────────────────────────────────────────────
 from enum import IntEnum
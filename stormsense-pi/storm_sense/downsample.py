@@ -0,0 +1,82 @@
+"""Downsample — Largest-Triangle-Three-Buckets visual downsampling.
+
+LTTB keeps the points that contribute most to the visual shape of a series
+(peaks, troughs, inflections), which makes it a better fit for charts than
+keeping every Nth row.
+
+The selection is sequential — each bucket's triangle is anchored on the point
+chosen in the bucket before it — so it does not vectorize across buckets and
+is implemented in plain Python: one multiply-add per candidate point, with
+the slice sums and the argmax done in C.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+
+def lttb_indices(
+    x: Sequence[float], y: Sequence[float], threshold: int,
+) -> list[int]:
+    """Return the indices of the points LTTB keeps, in ascending order.
+
+    Args:
+        x: Monotonically increasing x values (timestamps).
+        y: Series values, same length as *x*.
+        threshold: Number of points to keep.  The first and last points are
+            always kept; when *threshold* >= ``len(x)`` every index is kept.
+    """
+    n = len(x)
+    if threshold >= n or n <= 2:
+        return list(range(n))
+    if threshold == 2:
+        return [0, n - 1]
+    if threshold < 2:
+        return [n - 1]
+    return _lttb(x, y, threshold)
+
+
+def lttb_pairs(points: Sequence[tuple], threshold: int) -> list[int]:
+    """:func:`lttb_indices` over ``(x, y, ...)`` tuples, e.g. SQLite cursor rows.
+
+    Only the first two items of each tuple are used.
+    """
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return lttb_indices(xs, ys, threshold)
+
+
+def _bucket_bounds(n: int, threshold: int) -> tuple[list[int], list[int]]:
+    """Start/end offsets of the threshold - 2 interior buckets."""
+    every = (n - 2) / (threshold - 2)
+    starts = [int(i * every) + 1 for i in range(threshold - 2)]
+    ends = starts[1:] + [n - 1]
+    return starts, ends
+
+
+def _lttb(x: Sequence[float], y: Sequence[float], threshold: int) -> list[int]:
+    n = len(x)
+    # x is measured from x[0] so epoch-sized timestamps keep full precision;
+    # the offset is folded into the constant term instead of every point
+    x0 = x[0]
+    starts, ends = _bucket_bounds(n, threshold)
+    # The last interior bucket looks ahead to the final point only
+    next_starts = starts[1:] + [n - 1]
+    next_ends = ends[1:] + [n]
+
+    selected = [0]
+    ax, ay = 0.0, y[0]
+    for lo, hi, next_lo, next_hi in zip(starts, ends, next_starts, next_ends):
+        count = next_hi - next_lo
+        dx = sum(x[next_lo:next_hi]) / count - x0 - ax
+        dy = sum(y[next_lo:next_hi]) / count - ay
+        # Twice the triangle area (a, p, avg) is |dy * px - dx * py + c|
+        c = dx * ay - dy * ax - dy * x0
+        areas = [
+            abs(dy * px - dx * py + c) for px, py in zip(x[lo:hi], y[lo:hi])
+        ]
+        best = lo + areas.index(max(areas))
+        ax, ay = x[best] - x0, y[best]
+        selected.append(best)
+    selected.append(n - 1)
+    return selected
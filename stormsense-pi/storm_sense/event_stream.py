@@ -0,0 +1,128 @@
+"""EventBroadcaster — fan-out of pre-serialised Server-Sent Events.
+
+The sensor thread publishes each event once, already encoded as an SSE
+frame.  Subscriber threads block on a condition variable until something
+newer than their cursor arrives, so any number of clients costs one
+``json.dumps`` per event and no polling.  Event-loop subscribers register a
+waker instead and collect frames with :meth:`EventBroadcaster.poll`.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from typing import Callable
+
+# Events kept for subscribers that fall behind between wake-ups
+STREAM_BACKLOG = 64
+
+
+def format_event(event: str, data: dict, event_id: str | None = None) -> bytes:
+    """Encode one SSE frame."""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append('data: ' + json.dumps(data, separators=(',', ':')))
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+class EventBroadcaster:
+    """Broadcasts encoded frames to any number of blocking subscribers.
+
+    Each published frame carries a sort key (the reading timestamp) so
+    subscribers can drop frames they have already sent from a replay.
+    """
+
+    def __init__(self, backlog: int = STREAM_BACKLOG) -> None:
+        self._cond = threading.Condition()
+        self._frames: deque[tuple[int, float, bytes]] = deque(maxlen=backlog)
+        self._seq = 0
+        self._closed = False
+        self._subscribers = 0
+        # Called (on the publishing thread) after every publish and close
+        self._wakers: list[Callable[[], None]] = []
+
+    @property
+    def cursor(self) -> int:
+        """Sequence number of the newest frame; start waiting from here."""
+        with self._cond:
+            return self._seq
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._subscribers
+
+    def publish(self, frames: list[tuple[float, bytes]]) -> None:
+        """Append ``(key, frame)`` pairs and wake every subscriber."""
+        with self._cond:
+            for key, frame in frames:
+                self._seq += 1
+                self._frames.append((self._seq, key, frame))
+            self._cond.notify_all()
+        self._wake()
+
+    def add_waker(self, waker: Callable[[], None]) -> None:
+        """Call *waker()* after every publish and on close.
+
+        It runs on the publishing thread and must not block; an event loop
+        passes something like ``lambda: loop.call_soon_threadsafe(...)``.
+        """
+        with self._cond:
+            self._wakers.append(waker)
+
+    def remove_waker(self, waker: Callable[[], None]) -> None:
+        with self._cond:
+            self._wakers.remove(waker)
+
+    def poll(self, cursor: int) -> tuple[list[tuple[float, bytes]], int]:
+        """Like :meth:`wait`, but returns at once."""
+        with self._cond:
+            return self._since(cursor), self._seq
+
+    def wait(self, cursor: int, timeout: float) -> tuple[list[tuple[float, bytes]], int]:
+        """Block until frames newer than *cursor* exist, or *timeout* passes.
+
+        Returns ``(frames, new_cursor)``; *frames* is empty on timeout or
+        close.  Frames that already left the backlog are skipped.
+        """
+        with self._cond:
+            if self._seq == cursor and not self._closed:
+                self._cond.wait(timeout)
+            return self._since(cursor), self._seq
+
+    def try_subscribe(self, limit: int) -> bool:
+        """Reserve a subscriber slot; False once *limit* are in use."""
+        with self._cond:
+            if self._closed or self._subscribers >= limit:
+                return False
+            self._subscribers += 1
+            return True
+
+    def unsubscribe(self) -> None:
+        with self._cond:
+            self._subscribers -= 1
+
+    def close(self) -> None:
+        """Wake all subscribers and make their streams end."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._wake()
+
+    # ── Private helpers ─────────────────────────────────────────
+
+    def _since(self, cursor: int) -> list[tuple[float, bytes]]:
+        """Frames newer than *cursor*.  Caller holds ``_cond``."""
+        return [(key, frame) for seq, key, frame in self._frames if seq > cursor]
+
+    def _wake(self) -> None:
+        with self._cond:
+            wakers = list(self._wakers)
+        for waker in wakers:
+            waker()
@@ -0,0 +1,114 @@
+"""RowFrame — history query results as plain row tuples.
+
+Queries hand back the rows exactly as SQLite (or the in-memory logs) produce
+them, plus the column names, and the frame renders whichever wire shape the
+client asked for:
+
+* :meth:`RowFrame.dicts` — the classic list of objects;
+* :meth:`RowFrame.to_columns` — one JSON array per column;
+* :meth:`RowFrame.pack` — packed little-endian arrays (layout below).
+
+Only the list-of-objects shape creates a dict per row.
+
+Binary layout (all integers little-endian)::
+
+    magic    4s      b'SSC1'
+    rows     uint32
+    columns  uint16
+    reserved uint16
+    then per column:  name length (uint8), UTF-8 name, typecode (1 byte)
+    zero padding to a multiple of 8
+    then per column:  rows values, zero-padded to a multiple of 8 bytes
+
+Typecode ``d`` is float64 and ``i`` is int32.  Every column starts 8-byte
+aligned, so clients can view it in place (e.g. a ``Float64List`` view).
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from typing import Sequence
+
+BINARY_MAGIC = b'SSC1'
+_HEADER = struct.Struct('<4sIHH')
+
+
+class RowFrame:
+    """Rows of equal-length tuples with named columns.
+
+    Args:
+        columns: Column names, in row order.
+        rows: Row tuples (any sequence; a list is kept as is).
+    """
+
+    def __init__(self, columns: Sequence[str], rows: list[tuple]) -> None:
+        self._columns = tuple(columns)
+        self._rows = rows
+
+    @classmethod
+    def from_dicts(cls, columns: Sequence[str], dicts: list[dict]) -> RowFrame:
+        """Frame over already-built row dicts (small in-memory fallbacks)."""
+        return cls(columns, [tuple(d[name] for name in columns) for d in dicts])
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return self._columns
+
+    @property
+    def rows(self) -> list[tuple]:
+        return self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def select(self, columns: Sequence[str]) -> RowFrame:
+        """Frame with only *columns* (a subset of :attr:`columns`)."""
+        columns = tuple(columns)
+        if columns == self._columns:
+            return self
+        index = [self._columns.index(name) for name in columns]
+        return RowFrame(
+            columns, [tuple(row[i] for i in index) for row in self._rows],
+        )
+
+    def dicts(self) -> list[dict]:
+        """Rows as dicts keyed by column name."""
+        names = self._columns
+        return [dict(zip(names, row)) for row in self._rows]
+
+    def to_columns(self) -> dict[str, list]:
+        """One list per column: ``{"timestamp": [...], "pressure": [...]}``."""
+        if not self._rows:
+            return {name: [] for name in self._columns}
+        return {
+            name: list(values)
+            for name, values in zip(self._columns, zip(*self._rows))
+        }
+
+    def pack(self) -> bytes:
+        """Encode in the binary columnar layout described in the module docs."""
+        n = len(self._rows)
+        values = list(zip(*self._rows)) if n else [()] * len(self._columns)
+        parts = [_HEADER.pack(BINARY_MAGIC, n, len(self._columns), 0)]
+        arrays = []
+        for name, column in zip(self._columns, values):
+            typecode = 'i' if column and isinstance(column[0], int) else 'd'
+            encoded = name.encode()
+            parts.append(bytes([len(encoded)]) + encoded + typecode.encode())
+            arrays.append(array(typecode, column))
+        _pad(parts)
+        for data in arrays:
+            if sys.byteorder == 'big':
+                data.byteswap()
+            parts.append(data.tobytes())
+            _pad(parts)
+        return b''.join(parts)
+
+
+def _pad(parts: list[bytes]) -> None:
+    """Append zero bytes so the joined length is a multiple of 8."""
+    size = sum(map(len, parts))
+    if size % 8:
+        parts.append(bytes(8 - size % 8))
@@ -3,11 +3,25 @@
 Handles the 14-segment display, 7x APA102 RGB LEDs, piezo buzzer,
 and capacitive touch buttons.  Falls back to a mock module on macOS
 so development can happen without the physical HAT attached.
+
+Once :meth:`HATInterface.start_worker` has been called, display, LED and
+buzzer calls only post a command to an actuator thread and return at once,
+so a three-note alert never holds up the sensor loop.  A display or LED
+update still waiting in the queue is replaced by a newer one.  Until then
+(and after :meth:`HATInterface.stop_worker`) calls run inline.  Either way
+all hardware access is serialized.
+
+An event loop can drive the same queue without the thread: see
+:meth:`HATInterface.attach_runner`.
 """
 
 from __future__ import annotations
 
+import itertools
+import logging
+import threading
 import time
+from collections import OrderedDict
 from typing import Callable
 
 try:
@@ -17,6 +31,8 @@ except ImportError:
 
 from storm_sense.config import StormLevel
 
+logger = logging.getLogger(__name__)
+
 # ── Display label lookup ────────────────────────────────────────
 _STORM_LABELS: dict[StormLevel, str] = {
     StormLevel.STORMY: "STRM",
@@ -42,6 +58,11 @@ _LED_GAUGE: dict[StormLevel, tuple[int, tuple[int, int, int]]] = {
 _MIDI_C4 = 60
 _MIDI_A4 = 69
 
+# ── Actuator queue slots ────────────────────────────────────────
+# Commands posted to the same slot supersede each other while queued.
+_DISPLAY = 'display'
+_LEDS = 'leds'
+
 
 class HATInterface:
     """High-level driver for the Rainbow HAT peripherals."""
@@ -55,42 +76,126 @@ class HATInterface:
         self.on_button_b = None
         self.on_button_c = None
 
+        # Serializes hardware access between the worker, inline calls and
+        # the touch-button thread.
+        self._hw_lock = threading.Lock()
+        # slot -> (fn, args); guarded by _queue_cond
+        self._queue: OrderedDict[object, tuple[Callable, tuple]] = OrderedDict()
+        self._queue_cond = threading.Condition()
+        self._seq = itertools.count()
+        self._busy = False
+        self._stopping = False
+        self._worker: threading.Thread | None = None
+        # Set by attach_runner(): called instead of waking a worker thread
+        self._notify: Callable[[], None] | None = None
+
         rh.touch.A.press(self._handle_a)
         rh.touch.B.press(self._handle_b)
         rh.touch.C.press(self._handle_c)
 
+    # ── Actuator worker ─────────────────────────────────────────
+
+    def start_worker(self) -> None:
+        """Run hardware writes on a background thread from now on."""
+        with self._queue_cond:
+            if self._worker is not None:
+                return
+            self._stopping = False
+            self._worker = threading.Thread(
+                target=self._run_worker, name='hat-actuator', daemon=True,
+            )
+            self._worker.start()
+
+    def stop_worker(self, timeout: float | None = None) -> None:
+        """Finish queued commands, then go back to running calls inline.
+
+        Commands posted after the worker's last look at the queue run here
+        before inline calls resume, so none is stranded and none overtakes
+        a newer inline call.  If the worker is still busy after *timeout*,
+        whatever is left is dropped with a warning instead.
+        """
+        with self._queue_cond:
+            worker = self._worker
+            if worker is None:
+                return
+            self._stopping = True
+            self._queue_cond.notify_all()
+        worker.join(timeout)
+        with self._queue_cond:
+            self._worker = None
+            if self._notify is not None:
+                return
+            if worker.is_alive():
+                if self._queue:
+                    logger.warning(
+                        'HAT worker still busy; dropping %d queued command(s)',
+                        len(self._queue),
+                    )
+                    self._queue.clear()
+                return
+            # Inline callers wait on the condition until this is done
+            while self._queue:
+                _, (fn, args) = self._queue.popitem(last=False)
+                self._run_command(fn, args)
+            self._queue_cond.notify_all()
+
+    def attach_runner(self, notify: Callable[[], None]) -> None:
+        """Queue commands for an external runner instead of a thread.
+
+        *notify()* is called on the posting thread whenever a command is
+        queued and must not block; the runner then calls
+        :meth:`run_queued` (e.g. on an executor).
+        """
+        with self._queue_cond:
+            self._notify = notify
+
+    def detach_runner(self) -> None:
+        """Go back to running calls inline (queued ones stay queued)."""
+        with self._queue_cond:
+            self._notify = None
+
+    def run_queued(self) -> int:
+        """Run queued commands until the queue is empty.  Returns how many."""
+        ran = 0
+        while self._run_next(block=False):
+            ran += 1
+        return ran
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until every queued command has run.  False on timeout."""
+        with self._queue_cond:
+            return self._queue_cond.wait_for(
+                lambda: not self._queue and not self._busy, timeout,
+            )
+
+    @property
+    def queue_depth(self) -> int:
+        """Commands waiting for the actuator worker."""
+        return len(self._queue)
+
     # ── Display methods ─────────────────────────────────────────
 
     def show_temperature(self, temp: float) -> None:
         """Format and display a temperature reading (e.g. '23.5')."""
-        text = f"{temp:4.1f}"[:4]
-        rh.display.print_str(text)
-        rh.display.show()
+        self._submit(_DISPLAY, self._print, f"{temp:4.1f}"[:4])
 
     def show_pressure(self, pressure: float) -> None:
         """Format and display a pressure reading (e.g. '1013')."""
-        text = f"{pressure:4.0f}"[:4]
-        rh.display.print_str(text)
-        rh.display.show()
+        self._submit(_DISPLAY, self._print, f"{pressure:4.0f}"[:4])
 
     def show_storm_level(self, level: StormLevel) -> None:
         """Display the human-readable storm level label."""
-        rh.display.print_str(_STORM_LABELS[level])
-        rh.display.show()
+        self._submit(_DISPLAY, self._print, _STORM_LABELS[level])
 
     def show_text(self, text: str) -> None:
         """Display arbitrary text (first 4 chars)."""
-        rh.display.print_str(text[:4])
-        rh.display.show()
+        self._submit(_DISPLAY, self._print, text[:4])
 
     # ── LED methods ─────────────────────────────────────────────
 
     def update_leds(self, level: StormLevel) -> None:
         """Light a single LED on the barometer gauge matching *level*."""
-        rh.rainbow.clear()
-        idx, (r, g, b) = _LED_GAUGE[level]
-        rh.rainbow.set_pixel(idx, r, g, b)
-        rh.rainbow.show()
+        self._submit(_LEDS, self._light, level)
 
     # ── Buzzer methods ──────────────────────────────────────────
 
@@ -103,7 +208,31 @@ class HATInterface:
         """
         if level <= StormLevel.FAIR:
             return
+        # Never coalesced: every escalation is heard
+        self._submit(None, self._buzz, level)
 
+    # ── Housekeeping ────────────────────────────────────────────
+
+    def clear_all(self) -> None:
+        """Turn off display, LEDs, and buzzer."""
+        self._submit(None, self._clear)
+
+    # ── Hardware writes (caller holds _hw_lock) ─────────────────
+
+    @staticmethod
+    def _print(text: str) -> None:
+        rh.display.print_str(text)
+        rh.display.show()
+
+    @staticmethod
+    def _light(level: StormLevel) -> None:
+        rh.rainbow.clear()
+        idx, (r, g, b) = _LED_GAUGE[level]
+        rh.rainbow.set_pixel(idx, r, g, b)
+        rh.rainbow.show()
+
+    @staticmethod
+    def _buzz(level: StormLevel) -> None:
         if level == StormLevel.CHANGE:
             rh.buzzer.midi_note(_MIDI_C4, 0.3)
             return
@@ -114,15 +243,70 @@ class HATInterface:
             if i < 2:
                 time.sleep(0.1)
 
-    # ── Housekeeping ────────────────────────────────────────────
-
-    def clear_all(self) -> None:
-        """Turn off display, LEDs, and buzzer."""
+    @staticmethod
+    def _clear() -> None:
         rh.display.clear()
         rh.rainbow.clear()
         rh.rainbow.show()
         rh.buzzer.stop()
 
+    # ── Command queue ───────────────────────────────────────────
+
+    def _submit(self, slot: str | None, fn: Callable, *args) -> None:
+        """Queue ``fn(*args)`` for the worker or runner, or run it now if none.
+
+        A queued command in the same *slot* is dropped and the new one goes
+        to the back, so it still runs after anything posted in between
+        (e.g. a ``clear_all``).  ``None`` slots are never coalesced.  While
+        :meth:`stop_worker` drains the queue, new commands still join it.
+        """
+        with self._queue_cond:
+            queued = self._worker is not None or self._notify is not None
+            if queued:
+                key = slot if slot is not None else next(self._seq)
+                self._queue.pop(key, None)
+                self._queue[key] = (fn, args)
+                self._queue_cond.notify_all()
+            # A worker thread is woken by the condition above
+            notify = self._notify if self._worker is None else None
+        if not queued:
+            with self._hw_lock:
+                fn(*args)
+        elif notify is not None:
+            notify()
+
+    def _run_worker(self) -> None:
+        while self._run_next(block=True):
+            pass
+
+    def _run_next(self, block: bool) -> bool:
+        """Run the oldest queued command.  False once there is none.
+
+        With *block*, waits for a command until :meth:`stop_worker`.
+        """
+        with self._queue_cond:
+            if block:
+                self._queue_cond.wait_for(lambda: self._queue or self._stopping)
+            if not self._queue:
+                return False
+            _, (fn, args) = self._queue.popitem(last=False)
+            self._busy = True
+        try:
+            self._run_command(fn, args)
+        finally:
+            with self._queue_cond:
+                self._busy = False
+                self._queue_cond.notify_all()
+        return True
+
+    def _run_command(self, fn: Callable, args: tuple) -> None:
+        """Run one command on the hardware, logging rather than raising."""
+        try:
+            with self._hw_lock:
+                fn(*args)
+        except Exception:
+            logger.exception('HAT command %s failed', fn.__name__)
+
     # ── Internal button handlers ────────────────────────────────
 
     def _handle_a(self) -> None:
@@ -2,17 +2,130 @@
 
 from __future__ import annotations
 
+import contextlib
 import logging
+import math
+import queue
 import sqlite3
 import threading
 import time
 from pathlib import Path
+from typing import Iterable, Iterator
+
+from storm_sense.archive import ReadingArchive
+from storm_sense.downsample import lttb_indices, lttb_pairs
+from storm_sense.frame import RowFrame
+from storm_sense.metrics import histogram
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_DB_PATH = '/home/pi/stormsense_history.db'
 PRUNE_MAX_AGE_S = 7 * 24 * 3600  # 7 days
 
+# ── Group commit ─────────────────────────────────────────────
+# Readings are buffered in memory and written in one transaction once
+# either threshold is reached, so the SD card sees one fsync per batch
+# instead of one per 5-second sample.
+FLUSH_MAX_ROWS = 12                # 1 minute of readings at 5 s
+FLUSH_INTERVAL_S = 60.0
+DEFAULT_JOURNAL_MODE = 'WAL'
+DEFAULT_SYNCHRONOUS = 'NORMAL'
+
+# ── Read pool ────────────────────────────────────────────────
+# Read-only connections shared by API threads (WAL mode only).
+READ_POOL_SIZE = 4
+BUSY_TIMEOUT_S = 5.0
+
+# ── Retention ────────────────────────────────────────────────
+# Old rows are deleted in small transactions with the writer lock released
+# in between, so a large backlog never stalls sampling.  The batch size
+# adapts to keep each transaction near PRUNE_BATCH_BUDGET_S.
+PRUNE_INTERVAL_S = 3600
+PRUNE_BATCH_ROWS = 1000
+PRUNE_BATCH_MIN_ROWS = 50
+PRUNE_BATCH_MAX_ROWS = 20000
+PRUNE_BATCH_BUDGET_S = 0.05
+PRUNE_PAUSE_S = 0.01
+
+# ── Archive ──────────────────────────────────────────────────
+# Pruned rows are appended to compressed per-day files next to the database
+# (see storm_sense.archive) instead of being lost.  Rollup tiers are kept
+# longer than raw rows so wide bucketed ranges never decode the archive;
+# None means the tier is never pruned.
+ARCHIVE_DIR_SUFFIX = '_archive'
+TIER_MAX_AGE_S: dict[int, int | None] = {
+    60: 30 * 24 * 3600,
+    900: 366 * 24 * 3600,
+    3600: None,
+}
+
+_QUERY_SECONDS = histogram(
+    'stormsense_history_store_seconds',
+    'HistoryStore query, flush and prune time per method.',
+    ('method',),
+)
+
+_JOURNAL_MODES = frozenset({'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'})
+_SYNCHRONOUS_LEVELS = frozenset({'OFF', 'NORMAL', 'FULL', 'EXTRA'})
+
+# Column order shared by INSERTs, buffered rows and SELECTs
+_COLUMNS = (
+    'timestamp', 'temperature', 'temperature_f',
+    'raw_temperature', 'pressure', 'storm_level',
+)
+
+# ── Rollup tiers ─────────────────────────────────────────────
+# Bucket width (seconds) -> table.  Each table holds one row per bucket
+# with the sample count and min/max/sum of every value column, updated in
+# the same transaction as the raw INSERTs.  Ordered finest to coarsest.
+ROLLUP_TIERS: dict[int, str] = {
+    60: 'readings_1m',
+    900: 'readings_15m',
+    3600: 'readings_1h',
+}
+_AGG_COLUMNS = _COLUMNS[1:]
+# Column order of bucketed rows: the bucket mean under the usual keys plus
+# min/max per value column (storm_level holds the worst level seen).
+BUCKET_COLUMNS = ('timestamp',) + tuple(
+    name
+    for col in _AGG_COLUMNS
+    for name in ((col,) if col == 'storm_level' else (col, f'{col}_min', f'{col}_max'))
+) + ('count',)
+# Columns LTTB can select points by
+LTTB_FIELDS = frozenset(_AGG_COLUMNS)
+# Ranges holding more than this many readings per requested LTTB point are
+# downsampled over each minute's min and max from the 1-minute tier instead
+# of every raw reading; only the picked minutes are read back.
+LTTB_TIER_RATIO = 12
+# Columns a history query can be projected onto (``fields=``)
+HISTORY_FIELDS = _COLUMNS
+
+# Candidate widths (seconds) when get_history() picks a bucket size itself.
+# Everything from a minute up is a multiple of a rollup tier.
+_AUTO_BUCKET_WIDTHS = (
+    10, 15, 20, 30, 60, 120, 300, 600, 900, 1800,
+    3600, 7200, 10800, 21600, 43200, 86400,
+)
+_ROLLUP_FIELDS = ', '.join(
+    f'{col}_min, {col}_max, {col}_sum' for col in _AGG_COLUMNS
+)
+
+
+class CursorExpired(ValueError):
+    """An ``after_id`` cursor points behind rows that have been pruned.
+
+    The readings it would page through now live only in the archive, which
+    has no row ids.  ``resume_after_id`` is the oldest cursor that is still
+    valid; the gap is available by time range through the ``since`` queries.
+    """
+
+    def __init__(self, after_id: int, resume_after_id: int) -> None:
+        super().__init__(
+            f'after_id {after_id} has expired; readings up to id '
+            f'{resume_after_id} were pruned',
+        )
+        self.resume_after_id = resume_after_id
+
 
 class HistoryStore:
     """SQLite-backed history storage for sensor readings.
@@ -21,13 +134,67 @@ class HistoryStore:
     (e.g. read-only filesystem, permissions error).  The sensor service
     should always keep its in-memory structures as the primary data source
     so that a database failure never takes down the station.
+
+    Writes go through one dedicated connection guarded by ``_lock``.  In WAL
+    mode, reads check out one of up to ``read_pool_size`` read-only
+    connections instead, so a slow history query never stalls
+    ``add_reading()`` and API threads don't queue behind each other.
+
+    Readings older than the retention window move to a compressed
+    :class:`~storm_sense.archive.ReadingArchive`; :meth:`get_history`,
+    :meth:`get_buckets` and :meth:`get_history_lttb` read through to it for
+    ranges that reach that far.
     """
 
-    def __init__(self, db_path: str = DEFAULT_DB_PATH) -> None:
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        flush_max_rows: int = FLUSH_MAX_ROWS,
+        flush_interval_s: float = FLUSH_INTERVAL_S,
+        journal_mode: str = DEFAULT_JOURNAL_MODE,
+        synchronous: str = DEFAULT_SYNCHRONOUS,
+        read_pool_size: int = READ_POOL_SIZE,
+        archive: bool = True,
+    ) -> None:
+        journal_mode = journal_mode.upper()
+        synchronous = synchronous.upper()
+        if journal_mode not in _JOURNAL_MODES:
+            raise ValueError(f'Unsupported journal mode: {journal_mode!r}')
+        if synchronous not in _SYNCHRONOUS_LEVELS:
+            raise ValueError(f'Unsupported synchronous level: {synchronous!r}')
+
         self._db_path = db_path
+        self._flush_max_rows = max(1, flush_max_rows)
+        self._flush_interval_s = flush_interval_s
+        self._journal_mode = journal_mode
+        self._synchronous = synchronous
         self._conn: sqlite3.Connection | None = None
         self._lock = threading.Lock()
         self._last_prune: float = 0.0
+        self._prune_thread: threading.Thread | None = None
+        self._prune_stats: dict = {}
+        # Readings waiting for the next group commit, in _COLUMNS order.
+        # Appended under _lock; _pending_lock keeps reader snapshots short.
+        self._pending: list[tuple] = []
+        self._pending_lock = threading.Lock()
+        # Row id the next buffered reading will be inserted with.  Ids are
+        # handed out when a reading is buffered, so cursors can cover
+        # readings that have not been flushed yet.  Ids up to _reserved_id
+        # are already recorded in sqlite_sequence, so a crash that loses the
+        # buffer never makes an id a client has seen go to another reading.
+        self._next_id = 1
+        self._reserved_id = 0
+        self._last_flush: float = time.monotonic()
+        # Read-only connection pool (WAL mode only)
+        self._pooled = False
+        self._reader_slots = threading.BoundedSemaphore(max(1, read_pool_size))
+        self._idle_readers: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._archive: ReadingArchive | None = None
+        if archive and db_path != ':memory:':
+            db = Path(db_path)
+            self._archive = ReadingArchive(
+                str(db.with_name(db.stem + ARCHIVE_DIR_SUFFIX)),
+            )
         self._open()
 
     # ── Public API ──────────────────────────────────────────────
@@ -37,165 +204,479 @@ class HistoryStore:
         """True when the database connection is live."""
         return self._conn is not None
 
+    @property
+    def pending_count(self) -> int:
+        """Number of readings buffered in memory awaiting the next flush."""
+        return len(self._pending)
+
     def add_reading(self, reading: dict) -> None:
-        """Persist a single sensor reading.  Silently skips if DB is down."""
+        """Buffer a sensor reading for the next group commit.
+
+        The buffer is flushed in a single transaction once it holds
+        ``flush_max_rows`` readings or ``flush_interval_s`` has elapsed since
+        the last flush.  Silently skips if DB is down.
+        """
         with self._lock:
             if self._conn is None:
                 return
-            try:
-                self._conn.execute(
-                    '''INSERT INTO readings
-                       (timestamp, temperature, temperature_f,
-                        raw_temperature, pressure, storm_level)
-                       VALUES (?, ?, ?, ?, ?, ?)''',
-                    (
-                        reading['timestamp'],
-                        reading['temperature'],
-                        reading['temperature_f'],
-                        reading['raw_temperature'],
-                        reading['pressure'],
-                        reading['storm_level'],
-                    ),
-                )
-                self._conn.commit()
-            except sqlite3.Error:
-                logger.exception('Failed to write reading to SQLite')
+            if self._next_id > self._reserved_id:
+                # Each flush reserves the next batch; this only runs after
+                # a failed one
+                self._reserve_ids_locked()
+            with self._pending_lock:
+                self._pending.append(tuple(reading[col] for col in _COLUMNS))
+                self._next_id += 1
+                buffered = len(self._pending)
+            if (
+                buffered >= self._flush_max_rows
+                or time.monotonic() - self._last_flush >= self._flush_interval_s
+            ):
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write all buffered readings to SQLite in one transaction."""
+        with self._lock:
+            self._flush_locked()
 
-    def get_history(self, limit: int = 1000, since: float = 0) -> list[dict]:
+    def get_history(
+        self, limit: int = 1000, since: float = 0, fields: Iterable[str] | None = None,
+    ) -> list[dict]:
         """Return readings ordered by timestamp ascending.
 
-        When the number of rows matching *since* exceeds *limit*, results are
-        evenly down-sampled so the returned list still spans the full range.
+        When the number of rows matching *since* exceeds *limit*, the range is
+        aggregated into the narrowest time buckets that fit in *limit* rows
+        (see :meth:`get_buckets`), so the returned list still spans the full
+        range without dropping minima or peaks.  The first bucket only
+        aggregates readings after *since* and is stamped with the first of
+        them, so bucketed rows keep the *since* contract too.  Buffered
+        readings that have not been flushed yet are included, and so are
+        archived ones when *since* reaches past the live table.
 
         Args:
             limit: Maximum number of rows to return.
             since: Only return readings with timestamp > since.
+            fields: Only return these columns (plus ``timestamp``); all of
+                ``HISTORY_FIELDS`` when None.  See :func:`history_columns`.
         """
-        with self._lock:
-            if self._conn is None:
-                return []
+        return self.get_history_frame(limit=limit, since=since, fields=fields).dicts()
+
+    @_QUERY_SECONDS.timed('history')
+    def get_history_frame(
+        self, limit: int = 1000, since: float = 0, fields: Iterable[str] | None = None,
+    ) -> RowFrame:
+        """:meth:`get_history` as a :class:`RowFrame` of cursor tuples.
+
+        Columns are the projected ``HISTORY_FIELDS``, or the matching
+        ``BUCKET_COLUMNS`` when the range was bucketed.
+        """
+        columns = history_columns(fields)
+        select = ', '.join(columns)
+        buckets: list[list] | None = None
+        with self._read() as (conn, buffered):
+            if conn is None:
+                return RowFrame(columns, [])
+            until = _until(buffered)
+            pending = [row for row in buffered if row[0] > since]
+            archived: list[tuple] = []
+            cursor = conn.cursor()
+            cursor.row_factory = None
             try:
                 if since > 0:
-                    total = self._conn.execute(
-                        'SELECT COUNT(*) FROM readings WHERE timestamp > ?',
-                        (since,),
-                    ).fetchone()[0]
-
-                    if total <= limit:
-                        cursor = self._conn.execute(
-                            '''SELECT timestamp, temperature, temperature_f,
-                                      raw_temperature, pressure, storm_level
-                               FROM readings
-                               WHERE timestamp > ?
-                               ORDER BY timestamp ASC''',
-                            (since,),
+                    # Bounded count: never walks more than limit + 1 index entries
+                    stored = _count_bounded(
+                        conn,
+                        '''SELECT 1 FROM readings
+                           WHERE timestamp > ? AND timestamp < ?''',
+                        (since, until),
+                        limit + 1,
+                    )
+                    live_start = _live_start(conn, until)
+                    if self._archive is not None and since < live_start:
+                        stored += self._archive.count(since, live_start)
+                    if stored + len(pending) > limit:
+                        # Size buckets to the data, not to an empty lead-in
+                        start = _clamp_start(conn, buffered, since, self._archive)
+                        width = _auto_bucket_width(conn, buffered, start, limit)
+                        # Whole buckets from the one after since's on
+                        head_end = (int(since // width) + 1) * width
+                        buckets = _bucket_rows(
+                            conn, buffered, width, head_end, limit, self._archive,
                         )
-                    else:
-                        step = max(1, total // limit)
-                        cursor = self._conn.execute(
-                            '''SELECT timestamp, temperature, temperature_f,
-                                      raw_temperature, pressure, storm_level
-                               FROM (
-                                   SELECT *, ROW_NUMBER() OVER (
-                                       ORDER BY timestamp ASC
-                                   ) AS rn
-                                   FROM readings
-                                   WHERE timestamp > ?
-                               )
-                               WHERE (rn - 1) % ? = 0
-                               ORDER BY timestamp ASC
-                               LIMIT ?''',
-                            (since, step, limit),
+                        head = _head_bucket(
+                            conn, buffered, width, since, self._archive,
                         )
+                        if head is not None:
+                            buckets = ([head] + buckets)[-limit:]
+                    else:
+                        if self._archive is not None and since < live_start:
+                            archived = [
+                                row for row in self._archive.rows(since, live_start)
+                                if row[0] > since
+                            ]
+                        raw_rows = cursor.execute(
+                            f'''SELECT {select}
+                                FROM readings
+                                WHERE timestamp > ? AND timestamp < ?
+                                ORDER BY timestamp ASC''',
+                            (since, until),
+                        ).fetchall()
                 else:
-                    cursor = self._conn.execute(
-                        '''SELECT timestamp, temperature, temperature_f,
-                                  raw_temperature, pressure, storm_level
-                           FROM readings
-                           WHERE timestamp > ?
-                           ORDER BY timestamp ASC
-                           LIMIT ?''',
-                        (since, limit),
-                    )
-                raw_rows = cursor.fetchall()
+                    raw_rows = cursor.execute(
+                        f'''SELECT {select}
+                            FROM readings
+                            WHERE timestamp > ? AND timestamp < ?
+                            ORDER BY timestamp ASC
+                            LIMIT ?''',
+                        (since, until, limit),
+                    ).fetchall()
             except sqlite3.Error:
                 logger.exception('Failed to read history from SQLite')
-                return []
-        # Convert outside the lock so add_reading() isn't blocked
-        return [dict(row) for row in raw_rows]
+                return RowFrame(columns, [])
+        # Convert outside the read so add_reading() is never held up
+        if buckets is not None:
+            return RowFrame(
+                BUCKET_COLUMNS, [_bucket_to_row(b) for b in buckets],
+            ).select(bucket_columns(columns))
+        rows = _project(archived, columns)
+        rows.extend(raw_rows)
+        rows.extend(_project(pending, columns))
+        del rows[limit:]
+        return RowFrame(columns, rows)
+
+    def get_buckets(
+        self,
+        bucket_s: int,
+        since: float = 0,
+        limit: int = 1000,
+        fields: Iterable[str] | None = None,
+    ) -> list[dict]:
+        """Return min/mean/max aggregates per *bucket_s*-second time bucket.
+
+        Buckets are aligned to multiples of *bucket_s* and the bucket holding
+        *since* is returned whole.  Widths that are a multiple of a rollup
+        tier are aggregated from that tier; others group raw rows in a
+        single index range scan, plus archived rows for the part of the
+        range before the live table.  Each row carries the bucket mean under
+        the usual keys, the worst storm level, ``<column>_min`` /
+        ``<column>_max`` and a ``count``.
+
+        Args:
+            bucket_s: Bucket width in seconds.
+            since: Only aggregate readings from buckets ending after since.
+            limit: Maximum number of (most recent) buckets to return.
+        """
+        return self.get_buckets_frame(
+            bucket_s, since=since, limit=limit, fields=fields,
+        ).dicts()
+
+    @_QUERY_SECONDS.timed('buckets')
+    def get_buckets_frame(
+        self,
+        bucket_s: int,
+        since: float = 0,
+        limit: int = 1000,
+        fields: Iterable[str] | None = None,
+    ) -> RowFrame:
+        """:meth:`get_buckets` as a :class:`RowFrame` in ``BUCKET_COLUMNS``.
 
-    def get_latest(self, limit: int = 1000) -> list[dict]:
+        *fields* keeps only the bucket columns derived from those fields.
+        """
+        columns = bucket_columns(history_columns(fields))
+        with self._read() as (conn, buffered):
+            if conn is None:
+                return RowFrame(columns, [])
+            try:
+                if since <= 0:
+                    # Only the newest *limit* buckets can be returned
+                    latest = _latest_timestamp(conn, buffered)
+                    if latest is None:
+                        return RowFrame(columns, [])
+                    since = latest - bucket_s * limit
+                buckets = _bucket_rows(
+                    conn, buffered, bucket_s, since, limit, self._archive,
+                )
+            except sqlite3.Error:
+                logger.exception('Failed to read bucketed history from SQLite')
+                return RowFrame(columns, [])
+        return RowFrame(
+            BUCKET_COLUMNS, [_bucket_to_row(b) for b in buckets],
+        ).select(columns)
+
+    def get_history_lttb(
+        self,
+        limit: int = 1000,
+        since: float = 0,
+        field: str = 'pressure',
+        fields: Iterable[str] | None = None,
+    ) -> list[dict]:
+        """Return up to *limit* raw readings chosen by LTTB on *field*.
+
+        Unlike bucketing, every returned row is a real reading; the points
+        kept are the ones that best preserve the visual shape of *field*.
+        Only ``(timestamp, field)`` is fetched for the whole range; full rows
+        are then read back for the selected points alone.  Ranges with more
+        than ``LTTB_TIER_RATIO`` readings per point select among the
+        1-minute tier's per-minute minimum and maximum instead, so the cost
+        tracks minutes in the range rather than readings.
+        """
+        return self.get_lttb_frame(
+            limit=limit, since=since, field=field, fields=fields,
+        ).dicts()
+
+    @_QUERY_SECONDS.timed('lttb')
+    def get_lttb_frame(
+        self,
+        limit: int = 1000,
+        since: float = 0,
+        field: str = 'pressure',
+        fields: Iterable[str] | None = None,
+    ) -> RowFrame:
+        """:meth:`get_history_lttb` as a :class:`RowFrame` of cursor tuples."""
+        if field not in LTTB_FIELDS:
+            raise ValueError(f'Unsupported LTTB field: {field!r}')
+        columns = history_columns(fields)
+        col = _COLUMNS.index(field)
+        with self._read() as (conn, buffered):
+            if conn is None:
+                return RowFrame(columns, [])
+            until = _until(buffered)
+            pending = [row for row in buffered if row[0] > since]
+            try:
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                matched = _count_bounded(
+                    conn,
+                    '''SELECT 1 FROM readings
+                       WHERE timestamp > ? AND timestamp < ?''',
+                    (since, until),
+                    LTTB_TIER_RATIO * limit + 1,
+                )
+                live_start = _live_start(conn, until)
+                if self._archive is not None and since < live_start:
+                    matched += self._archive.count(since, live_start)
+                wide = matched > LTTB_TIER_RATIO * limit
+                if wide:
+                    points = _minute_extremes(
+                        conn, since, until, field, self._archive,
+                    )
+                else:
+                    # Few enough archived rows to carry whole
+                    points = [
+                        (row[0], row[col], row)
+                        for row in _archived_after(conn, since, until, self._archive)
+                    ]
+                    points += cursor.execute(
+                        f'''SELECT timestamp, {field}
+                            FROM readings
+                            WHERE timestamp > ? AND timestamp < ?
+                            ORDER BY timestamp ASC''',
+                        (since, until),
+                    ).fetchall()
+            except (sqlite3.Error, OSError):
+                logger.exception('Failed to read LTTB history from SQLite')
+                return RowFrame(columns, [])
+        stored = len(points)
+        points.extend((row[0], row[col]) for row in pending)
+        # Downsample outside the read so the connection goes back to the pool
+        selected = lttb_pairs(points, limit)
+        picks = [points[i] for i in selected if i < stored]
+        if wide:
+            rows = self._rows_in_minutes(picks, field, columns)
+        else:
+            rows = _project([pick[2] for pick in picks if len(pick) > 2], columns)
+            rows += self._rows_at(
+                [pick for pick in picks if len(pick) == 2], field, columns,
+            )
+        rows.extend(_project(
+            [pending[i - stored] for i in selected if i >= stored], columns,
+        ))
+        return RowFrame(columns, rows)
+
+    def get_latest(
+        self, limit: int = 1000, fields: Iterable[str] | None = None,
+    ) -> list[dict]:
         """Return the *newest* readings, ordered by timestamp ascending.
 
         Uses ``ORDER BY timestamp DESC LIMIT`` then reverses so callers
         receive chronological order without scanning the entire table.
+        Buffered readings that have not been flushed yet are included.
         """
-        with self._lock:
-            if self._conn is None:
-                return []
+        return self.get_latest_frame(limit=limit, fields=fields).dicts()
+
+    @_QUERY_SECONDS.timed('latest')
+    def get_latest_frame(
+        self, limit: int = 1000, fields: Iterable[str] | None = None,
+    ) -> RowFrame:
+        """:meth:`get_latest` as a :class:`RowFrame` of cursor tuples."""
+        columns = history_columns(fields)
+        with self._read() as (conn, buffered):
+            if conn is None:
+                return RowFrame(columns, [])
+            pending = buffered[-limit:]
             try:
-                cursor = self._conn.execute(
-                    '''SELECT timestamp, temperature, temperature_f,
-                              raw_temperature, pressure, storm_level
-                       FROM readings
-                       ORDER BY timestamp DESC
-                       LIMIT ?''',
-                    (limit,),
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                cursor.execute(
+                    f'''SELECT {', '.join(columns)}
+                        FROM readings
+                        WHERE timestamp < ?
+                        ORDER BY timestamp DESC
+                        LIMIT ?''',
+                    (_until(buffered), limit - len(pending)),
                 )
                 raw_rows = cursor.fetchall()
             except sqlite3.Error:
                 logger.exception('Failed to read latest history from SQLite')
+                return RowFrame(columns, [])
+        raw_rows.reverse()
+        raw_rows.extend(_project(pending, columns))
+        return RowFrame(columns, raw_rows)
+
+    @_QUERY_SECONDS.timed('after_id')
+    def get_after_id(
+        self, after_id: int, limit: int = 1000, fields: Iterable[str] | None = None,
+    ) -> list[dict]:
+        """Return up to *limit* readings with a row id above *after_id*.
+
+        Served by a range scan on the primary key, so an incremental sync
+        costs only the rows it returns.  Each row carries its ``id``; pass
+        the last one back as *after_id* to fetch the next page.  Ids are
+        never reused, also not after :meth:`clear` or a crash that loses
+        the write buffer, but they can skip ahead across a restart.
+        Buffered readings are included.  Archived readings have no ids, so
+        a cursor that has fallen behind the prune raises
+        :class:`CursorExpired` rather than silently skipping them.
+        *fields* projects the readings as in :meth:`get_history`.
+        """
+        columns = history_columns(fields)
+        with self._read() as (conn, _):
+            if conn is None:
                 return []
-        # Convert outside the lock so add_reading() isn't blocked
+            # Rows with an id below the buffer's first id were committed
+            # before this snapshot, so the database read cannot miss them.
+            with self._pending_lock:
+                buffered = list(self._pending)
+                first_pending = self._next_id - len(buffered)
+            try:
+                pruned = conn.execute(
+                    'SELECT last_id FROM readings_pruned',
+                ).fetchone()
+                if pruned is not None and after_id < pruned[0]:
+                    raise CursorExpired(after_id, pruned[0])
+                raw_rows = conn.execute(
+                    f'''SELECT id, {', '.join(columns)}
+                        FROM readings
+                        WHERE id > ? AND id < ?
+                        ORDER BY id ASC
+                        LIMIT ?''',
+                    (after_id, first_pending, limit),
+                ).fetchall()
+            except sqlite3.Error:
+                logger.exception('Failed to read history after id from SQLite')
+                return []
+        # Convert outside the read so add_reading() is never held up
         rows = [dict(row) for row in raw_rows]
-        rows.reverse()
+        for offset, row in enumerate(_project(buffered, columns)):
+            if len(rows) >= limit:
+                break
+            row_id = first_pending + offset
+            if row_id > after_id:
+                rows.append({'id': row_id, **dict(zip(columns, row))})
         return rows
 
     def clear(self) -> None:
-        """Delete all stored readings."""
+        """Delete all stored and buffered readings."""
         with self._lock:
             if self._conn is None:
                 return
+            with self._pending_lock:
+                self._pending.clear()
             try:
                 self._conn.execute('DELETE FROM readings')
+                for table in ROLLUP_TIERS.values():
+                    self._conn.execute(f'DELETE FROM {table}')
                 self._conn.commit()
+                if self._archive is not None:
+                    self._archive.clear()
                 logger.info('Cleared all readings from SQLite')
-            except sqlite3.Error:
+            except (sqlite3.Error, OSError):
                 logger.exception('Failed to clear readings from SQLite')
 
-    def prune_if_due(self, max_age_seconds: int = PRUNE_MAX_AGE_S) -> int:
+    def prune_if_due(
+        self, max_age_seconds: int = PRUNE_MAX_AGE_S, block: bool = True,
+    ) -> int:
         """Delete old readings, but only if an hour has elapsed since last prune.
 
-        Returns number of rows deleted (0 if skipped or unavailable).
+        With ``block=False`` the deletes run on a background thread and this
+        returns immediately; a pass already in progress is never doubled up.
+
+        Returns number of rows deleted (0 if skipped, unavailable or running
+        in the background).
         """
         now = time.time()
-        if now - self._last_prune < 3600:
+        if now - self._last_prune < PRUNE_INTERVAL_S:
+            return 0
+        if self._prune_thread is not None and self._prune_thread.is_alive():
             return 0
         self._last_prune = now
-        return self._prune(max_age_seconds)
+        if block:
+            return self._prune(max_age_seconds)
+        self._prune_thread = threading.Thread(
+            target=self._prune, args=(max_age_seconds,),
+            name='history-prune', daemon=True,
+        )
+        self._prune_thread.start()
+        return 0
+
+    @property
+    def prune_stats(self) -> dict:
+        """Cost of the most recent retention pass.
+
+        Keys: ``rows``, ``batches``, ``total_ms`` (time spent inside delete
+        transactions), ``max_batch_ms`` and ``finished_at`` (Unix time).
+        Empty until the first pass completes.
+        """
+        return dict(self._prune_stats)
 
+    @_QUERY_SECONDS.timed('count')
     def count(self) -> int:
-        """Total number of stored readings."""
-        with self._lock:
-            if self._conn is None:
+        """Total number of stored readings, including buffered ones."""
+        with self._read() as (conn, buffered):
+            if conn is None:
                 return 0
             try:
-                cursor = self._conn.execute('SELECT COUNT(*) FROM readings')
-                return cursor.fetchone()[0]
+                cursor = conn.execute(
+                    'SELECT COUNT(*) FROM readings WHERE timestamp < ?',
+                    (_until(buffered),),
+                )
+                return cursor.fetchone()[0] + len(buffered)
             except sqlite3.Error:
                 logger.exception('Failed to count readings in SQLite')
                 return 0
 
     def close(self) -> None:
-        """Close the database connection."""
+        """Flush buffered readings and close all database connections."""
+        prune_thread = self._prune_thread
         with self._lock:
             if self._conn is not None:
+                self._flush_locked()
                 try:
                     self._conn.close()
                 except sqlite3.Error:
                     logger.exception('Error closing SQLite connection')
                 finally:
                     self._conn = None
+        # A background prune stops at its next batch once _conn is None
+        if prune_thread is not None and prune_thread is not threading.current_thread():
+            prune_thread.join(timeout=BUSY_TIMEOUT_S)
+        # Readers still checked out are closed when they are returned
+        while True:
+            try:
+                self._idle_readers.get_nowait().close()
+            except queue.Empty:
+                break
+            except sqlite3.Error:
+                logger.exception('Error closing SQLite read connection')
 
     # ── Private helpers ─────────────────────────────────────────
 
@@ -206,10 +687,18 @@ class HistoryStore:
             # Ensure parent directory exists
             Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
             self._conn = sqlite3.connect(
-                self._db_path, check_same_thread=False,
+                self._db_path, check_same_thread=False, timeout=BUSY_TIMEOUT_S,
             )
             self._conn.row_factory = sqlite3.Row
+            # Values are validated against a whitelist in __init__
+            mode = self._conn.execute(
+                f'PRAGMA journal_mode={self._journal_mode}',
+            ).fetchone()[0]
+            self._conn.execute(f'PRAGMA synchronous={self._synchronous}')
             self._create_table()
+            # Readers only stay out of the writer's way under WAL; ':memory:'
+            # databases report 'memory' and keep sharing the one connection.
+            self._pooled = mode.upper() == 'WAL'
             logger.info(
                 'History store opened: %s (%d existing readings)',
                 self._db_path,
@@ -242,23 +731,848 @@ class HistoryStore:
             CREATE INDEX IF NOT EXISTS idx_readings_timestamp
             ON readings(timestamp)
         ''')
+        value_columns = ',\n'.join(
+            f'{col}_min REAL NOT NULL, {col}_max REAL NOT NULL, '
+            f'{col}_sum REAL NOT NULL'
+            for col in _AGG_COLUMNS
+        )
+        for width, table in ROLLUP_TIERS.items():
+            self._conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    bucket INTEGER PRIMARY KEY,
+                    n      INTEGER NOT NULL,
+                    {value_columns}
+                )
+            ''')
+            self._backfill_rollup(width, table)
+        # Highest row id pruned so far: after_id cursors below it have
+        # missed rows.  Databases from before the marker start at the
+        # oldest row still present.
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS readings_pruned (
+                last_id INTEGER NOT NULL
+            )
+        ''')
+        if not self._conn.execute('SELECT 1 FROM readings_pruned').fetchone():
+            self._conn.execute('''
+                INSERT INTO readings_pruned (last_id)
+                SELECT COALESCE(
+                    (SELECT MIN(id) - 1 FROM readings),
+                    (SELECT seq FROM sqlite_sequence WHERE name = 'readings'),
+                    0)
+            ''')
         self._conn.commit()
+        # AUTOINCREMENT's high-water mark survives deletes, so ids handed
+        # out after clear() or a prune never repeat an earlier one.  It also
+        # covers the ids reserved for a buffer that was never flushed.
+        row = self._conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'readings'",
+        ).fetchone()
+        self._next_id = (row[0] if row else 0) + 1
+        self._reserve_ids_locked()
+
+    def _backfill_rollup(self, width: int, table: str) -> None:
+        """Build an empty rollup tier from existing raw rows (one-time upgrade)."""
+        assert self._conn is not None
+        if self._conn.execute(f'SELECT 1 FROM {table} LIMIT 1').fetchone():
+            return
+        aggregates = ', '.join(
+            f'MIN({col}), MAX({col}), SUM({col})' for col in _AGG_COLUMNS
+        )
+        self._conn.execute(
+            f'''INSERT INTO {table} (bucket, n, {_ROLLUP_FIELDS})
+                SELECT CAST(timestamp / ? AS INTEGER) * ?, COUNT(*), {aggregates}
+                FROM readings
+                GROUP BY 1''',
+            (width, width),
+        )
+
+    @_QUERY_SECONDS.timed('flush')
+    def _flush_locked(self) -> None:
+        """Write buffered readings in one transaction.  Caller holds the lock.
+
+        The batch stays visible in ``_pending`` until the commit has landed,
+        so concurrent readers never see a gap.
+        """
+        self._last_flush = time.monotonic()
+        if self._conn is None:
+            return
+        with self._pending_lock:
+            batch = list(self._pending)
+            first_id = self._next_id - len(batch)
+        if not batch:
+            return
+        reserved = self._next_id + self._flush_max_rows - 1
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    '''INSERT INTO readings
+                       (timestamp, temperature, temperature_f,
+                        raw_temperature, pressure, storm_level, id)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                    [(*row, first_id + i) for i, row in enumerate(batch)],
+                )
+                for width, table in ROLLUP_TIERS.items():
+                    self._conn.executemany(
+                        _UPSERT_SQL[table], _aggregate(batch, width).values(),
+                    )
+                # Reserve the next batch's ids in the same commit
+                self._record_reservation(reserved)
+            self._reserved_id = reserved
+        except sqlite3.Error:
+            logger.exception(
+                'Failed to write %d buffered readings to SQLite', len(batch),
+            )
+        finally:
+            with self._pending_lock:
+                del self._pending[:len(batch)]
+
+    def _reserve_ids_locked(self) -> None:
+        """Record ids for the next ``flush_max_rows`` readings in their own
+        commit.  Caller holds the lock."""
+        assert self._conn is not None
+        reserved = self._next_id + self._flush_max_rows - 1
+        try:
+            with self._conn:
+                self._record_reservation(reserved)
+            self._reserved_id = reserved
+        except sqlite3.Error:
+            logger.exception('Failed to reserve reading ids in SQLite')
+
+    def _record_reservation(self, last_id: int) -> None:
+        """Raise the ``readings`` AUTOINCREMENT high-water mark to *last_id*
+        inside the caller's transaction."""
+        assert self._conn is not None
+        updated = self._conn.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'readings'",
+            (last_id,),
+        ).rowcount
+        if not updated:
+            self._conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES ('readings', ?)",
+                (last_id,),
+            )
+
+    @contextlib.contextmanager
+    def _read(self) -> Iterator[tuple[sqlite3.Connection | None, list[tuple]]]:
+        """Check out a read connection plus a snapshot of the write buffer.
+
+        Yields ``(conn, buffered)``; *conn* is None when the store is down.
+        Queries must stop at ``_until(buffered)`` so that rows flushed while
+        the read is running aren't returned twice.  Without a pool the
+        writer connection is shared under ``_lock``.
+        """
+        if not self._pooled:
+            with self._lock:
+                yield self._conn, list(self._pending)
+            return
+        with self._reader_slots:
+            conn = self._checkout_reader() if self._conn is not None else None
+            if conn is None:
+                with self._lock:
+                    yield self._conn, list(self._pending)
+                return
+            try:
+                with self._pending_lock:
+                    buffered = list(self._pending)
+                # One read transaction = one consistent WAL snapshot
+                conn.execute('BEGIN')
+                try:
+                    yield conn, buffered
+                finally:
+                    conn.rollback()
+            finally:
+                self._checkin_reader(conn)
+
+    def _checkout_reader(self) -> sqlite3.Connection | None:
+        """Reuse an idle read-only connection or open a new one."""
+        try:
+            return self._idle_readers.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            uri = Path(self._db_path).resolve().as_uri() + '?mode=ro'
+            conn = sqlite3.connect(
+                uri, uri=True, check_same_thread=False, timeout=BUSY_TIMEOUT_S,
+            )
+            conn.row_factory = sqlite3.Row
+            return conn
+        except sqlite3.Error:
+            logger.exception('Failed to open SQLite read connection')
+            return None
+
+    def _checkin_reader(self, conn: sqlite3.Connection) -> None:
+        """Return a reader to the pool, or close it if the store is closed."""
+        if self._conn is None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                logger.exception('Error closing SQLite read connection')
+            return
+        self._idle_readers.put(conn)
+
+    def _rows_at(
+        self,
+        picks: list[tuple[float, float]],
+        field: str,
+        columns: tuple[str, ...] = _COLUMNS,
+    ) -> list[tuple]:
+        """Fetch *columns* for the ``(timestamp, field value)`` *picks*.
+
+        Returns exactly one row per pick, in order.  Readings that share a
+        timestamp (e.g. after a clock step) are told apart by *field*, so
+        only the selected one comes back.
+        """
+        rows: list[tuple] = []
+        by_timestamp: dict[float, list[tuple]] = {}
+        with self._read() as (conn, _):
+            if conn is None:
+                return rows
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            select = ', '.join((*columns, field))
+            timestamps = sorted({timestamp for timestamp, _ in picks})
+            try:
+                # Stay well under SQLite's bound-parameter limit
+                for i in range(0, len(timestamps), 500):
+                    chunk = timestamps[i:i + 500]
+                    placeholders = ', '.join('?' for _ in chunk)
+                    for row in cursor.execute(
+                        f'''SELECT {select}
+                            FROM readings
+                            WHERE timestamp IN ({placeholders})
+                            ORDER BY timestamp ASC, id ASC''',
+                        chunk,
+                    ):
+                        by_timestamp.setdefault(row[0], []).append(row)
+            except sqlite3.Error:
+                logger.exception('Failed to read selected rows from SQLite')
+                return rows
+        for timestamp, value in picks:
+            candidates = by_timestamp.get(timestamp)
+            if not candidates:
+                continue
+            index = next(
+                (k for k, row in enumerate(candidates) if row[-1] == value), 0,
+            )
+            rows.append(candidates.pop(index)[:-1])
+        return rows
+
+    def _rows_in_minutes(
+        self,
+        picks: list[tuple],
+        field: str,
+        columns: tuple[str, ...] = _COLUMNS,
+    ) -> list[tuple]:
+        """Fetch *columns* for the picks of a tier-level LTTB pass.
+
+        Picks that carry their reading (from raw stretches at either end of
+        the range) are used as they are.  The rest are a minute's
+        ``(midpoint, extreme)`` and resolve to the first reading in that
+        minute holding the extreme, one index probe each.  Minutes that have
+        moved to the archive are looked up in one decode of the archived
+        span they cover.  Rows come back in timestamp order.
+        """
+        rows: list[tuple] = []
+        archived: list[tuple] = []
+        with self._read() as (conn, _):
+            if conn is None:
+                return rows
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            query = f'''SELECT {', '.join(_COLUMNS)}
+                        FROM readings
+                        WHERE timestamp >= ? AND timestamp < ?
+                          AND {field} = ?
+                        ORDER BY timestamp ASC, id ASC
+                        LIMIT 1'''
+            try:
+                for pick in picks:
+                    if len(pick) > 2:
+                        rows.append(pick[2])
+                        continue
+                    minute = pick[0] - 30
+                    row = cursor.execute(
+                        query, (minute, minute + 60, pick[1]),
+                    ).fetchone()
+                    if row is not None:
+                        rows.append(row)
+                    elif self._archive is not None:
+                        archived.append(pick)
+            except sqlite3.Error:
+                logger.exception('Failed to read selected minutes from SQLite')
+                return []
+        if archived:
+            # Picks are in time order, so one range covers them all
+            col = _COLUMNS.index(field)
+            by_minute: dict[tuple, tuple] = {}
+            try:
+                for row in self._archive.rows(
+                    archived[0][0] - 30, archived[-1][0] + 30,
+                ):
+                    by_minute.setdefault((int(row[0] // 60) * 60, row[col]), row)
+            except OSError:
+                logger.exception('Failed to read selected minutes from archive')
+            for midpoint, value in archived:
+                row = by_minute.get((midpoint - 30, value))
+                if row is not None:
+                    rows.append(row)
+        # A minute's min and max share a midpoint and may be out of order
+        rows.sort(key=lambda row: row[0])
+        return _project(rows, columns)
 
+    @_QUERY_SECONDS.timed('prune')
     def _prune(self, max_age_seconds: int) -> int:
-        """Actually delete old rows."""
+        """Archive and delete rows older than *max_age_seconds* in batches.
+
+        Each batch is its own transaction under ``_lock``; the lock is
+        released between batches so ``add_reading()`` and flushes can run.
+        Raw rows are appended to the archive before they are deleted, so a
+        crash in between leaves them in both places, never in neither.
+        Rollup tiers are pruned on their own, longer schedule
+        (``TIER_MAX_AGE_S``).
+        """
         with self._lock:
             if self._conn is None:
                 return 0
-            try:
-                cutoff = time.time() - max_age_seconds
-                cursor = self._conn.execute(
-                    'DELETE FROM readings WHERE timestamp < ?', (cutoff,),
+            self._flush_locked()
+        now = time.time()
+        cutoff = now - max_age_seconds
+        targets = [('readings', 'timestamp', cutoff)]
+        for width, table in ROLLUP_TIERS.items():
+            max_age = TIER_MAX_AGE_S.get(width)
+            if max_age is None:
+                continue
+            tier_cutoff = now - max(max_age, max_age_seconds)
+            # Only drop buckets that lie entirely before the cutoff
+            targets.append((table, 'bucket', math.floor(tier_cutoff - width) + 1))
+        deleted = batches = 0
+        total_s = max_batch_s = 0.0
+        batch_rows = PRUNE_BATCH_ROWS
+        for table, column, bound in targets:
+            while True:
+                with self._lock:
+                    if self._conn is None:
+                        return deleted
+                    started = time.perf_counter()
+                    try:
+                        if table == 'readings' and self._archive is not None:
+                            self._archive_batch(bound, batch_rows)
+                        with self._conn:
+                            if table == 'readings':
+                                self._record_pruned(bound, batch_rows)
+                            cursor = self._conn.execute(
+                                f'''DELETE FROM {table} WHERE rowid IN (
+                                       SELECT rowid FROM {table}
+                                       WHERE {column} < ?
+                                       ORDER BY {column}
+                                       LIMIT ?)''',
+                                (bound, batch_rows),
+                            )
+                    except (sqlite3.Error, OSError):
+                        logger.exception('Failed to prune old rows from %s', table)
+                        return deleted
+                    elapsed = time.perf_counter() - started
+                rows = cursor.rowcount
+                batches += 1
+                total_s += elapsed
+                max_batch_s = max(max_batch_s, elapsed)
+                if table == 'readings':
+                    deleted += rows
+                logger.debug(
+                    'Prune batch: %d rows from %s in %.1f ms',
+                    rows, table, elapsed * 1000.0,
                 )
-                self._conn.commit()
-                deleted = cursor.rowcount
-                if deleted > 0:
-                    logger.info('Pruned %d readings older than %d seconds', deleted, max_age_seconds)
-                return deleted
-            except sqlite3.Error:
-                logger.exception('Failed to prune old readings')
-                return 0
+                if rows < batch_rows:
+                    break
+                batch_rows = _next_batch_size(batch_rows, elapsed)
+                time.sleep(PRUNE_PAUSE_S)
+        self._prune_stats = {
+            'rows': deleted,
+            'batches': batches,
+            'total_ms': total_s * 1000.0,
+            'max_batch_ms': max_batch_s * 1000.0,
+            'finished_at': time.time(),
+        }
+        if deleted > 0:
+            logger.info(
+                'Pruned %d readings older than %d seconds '
+                '(%d batches, %.1f ms total, %.1f ms max)',
+                deleted, max_age_seconds, batches,
+                total_s * 1000.0, max_batch_s * 1000.0,
+            )
+        return deleted
+
+    def _record_pruned(self, bound: float, batch_rows: int) -> None:
+        """Move the pruned-id marker past the rows the next prune batch
+        will delete.  Caller holds the lock and the transaction."""
+        assert self._conn is not None
+        self._conn.execute(
+            '''UPDATE readings_pruned SET last_id = MAX(last_id, COALESCE(
+                   (SELECT MAX(id) FROM (
+                        SELECT id FROM readings
+                        WHERE timestamp < ?
+                        ORDER BY timestamp
+                        LIMIT ?)),
+                   last_id))''',
+            (bound, batch_rows),
+        )
+
+    def _archive_batch(self, bound: float, batch_rows: int) -> None:
+        """Archive the rows the next prune batch will delete.  Caller holds
+        the lock."""
+        assert self._conn is not None and self._archive is not None
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(
+            '''SELECT timestamp, temperature, temperature_f,
+                      raw_temperature, pressure, storm_level
+               FROM readings
+               WHERE timestamp < ?
+               ORDER BY timestamp
+               LIMIT ?''',
+            (bound, batch_rows),
+        ).fetchall()
+        if rows:
+            self._archive.append(rows)
+
+
+# ── Retention helpers ───────────────────────────────────────────
+
+
+def _next_batch_size(rows: int, elapsed_s: float) -> int:
+    """Scale the prune batch so the next one lands near the time budget."""
+    if elapsed_s <= 0:
+        return min(rows * 2, PRUNE_BATCH_MAX_ROWS)
+    scaled = int(rows * PRUNE_BATCH_BUDGET_S / elapsed_s)
+    # Change by at most 2x per batch to ride out one-off stalls
+    scaled = max(rows // 2, min(scaled, rows * 2))
+    return max(PRUNE_BATCH_MIN_ROWS, min(scaled, PRUNE_BATCH_MAX_ROWS))
+
+
+# ── Query helpers ───────────────────────────────────────────────
+
+
+def _until(buffered: list[tuple]) -> float:
+    """Upper timestamp bound for database reads paired with *buffered*.
+
+    Timestamps are monotonic, so everything at or after the oldest buffered
+    reading is either in the snapshot or newer than the read.
+    """
+    return buffered[0][0] if buffered else math.inf
+
+
+def _live_start(conn: sqlite3.Connection, until: float) -> float:
+    """Oldest timestamp in the live table, or *until* when it is empty.
+
+    Archived rows are only read below this bound: rows that are archived but
+    not yet deleted by a running prune are still returned from the table.
+    """
+    oldest = conn.execute('SELECT MIN(timestamp) FROM readings').fetchone()[0]
+    return until if oldest is None else min(oldest, until)
+
+
+def _count_bounded(
+    conn: sqlite3.Connection, query: str, params: tuple, cap: int,
+) -> int:
+    """COUNT(*) over *query*, stopping once *cap* rows have been seen."""
+    return conn.execute(
+        f'SELECT COUNT(*) FROM ({query} LIMIT ?)', (*params, cap),
+    ).fetchone()[0]
+
+
+def _latest_timestamp(
+    conn: sqlite3.Connection, buffered: list[tuple],
+) -> float | None:
+    """Newest timestamp, buffered or stored."""
+    if buffered:
+        return buffered[-1][0]
+    return conn.execute('SELECT MAX(timestamp) FROM readings').fetchone()[0]
+
+
+def _clamp_start(
+    conn: sqlite3.Connection,
+    buffered: list[tuple],
+    since: float,
+    archive: ReadingArchive | None = None,
+) -> float:
+    """*since*, moved up to the oldest reading (archived, stored or buffered).
+
+    Buckets before the first reading would be empty, so a wide *since* over
+    sparse data must not widen the buckets or skip a rollup tier.
+    """
+    candidates = []
+    if archive is not None:
+        candidates.append(archive.oldest())
+    candidates.append(
+        conn.execute('SELECT MIN(timestamp) FROM readings').fetchone()[0],
+    )
+    if buffered:
+        candidates.append(buffered[0][0])
+    oldest = min((t for t in candidates if t is not None), default=None)
+    return since if oldest is None else max(since, oldest)
+
+
+def _auto_bucket_width(
+    conn: sqlite3.Connection, buffered: list[tuple], since: float, limit: int,
+) -> int:
+    """Narrowest bucket width that covers (since, latest] in *limit* rows."""
+    latest = _latest_timestamp(conn, buffered) or since
+
+    def fits(width: int) -> bool:
+        return int(latest // width) - int(since // width) + 1 <= limit
+
+    for width in _AUTO_BUCKET_WIDTHS:
+        if fits(width):
+            return width
+    width = 2 * 86400
+    while not fits(width):
+        width += 86400
+    return width
+
+
+def _bucket_rows(
+    conn: sqlite3.Connection,
+    buffered: list[tuple],
+    width: int,
+    since: float,
+    limit: int,
+    archive: ReadingArchive | None = None,
+) -> list[list]:
+    """Aggregate rows per *width*-second bucket, newest *limit* buckets.
+
+    Reads the coarsest rollup tier whose width divides *width* and still
+    covers the range, or the raw table (plus *archive*) when none does, then
+    folds in buffered readings.  Tier rows stop at the tier bucket holding
+    ``_until(buffered)``; the rest of that bucket comes from raw rows so a
+    concurrent flush is never counted twice.
+    """
+    start = int(_clamp_start(conn, buffered, since, archive) // width) * width
+    until = _until(buffered)
+    latest = _latest_timestamp(conn, buffered)
+    if latest is not None:
+        # Older buckets would be cut by the limit anyway
+        start = max(start, (int(latest // width) - limit + 1) * width)
+    raw_aggregates = ', '.join(
+        f'MIN({col}), MAX({col}), SUM({col})' for col in _AGG_COLUMNS
+    )
+    raw_query = f'''SELECT CAST(timestamp / ? AS INTEGER) * ? AS b,
+                   COUNT(*), {raw_aggregates}
+            FROM readings
+            WHERE timestamp >= ? AND timestamp < ?
+            GROUP BY b
+            ORDER BY b DESC
+            LIMIT ?'''
+    oldest_archived = archive.oldest() if archive is not None else None
+    source = None
+    for tier_width, table in ROLLUP_TIERS.items():
+        if width % tier_width == 0 and _tier_covers(
+            conn, table, start, oldest_archived,
+        ):
+            source = tier_width, table
+
+    if source is None:
+        rows = conn.execute(
+            raw_query, (width, width, start, until, limit),
+        ).fetchall()
+        live_start = _live_start(conn, until)
+        if oldest_archived is not None and start < live_start:
+            rows = _merge_aggregates(
+                rows, _aggregate(archive.rows(start, live_start), width),
+            )
+    else:
+        tier_width, table = source
+        tier_end = (
+            int(until // tier_width) * tier_width
+            if until != math.inf else math.inf
+        )
+        tier_aggregates = ', '.join(
+            f'MIN({col}_min), MAX({col}_max), SUM({col}_sum)'
+            for col in _AGG_COLUMNS
+        )
+        rows = conn.execute(
+            f'''SELECT CAST(bucket / ? AS INTEGER) * ? AS b,
+                       SUM(n), {tier_aggregates}
+                FROM {table}
+                WHERE bucket >= ? AND bucket < ?
+                GROUP BY b
+                ORDER BY b DESC
+                LIMIT ?''',
+            (width, width, start, tier_end, limit),
+        ).fetchall()
+        if tier_end != math.inf:
+            tail = conn.execute(
+                raw_query, (width, width, max(start, tier_end), until, limit),
+            ).fetchall()
+            rows = _merge_aggregates(rows, {row[0]: list(row) for row in tail})
+    pending = [row for row in buffered if row[0] >= start]
+    return _merge_aggregates(rows, _aggregate(pending, width))[-limit:]
+
+
+def _minute_extremes(
+    conn: sqlite3.Connection,
+    since: float,
+    until: float,
+    field: str,
+    archive: ReadingArchive | None = None,
+) -> list[tuple]:
+    """LTTB candidates for (since, until) from the 1-minute tier.
+
+    Each whole minute contributes ``(midpoint, min)`` and, when it differs,
+    ``(midpoint, max)`` of *field*.  The partial minutes at either end, which
+    the tier cannot split at *since* or *until*, contribute their raw
+    readings as ``(timestamp, value, row)``, and so do archived minutes
+    older than the tier's own retention.
+    """
+    table = ROLLUP_TIERS[60]
+    col = _COLUMNS.index(field)
+    select = ', '.join(_COLUMNS)
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    head_end = (int(since // 60) + 1) * 60
+    tier_end = int(until // 60) * 60 if until != math.inf else math.inf
+    if archive is not None:
+        first = cursor.execute(f'SELECT MIN(bucket) FROM {table}').fetchone()[0]
+        head_end = max(head_end, until if first is None else first)
+    head = _archived_after(conn, since, min(head_end, until), archive)
+    head += cursor.execute(
+        f'''SELECT {select}
+            FROM readings
+            WHERE timestamp > ? AND timestamp < ?
+            ORDER BY timestamp ASC''',
+        (since, min(head_end, until)),
+    ).fetchall()
+    points: list[tuple] = [(row[0], row[col], row) for row in head]
+    for bucket, lo, hi in cursor.execute(
+        f'''SELECT bucket, {field}_min, {field}_max
+            FROM {table}
+            WHERE bucket >= ? AND bucket < ?
+            ORDER BY bucket ASC''',
+        (head_end, tier_end),
+    ):
+        points.append((bucket + 30, lo))
+        if hi != lo:
+            points.append((bucket + 30, hi))
+    if tier_end != math.inf:
+        points.extend(
+            (row[0], row[col], row)
+            for row in cursor.execute(
+                f'''SELECT {select}
+                    FROM readings
+                    WHERE timestamp >= ? AND timestamp < ?
+                    ORDER BY timestamp ASC''',
+                (max(tier_end, head_end), until),
+            )
+        )
+    return points
+
+
+def _archived_after(
+    conn: sqlite3.Connection,
+    since: float,
+    stop: float,
+    archive: ReadingArchive | None,
+) -> list[tuple]:
+    """Archived rows after *since* and before both *stop* and the live table."""
+    if archive is None:
+        return []
+    live_start = _live_start(conn, stop)
+    if since >= live_start:
+        return []
+    return [row for row in archive.rows(since, live_start) if row[0] > since]
+
+
+def _head_bucket(
+    conn: sqlite3.Connection,
+    buffered: list[tuple],
+    width: int,
+    since: float,
+    archive: ReadingArchive | None = None,
+) -> list | None:
+    """Aggregate of the readings after *since* in since's *width* bucket.
+
+    Stamped with the first of those readings rather than the bucket start,
+    which lies at or before *since*.  None when the bucket holds none.
+    """
+    head_end = (int(since // width) + 1) * width
+    until = _until(buffered)
+    aggregates = ', '.join(
+        f'MIN({col}), MAX({col}), SUM({col})' for col in _AGG_COLUMNS
+    )
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    first, *stored = cursor.execute(
+        f'''SELECT MIN(timestamp), COUNT(*), {aggregates}
+            FROM readings
+            WHERE timestamp > ? AND timestamp < ?''',
+        (since, min(head_end, until)),
+    ).fetchone()
+    archived = _archived_after(conn, since, min(head_end, until), archive)
+    pending = [row for row in buffered if since < row[0] < head_end]
+    rows = [[head_end - width, *stored]] if stored[0] else []
+    merged = _merge_aggregates(rows, _aggregate(archived + pending, width))
+    if not merged:
+        return None
+    firsts = [part[0][0] for part in (archived, pending) if part]
+    if stored[0]:
+        firsts.append(first)
+    head = merged[0]
+    head[0] = min(firsts)
+    return head
+
+
+def _tier_covers(
+    conn: sqlite3.Connection,
+    table: str,
+    start: float,
+    oldest_archived: float | None,
+) -> bool:
+    """True if *table* holds every bucket from *start* on.
+
+    Tiers outlive raw rows, so they only fall short for ranges reaching
+    into archived data older than the tier's own retention.
+    """
+    if oldest_archived is None:
+        return True
+    first = conn.execute(f'SELECT MIN(bucket) FROM {table}').fetchone()[0]
+    return first is not None and first <= max(start, oldest_archived)
+
+
+# ── Rollup helpers ──────────────────────────────────────────────
+
+
+def lttb_rows(rows: list[tuple], limit: int, field: str) -> list[dict]:
+    """LTTB-select *limit* rows (in _COLUMNS order) and render them as dicts."""
+    col = _COLUMNS.index(field)
+    if len(rows) <= limit:
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+    timestamps = [row[0] for row in rows]
+    values = [row[col] for row in rows]
+    return [
+        dict(zip(_COLUMNS, rows[i]))
+        for i in lttb_indices(timestamps, values, limit)
+    ]
+
+
+def bucket_readings(readings: list[dict], bucket_s: int) -> list[dict]:
+    """Aggregate reading dicts into *bucket_s*-second buckets.
+
+    In-memory counterpart of :meth:`HistoryStore.get_buckets`, producing the
+    same row shape.
+    """
+    rows = [tuple(reading[col] for col in _COLUMNS) for reading in readings]
+    buckets = _aggregate(rows, bucket_s)
+    return [_bucket_to_dict(buckets[bucket]) for bucket in sorted(buckets)]
+
+
+def _upsert_sql(table: str) -> str:
+    """Build the INSERT .. ON CONFLICT statement that folds a batch into *table*."""
+    placeholders = ', '.join('?' for _ in range(2 + 3 * len(_AGG_COLUMNS)))
+    updates = ',\n'.join(
+        f'{col}_min = MIN({col}_min, excluded.{col}_min), '
+        f'{col}_max = MAX({col}_max, excluded.{col}_max), '
+        f'{col}_sum = {col}_sum + excluded.{col}_sum'
+        for col in _AGG_COLUMNS
+    )
+    return f'''INSERT INTO {table} (bucket, n, {_ROLLUP_FIELDS})
+        VALUES ({placeholders})
+        ON CONFLICT(bucket) DO UPDATE SET
+            n = n + excluded.n,
+            {updates}'''
+
+
+_UPSERT_SQL = {table: _upsert_sql(table) for table in ROLLUP_TIERS.values()}
+
+
+def _aggregate(rows: list[tuple], width: int) -> dict[int, list]:
+    """Fold raw rows (in _COLUMNS order) into ``[bucket, n, min, max, sum, ...]``."""
+    buckets: dict[int, list] = {}
+    for row in rows:
+        bucket = int(row[0] // width) * width
+        agg = buckets.get(bucket)
+        if agg is None:
+            agg = [bucket, 0]
+            for value in row[1:]:
+                agg += [value, value, 0]
+            buckets[bucket] = agg
+        agg[1] += 1
+        for i, value in enumerate(row[1:]):
+            j = 2 + 3 * i
+            if value < agg[j]:
+                agg[j] = value
+            if value > agg[j + 1]:
+                agg[j + 1] = value
+            agg[j + 2] += value
+    return buckets
+
+
+def _merge_aggregates(stored: list, extra: dict[int, list]) -> list[list]:
+    """Merge stored aggregate rows with in-memory ones, ordered by bucket."""
+    merged = {row[0]: list(row) for row in stored}
+    for bucket, agg in extra.items():
+        base = merged.get(bucket)
+        if base is None:
+            merged[bucket] = agg
+            continue
+        base[1] += agg[1]
+        for j in range(2, len(base), 3):
+            base[j] = min(base[j], agg[j])
+            base[j + 1] = max(base[j + 1], agg[j + 1])
+            base[j + 2] += agg[j + 2]
+    return [merged[bucket] for bucket in sorted(merged)]
+
+
+def history_columns(fields: Iterable[str] | None) -> tuple[str, ...]:
+    """Validate a ``fields`` projection and return it in column order.
+
+    ``timestamp`` is always included; None selects every column.
+
+    Raises:
+        ValueError: For a name not in ``HISTORY_FIELDS``.
+    """
+    if fields is None:
+        return _COLUMNS
+    wanted = set(fields)
+    unknown = wanted.difference(_COLUMNS)
+    if unknown:
+        raise ValueError(f'Unknown history field(s): {", ".join(sorted(unknown))}')
+    return tuple(col for col in _COLUMNS if col == 'timestamp' or col in wanted)
+
+
+def bucket_columns(columns: tuple[str, ...]) -> tuple[str, ...]:
+    """``BUCKET_COLUMNS`` derived from the projected history *columns*."""
+    if columns == _COLUMNS:
+        return BUCKET_COLUMNS
+    return tuple(
+        name for name in BUCKET_COLUMNS
+        if name == 'count'
+        or (name[:-4] if name.endswith(('_min', '_max')) else name) in columns
+    )
+
+
+def _project(rows: list[tuple], columns: tuple[str, ...]) -> list[tuple]:
+    """Pick *columns* out of full ``_COLUMNS`` rows (buffered or archived)."""
+    if columns == _COLUMNS:
+        return list(rows)
+    index = [_COLUMNS.index(col) for col in columns]
+    return [tuple(row[i] for i in index) for row in rows]
+
+
+def _bucket_to_row(agg: list) -> tuple:
+    """Render an aggregate row as a tuple in ``BUCKET_COLUMNS`` order."""
+    n = agg[1]
+    row: list = [float(agg[0])]
+    for i, col in enumerate(_AGG_COLUMNS):
+        lo, hi, total = agg[2 + 3 * i:5 + 3 * i]
+        if col == 'storm_level':
+            # Worst condition seen in the bucket
+            row.append(int(hi))
+        else:
+            row += [total / n, lo, hi]
+    row.append(n)
+    return tuple(row)
+
+
+def _bucket_to_dict(agg: list) -> dict:
+    """Render an aggregate row in the /api/history reading shape."""
+    return dict(zip(BUCKET_COLUMNS, _bucket_to_row(agg)))
@@ -6,8 +6,12 @@ import threading
 import time
 
 from storm_sense.config import (
+    API_BACKLOG,
     API_HOST,
+    API_KEEPALIVE_S,
     API_PORT,
+    API_THREADS,
+    OVERSAMPLE_FACTOR,
     SAMPLE_INTERVAL_S,
     DisplayMode,
     StormLevel,
@@ -15,6 +19,8 @@ from storm_sense.config import (
 from storm_sense.sensor_service import SensorService
 from storm_sense.hat_interface import HATInterface
 from storm_sense.api_server import ApiServer
+from storm_sense.metrics import histogram, total
+from storm_sense.scheduler import TickScheduler
 
 logging.basicConfig(
     level=logging.INFO,
@@ -22,16 +28,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Longest queued HAT work is one three-note alert (~0.8 s)
+_HAT_DRAIN_TIMEOUT_S = 2.0
+
+_LOOP_LAG_SECONDS = histogram(
+    'stormsense_sensor_loop_lag_seconds',
+    'How late each sensor tick started after its scheduled deadline.',
+)
+_LOOP_TICKS = total(
+    'stormsense_sensor_loop_ticks_total',
+    'Sensor loop ticks: run, missed (skipped deadlines) and overrun.',
+    ('outcome',),
+)
+
 
 class StormSenseApp:
     """Main application orchestrator."""
 
     def __init__(self):
-        self._sensor = SensorService()
+        self._sensor = SensorService(oversample=OVERSAMPLE_FACTOR)
         self._hat = HATInterface()
         self._api = ApiServer(self._sensor)
         self._shutdown_event = threading.Event()
         self._sensor_thread: threading.Thread | None = None
+        # One tick per sub-sample; every OVERSAMPLE_FACTOR-th yields a reading
+        self._ticks = TickScheduler(
+            SAMPLE_INTERVAL_S / self._sensor.oversample, self._shutdown_event,
+        )
         self._previous_storm_level = StormLevel.FAIR
 
         self._wire_buttons()
@@ -41,18 +64,18 @@ class StormSenseApp:
 
         def on_button_a():
             self._sensor.display_mode = DisplayMode.TEMPERATURE
-            self._hat.show_temperature(self._sensor.temperature_f)
+            self._hat.show_temperature(self._sensor.state.temperature_f)
             logger.info('Button A: Temperature mode')
 
         def on_button_b():
             self._sensor.display_mode = DisplayMode.PRESSURE
-            self._hat.show_pressure(self._sensor.pressure)
+            self._hat.show_pressure(self._sensor.state.pressure)
             logger.info('Button B: Pressure mode')
 
         def on_button_c():
             self._sensor.reset_history()
             self._sensor.display_mode = DisplayMode.STORM_LEVEL
-            self._hat.show_storm_level(self._sensor.storm_level)
+            self._hat.show_storm_level(self._sensor.state.storm_level)
             logger.info('Button C: Reset history, Storm Level mode')
 
         self._hat.on_button_a = on_button_a
@@ -61,70 +84,97 @@ class StormSenseApp:
 
     def _sensor_loop(self) -> None:
         """Background thread: read sensor and update display every SAMPLE_INTERVAL_S."""
-        logger.info('Sensor loop started (interval: %ds)', SAMPLE_INTERVAL_S)
-        while not self._shutdown_event.is_set():
+        logger.info(
+            'Sensor loop started (interval: %ds, %d sub-samples per reading)',
+            SAMPLE_INTERVAL_S, self._sensor.oversample,
+        )
+        ticks = self._ticks
+        while ticks.wait_next():
+            self._record_tick()
             try:
+                if not self._sensor.sample():
+                    continue
                 self._sensor.read()
-
-                # Check for storm escalation
-                current_level = self._sensor.storm_level
-                if current_level > self._previous_storm_level:
-                    logger.warning(
-                        'Storm escalation: %s -> %s',
-                        self._previous_storm_level.name,
-                        current_level.name,
-                    )
-                    self._hat.buzz_alert(current_level)
-                self._previous_storm_level = current_level
-
-                # Update LEDs
-                self._hat.update_leds(current_level)
-
-                # Update display based on current mode
-                mode = self._sensor.display_mode
-                if mode == DisplayMode.TEMPERATURE:
-                    self._hat.show_temperature(self._sensor.temperature_f)
-                elif mode == DisplayMode.PRESSURE:
-                    self._hat.show_pressure(self._sensor.pressure)
-                elif mode == DisplayMode.STORM_LEVEL:
-                    self._hat.show_storm_level(current_level)
-
-                logger.info(
-                    'Reading: %.1f°F (%.1f°C), %.1f hPa, %s',
-                    self._sensor.temperature_f,
-                    self._sensor.temperature,
-                    self._sensor.pressure,
-                    current_level.name,
-                )
-
+                self._show_reading()
             except Exception:
                 logger.exception('Error in sensor loop')
                 self._hat.show_text('ERR ')
 
-            self._shutdown_event.wait(SAMPLE_INTERVAL_S)
+    def _record_tick(self) -> None:
+        """Copy the scheduler's lateness and tick counts into the metrics."""
+        ticks = self._ticks
+        _LOOP_LAG_SECONDS.observe(ticks.last_jitter_s)
+        stats = ticks.stats
+        _LOOP_TICKS.set(stats['ticks'], 'run')
+        _LOOP_TICKS.set(stats['missed'], 'missed')
+        _LOOP_TICKS.set(stats['overruns'], 'overrun')
+
+    def _show_reading(self) -> None:
+        """Alert on escalation and show the latest reading on the HAT."""
+        # One consistent reading, even if a button press lands now
+        state = self._sensor.state
+
+        # Check for storm escalation
+        current_level = state.storm_level
+        if current_level > self._previous_storm_level:
+            logger.warning(
+                'Storm escalation: %s -> %s',
+                self._previous_storm_level.name,
+                current_level.name,
+            )
+            self._hat.buzz_alert(current_level)
+        self._previous_storm_level = current_level
+
+        # Update LEDs
+        self._hat.update_leds(current_level)
+
+        # Update display based on current mode
+        mode = state.display_mode
+        if mode == DisplayMode.TEMPERATURE:
+            self._hat.show_temperature(state.temperature_f)
+        elif mode == DisplayMode.PRESSURE:
+            self._hat.show_pressure(state.pressure)
+        elif mode == DisplayMode.STORM_LEVEL:
+            self._hat.show_storm_level(current_level)
+
+        logger.info(
+            'Reading: %.1f°F (%.1f°C), %.1f hPa, %s',
+            state.temperature_f,
+            state.temperature,
+            state.pressure,
+            current_level.name,
+        )
+
+    def _initial_reading(self) -> None:
+        """Take a first reading at startup so the HAT isn't blank."""
+        try:
+            self._sensor.read()
+            state = self._sensor.state
+            self._hat.update_leds(state.storm_level)
+            self._hat.show_temperature(state.temperature_f)
+        except Exception:
+            logger.exception('Failed initial sensor read')
+            self._hat.show_text('ERR ')
 
     def _handle_signal(self, signum, frame) -> None:
         """Handle SIGINT/SIGTERM for clean shutdown."""
         sig_name = signal.Signals(signum).name
         logger.info('Received %s, shutting down...', sig_name)
         self._shutdown_event.set()
+        # stop() waits for the serve loop, which runs in this thread
+        threading.Thread(target=self._api.stop, daemon=True).start()
 
     def run(self) -> None:
-        """Start StormSense: sensor loop + Flask API."""
+        """Start StormSense: sensor loop + API server."""
         signal.signal(signal.SIGINT, self._handle_signal)
         signal.signal(signal.SIGTERM, self._handle_signal)
 
+        # HAT writes (and alert tones) run off the sensor loop from here on
+        self._hat.start_worker()
         self._hat.show_text('INIT')
         logger.info('StormSense starting...')
 
-        # Initial reading
-        try:
-            self._sensor.read()
-            self._hat.update_leds(self._sensor.storm_level)
-            self._hat.show_temperature(self._sensor.temperature_f)
-        except Exception:
-            logger.exception('Failed initial sensor read')
-            self._hat.show_text('ERR ')
+        self._initial_reading()
 
         # Start sensor loop in background
         self._sensor_thread = threading.Thread(
@@ -132,14 +182,24 @@ class StormSenseApp:
         )
         self._sensor_thread.start()
 
-        # Run Flask in main thread
-        logger.info('API server starting on %s:%d', API_HOST, API_PORT)
+        # Serve the API in the main thread
+        logger.info(
+            'API server starting on %s:%d (%d threads)',
+            API_HOST, API_PORT, API_THREADS,
+        )
         try:
-            self._api.run(host=API_HOST, port=API_PORT)
+            self._api.serve(
+                host=API_HOST,
+                port=API_PORT,
+                threads=API_THREADS,
+                backlog=API_BACKLOG,
+                keepalive_s=API_KEEPALIVE_S,
+            )
         except Exception:
             logger.exception('API server error')
         finally:
             self._shutdown_event.set()
+            self._api.close()
             if self._sensor_thread is not None:
                 self._sensor_thread.join(timeout=SAMPLE_INTERVAL_S + 2)
                 if self._sensor_thread.is_alive():
@@ -147,10 +207,15 @@ class StormSenseApp:
                         'Sensor thread did not exit in time; '
                         'skipping store close to avoid race'
                     )
+                    # flush() is lock-protected, so buffered readings
+                    # are still persisted
+                    self._sensor.flush()
                 else:
                     self._sensor.close()
             else:
                 self._sensor.close()
+            # Let a queued alert finish, then blank the HAT inline
+            self._hat.stop_worker(timeout=_HAT_DRAIN_TIMEOUT_S)
             self._hat.clear_all()
             logger.info('StormSense shutdown complete')
 
@@ -0,0 +1,261 @@
+"""Process-wide counters, gauges and histograms for ``/api/metrics``.
+
+A deliberately small subset of the Prometheus client model, rendered in the
+text exposition format (version 0.0.4), with no extra dependency.  Each
+metric is created once at import time by the module that records it and
+registered in :data:`REGISTRY`.
+
+Recording is a dict lookup, a bisect and a few additions under a per-metric
+lock: about 1 µs on a desktop CPU and about 10 µs on a Pi 3B.  A
+request records three values and a sensor reading under ten, so collection
+stays on in production.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Sequence
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; spans a cached response (~0.5 ms) up to a slow SD-card flush
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+# Bytes; powers of four from a 304 up to a 5000-row uncompressed history
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(8))
+
+
+class _Metric:
+    """Shared bookkeeping: name, help text, label names and a lock."""
+
+    kind = ''
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _check(self, labels: tuple) -> None:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f'{self.name} takes labels {self.labelnames}, got {labels!r}',
+            )
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {_escape_help(self.help)}',
+                 f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def _labels(self, values: tuple, extra: str = '') -> str:
+        pairs = [
+            f'{name}="{_escape_value(str(value))}"'
+            for name, value in zip(self.labelnames, values)
+        ]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter(_Metric):
+    """Monotonically increasing total, optionally per label set."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            value = self._values.get(labels)
+            if value is None:
+                self._check(labels)
+                value = 0.0
+            self._values[labels] = value + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{self._labels(k)} {_num(v)}' for k, v in items]
+
+
+class Gauge(_Metric):
+    """Point-in-time value, usually refreshed right before rendering."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def set(self, value: float, *labels) -> None:
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{self._labels(k)} {_num(v)}' for k, v in items]
+
+
+class Total(Gauge):
+    """A counter kept by another component, copied in at scrape time."""
+
+    kind = 'counter'
+
+
+class Histogram(_Metric):
+    """Bucketed distribution with sum and count, optionally per label set."""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last)..., sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                self._check(labels)
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *labels) -> Iterator[None]:
+        """Observe the wall time spent inside the ``with`` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def timed(self, *labels) -> Callable[[Callable], Callable]:
+        """Decorator form of :meth:`time`."""
+        def decorate(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, *labels)
+            return wrapper
+        return decorate
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[:-1]) if series else 0
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for labels, series in items:
+            running = 0
+            bounds = [_num(b) for b in self.buckets] + ['+Inf']
+            for bound, n in zip(bounds, series):
+                running += n
+                le = self._labels(labels, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{le} {running}')
+            lines.append(f'{self.name}_sum{self._labels(labels)} {_num(series[-1])}')
+            lines.append(f'{self.name}_count{self._labels(labels)} {running}')
+        return lines
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Duplicate metric: {metric.name}')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Create a :class:`Counter` in :data:`REGISTRY`."""
+    return REGISTRY.register(Counter(name, help, labelnames))
+
+
+def gauge(name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Create a :class:`Gauge` in :data:`REGISTRY`."""
+    return REGISTRY.register(Gauge(name, help, labelnames))
+
+
+def total(name: str, help: str, labelnames: Sequence[str] = ()) -> Total:
+    """Create a :class:`Total` in :data:`REGISTRY`."""
+    return REGISTRY.register(Total(name, help, labelnames))
+
+
+def histogram(
+    name: str,
+    help: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = LATENCY_BUCKETS,
+) -> Histogram:
+    """Create a :class:`Histogram` in :data:`REGISTRY`."""
+    return REGISTRY.register(Histogram(name, help, labelnames, buckets))
+
+
+def _num(value: float) -> str:
+    """Sample value: integers without a trailing ``.0``."""
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', r'\\').replace('\n', r'\n')
+
+
+def _escape_value(text: str) -> str:
+    return text.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
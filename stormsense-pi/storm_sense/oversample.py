@@ -0,0 +1,127 @@
+"""Oversampling -- several sensor sub-samples reduced to one reading.
+
+The BMP280 is read several times per ``SAMPLE_INTERVAL_S`` and each window of
+sub-samples is reduced to a single value per channel before it is stored, so
+pressure deltas are less noisy without more SQLite rows or bigger payloads.
+
+Each channel's sub-samples go into a preallocated typed array
+(:class:`SubsampleWindow`), so taking one creates nothing but the float the
+sensor driver returns.  The reducers run once per window:
+
+* ``median`` -- the middle value; ignores up to half the window as outliers.
+* ``mad_mean`` -- mean of the values within ``MAD_REJECT_K`` scaled median
+  absolute deviations of the median: an adaptive trimmed mean that keeps the
+  averaging benefit while dropping spikes.  The MAD is never taken below the
+  channel's *noise floor* (its sensor resolution): quantized readings often
+  have a MAD of zero, and a value one step away is noise, not an outlier.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Callable, Sequence
+
+# Values further than this many (normal-scaled) MADs from the median are
+# dropped by mad_mean; 3.5 is the usual modified z-score cut-off.
+MAD_REJECT_K = 3.5
+# MAD * 1.4826 estimates the standard deviation of normal noise
+_MAD_SCALE = 1.4826
+
+
+def median(values: Sequence[float], noise_floor: float = 0.0) -> tuple[float, int]:
+    """``(median, 0)`` -- nothing is counted as rejected."""
+    return _median_sorted(sorted(values)), 0
+
+
+def mad_mean(values: Sequence[float], noise_floor: float = 0.0) -> tuple[float, int]:
+    """``(mean of inliers, number of outliers rejected)``.
+
+    The MAD is raised to at least *noise_floor*.  Windows of fewer than
+    three values are averaged as they are; there is no meaningful spread to
+    judge outliers by.
+    """
+    n = len(values)
+    if n < 3:
+        return sum(values) / n, 0
+    ordered = sorted(values)
+    middle = _median_sorted(ordered)
+    mad = _median_sorted(sorted(abs(v - middle) for v in ordered))
+    limit = MAD_REJECT_K * _MAD_SCALE * max(mad, noise_floor)
+    total = 0.0
+    kept = 0
+    for v in ordered:
+        if abs(v - middle) <= limit:
+            total += v
+            kept += 1
+    return total / kept, n - kept
+
+
+REDUCERS: dict[str, Callable[[Sequence[float], float], tuple[float, int]]] = {
+    'median': median,
+    'mad_mean': mad_mean,
+}
+
+
+class SubsampleWindow:
+    """Preallocated sub-sample buffer for one channel.
+
+    Args:
+        size: Sub-samples per window.
+        reducer: Name in :data:`REDUCERS`.
+        noise_floor: Smallest spread treated as real (e.g. the sensor's
+            resolution); passed to the reducer.
+    """
+
+    def __init__(
+        self, size: int, reducer: str = 'mad_mean', noise_floor: float = 0.0,
+    ) -> None:
+        if size < 1:
+            raise ValueError('size must be at least 1')
+        if reducer not in REDUCERS:
+            raise ValueError(f'Unknown reducer: {reducer!r}')
+        self._size = size
+        self._reduce = REDUCERS[reducer]
+        self._noise_floor = noise_floor
+        self._values = array('d', [0.0]) * size
+        self._count = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        return self._count >= self._size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, value: float) -> bool:
+        """Store one sub-sample.  True once full.
+
+        A sub-sample added to a full window replaces the newest one, so a
+        late :meth:`reduce` never reads past the buffer.
+        """
+        i = min(self._count, self._size - 1)
+        self._values[i] = value
+        self._count = i + 1
+        return self._count >= self._size
+
+    def reduce(self) -> tuple[float, int]:
+        """Reduce and empty the window: ``(value, rejected)``."""
+        n = self._count
+        if n == 0:
+            raise ValueError('no sub-samples to reduce')
+        self._count = 0
+        return self._reduce(memoryview(self._values)[:n], self._noise_floor)
+
+    def clear(self) -> None:
+        self._count = 0
+
+
+def _median_sorted(ordered: Sequence[float]) -> float:
+    n = len(ordered)
+    mid = n // 2
+    if n % 2:
+        return ordered[mid]
+    return (ordered[mid - 1] + ordered[mid]) / 2.0
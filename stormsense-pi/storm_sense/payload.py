@@ -0,0 +1,109 @@
+"""EncodedPayload — a JSON body encoded and compressed once, served many times.
+
+Responses that change on a fixed cadence (the status after every sample)
+are serialised once per change instead of once per request.  The gzip and
+brotli variants are built at the same time, so handing a client its
+preferred encoding is a lookup rather than a compression pass.
+
+:func:`compress` and :class:`IncrementalGzip` are the same codecs for
+bodies compressed on demand (the history response cache).
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import zlib
+from typing import NamedTuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Same defaults as Flask-Compress, so bodies match what it would produce
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+# Content codings we can produce, in server preference order
+CODINGS: tuple[str, ...] = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+class EncodedPayload(NamedTuple):
+    """Immutable encoded JSON body for one data version.
+
+    *encoded* holds ``(content-coding, body)`` pairs in preference order,
+    only for codings that actually came out smaller than *body*.
+    """
+
+    version: int
+    body: bytes
+    encoded: tuple[tuple[str, bytes], ...]
+
+    def select(self, accept_encodings) -> tuple[str | None, bytes]:
+        """Pick ``(coding, body)`` for an ``Accept-Encoding`` header.
+
+        *accept_encodings* is werkzeug's parsed header
+        (``request.accept_encodings``); coding None means identity.
+        """
+        for coding, body in self.encoded:
+            if accept_encodings[coding]:
+                return coding, body
+        return None, self.body
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    """Compress *body* with one of :data:`CODINGS`."""
+    if coding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if coding == 'gzip':
+        return gzip.compress(body, GZIP_LEVEL, mtime=0)
+    raise ValueError(f'Unsupported content coding: {coding!r}')
+
+
+def encode_payload(data: object, version: int) -> EncodedPayload:
+    """Serialise *data* to compact JSON and pre-compress it."""
+    body = json.dumps(data, separators=(',', ':')).encode()
+    encoded = ((coding, compress(body, coding)) for coding in CODINGS)
+    return EncodedPayload(
+        version,
+        body,
+        tuple((coding, data) for coding, data in encoded if len(data) < len(body)),
+    )
+
+
+class IncrementalGzip:
+    """gzip stream of a body that only ever grows just before its last byte.
+
+    Built for JSON arrays gaining elements at the end: everything but the
+    closing ``]`` goes through one deflate stream, and :meth:`finish`
+    completes a *copy* of that stream.  Appending a reading then costs
+    compressing the reading alone, not the whole body again.  Not
+    thread-safe; callers serialise access.
+
+    Args:
+        body: The current body; its last byte is held back.
+    """
+
+    def __init__(self, body: bytes) -> None:
+        self._tail = body[-1:]
+        # wbits 31: gzip container, so the output is a complete .gz member
+        self._stream = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        self._out = [self._stream.compress(body[:-1])]
+        self._size = len(self._out[0])
+
+    @property
+    def size(self) -> int:
+        """Compressed bytes held so far."""
+        return self._size
+
+    def append(self, data: bytes) -> None:
+        """Insert *data* before the held-back last byte."""
+        chunk = self._stream.compress(data)
+        if chunk:
+            self._out.append(chunk)
+            self._size += len(chunk)
+
+    def finish(self) -> bytes:
+        """The complete gzip body for everything appended so far."""
+        stream = self._stream.copy()
+        return b''.join(self._out) + stream.compress(self._tail) + stream.flush()
@@ -0,0 +1,266 @@
+"""ResponseCache — size-bounded LRU of serialised history responses.
+
+Phones on the same station tend to ask for the same history windows.  The
+API keeps the encoded JSON body of each distinct query here, tagged with
+the sensor service's history version, so repeat requests skip SQLite and
+``json.dumps`` entirely.
+
+When a reading arrives, each entry is dealt with according to how the new
+reading affects it:
+
+* ``APPEND`` — the response is a plain list of readings newer than some
+  timestamp with room left under its limit; the reading is spliced onto
+  the end of the encoded body.
+* ``KEEP`` — the response cannot change when readings are appended (e.g. a
+  full ``after_id`` page); the entry simply moves to the new version.
+* ``DROP`` — anything else (latest-N windows, buckets, LTTB) is evicted.
+
+Entries whose version no longer matches (history reset, a missed
+reading) are never served.
+
+Compressed variants of a body are built on first request for that coding
+and kept with the entry (counted against the same byte budget) until the
+body changes, so each distinct payload is compressed once per coding.
+Large ``APPEND`` bodies keep their gzip stream open instead: a new reading
+is compressed on its own and the stream is finished on a copy.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Hashable
+
+from storm_sense.payload import IncrementalGzip, compress
+
+HISTORY_CACHE_MAX_BYTES = 8 * 1024 * 1024
+HISTORY_CACHE_MAX_ENTRIES = 128
+
+# What happens to an entry when a reading is appended
+APPEND = 'append'
+KEEP = 'keep'
+DROP = 'drop'
+
+# Rough per-entry bookkeeping cost (key tuple, entry object, dict slot)
+_ENTRY_OVERHEAD = 200
+# Memory held by an open deflate stream (window + hash tables at level 6)
+_GZIP_STREAM_OVERHEAD = 256 * 1024
+# Smaller APPEND bodies are simply recompressed; it is cheaper than the stream
+INCREMENTAL_GZIP_MIN_BYTES = 64 * 1024
+
+
+class _Entry:
+    def __init__(
+        self, body: bytes, version: int, policy: str,
+        since: float, room: int, last_ts: float,
+    ) -> None:
+        self.body = body
+        self.version = version
+        self.policy = policy
+        self.since = since
+        self.room = room
+        self.last_ts = last_ts
+        # coding -> compressed body, or None when it came out no smaller
+        self.encoded: dict[str, bytes | None] = {}
+        self.gzip: IncrementalGzip | None = None
+        self.size = 0
+
+    def measure(self) -> int:
+        """Bytes charged to the cache for this entry."""
+        size = len(self.body) + _ENTRY_OVERHEAD
+        size += sum(len(data) for data in self.encoded.values() if data)
+        if self.gzip is not None:
+            size += self.gzip.size + _GZIP_STREAM_OVERHEAD
+        return size
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded response bodies keyed by normalised query.
+
+    Args:
+        max_bytes: Upper bound on the summed size of cached bodies.
+        max_entries: Upper bound on the number of cached queries.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = HISTORY_CACHE_MAX_BYTES,
+        max_entries: int = HISTORY_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self._max_bytes = max_bytes
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._appended = 0
+        self._invalidated = 0
+        self._compressions = 0
+
+    def get(self, key: Hashable, version: int) -> bytes | None:
+        """Cached body for *key* if it is current for *version*."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version != version:
+                self._remove(key)
+                self._invalidated += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.body
+
+    def put(
+        self,
+        key: Hashable,
+        body: bytes,
+        version: int,
+        policy: str = DROP,
+        since: float = 0.0,
+        room: int = 0,
+        last_ts: float = 0.0,
+    ) -> None:
+        """Store *body*, produced while the data was at *version*.
+
+        For ``APPEND`` entries, *since* is the query's lower timestamp
+        bound, *room* how many more rows fit under its limit and *last_ts*
+        the newest timestamp already in the body.
+        """
+        if len(body) + _ENTRY_OVERHEAD > self._max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            entry = _Entry(body, version, policy, since, room, last_ts)
+            self._entries[key] = entry
+            self._resize(entry)
+            self._evict()
+
+    def get_encoded(self, key: Hashable, version: int, coding: str) -> bytes | None:
+        """The body for *key* at *version* compressed with *coding*.
+
+        Compresses on first use and keeps the result until the body
+        changes.  Returns None when *key* is not cached at *version*, or
+        when *coding* does not make the body any smaller.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            if coding in entry.encoded:
+                return entry.encoded[coding]
+            if coding == 'gzip' and entry.gzip is not None:
+                data = self._store_encoded(entry, coding, entry.gzip.finish())
+                self._evict()
+                return data
+            body = entry.body
+        # Compress outside the lock; a racing request may repeat the work
+        stream = None
+        if (
+            coding == 'gzip' and entry.policy == APPEND
+            and len(body) >= INCREMENTAL_GZIP_MIN_BYTES
+        ):
+            stream = IncrementalGzip(body)
+            data = stream.finish()
+        else:
+            data = compress(body, coding)
+        with self._lock:
+            self._compressions += 1
+            if self._entries.get(key) is not entry or entry.body is not body:
+                # Changed meanwhile; still the right bytes for *version*
+                return data if len(data) < len(body) else None
+            if stream is not None and entry.gzip is None:
+                entry.gzip = stream
+            data = self._store_encoded(entry, coding, data)
+            self._evict()
+            return data
+
+    def on_append(self, reading: dict, encoded: bytes, version: int) -> None:
+        """Bring entries up to *version* after *reading* was appended.
+
+        *encoded* is the reading's JSON encoding, spliced into ``APPEND``
+        entries as is.  Entries already at *version* were produced after
+        the reading landed and are left alone.
+        """
+        ts = reading['timestamp']
+        with self._lock:
+            for key in list(self._entries):
+                entry = self._entries[key]
+                if entry.version == version:
+                    continue
+                if entry.version != version - 1 or entry.policy == DROP:
+                    self._remove(key)
+                    self._invalidated += 1
+                    continue
+                if entry.policy == APPEND and ts > entry.since and ts > entry.last_ts:
+                    if entry.room <= 0:
+                        # Over the limit the query switches to buckets
+                        self._remove(key)
+                        self._invalidated += 1
+                        continue
+                    sep = b'' if entry.body == b'[]' else b','
+                    entry.body = entry.body[:-1] + sep + encoded + b']'
+                    entry.encoded.clear()
+                    if entry.gzip is not None:
+                        entry.gzip.append(sep + encoded)
+                    self._resize(entry)
+                    entry.room -= 1
+                    entry.last_ts = ts
+                    self._appended += 1
+                entry.version = version
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Hit rate and memory use, for sizing the cache."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self._max_bytes,
+                'max_entries': self._max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'appended': self._appended,
+                'invalidated': self._invalidated,
+                'compressions': self._compressions,
+            }
+
+    # ── Private helpers ─────────────────────────────────────────
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _resize(self, entry: _Entry) -> None:
+        """Re-measure *entry* after its contents changed."""
+        size = entry.measure()
+        self._bytes += size - entry.size
+        entry.size = size
+
+    def _store_encoded(self, entry: _Entry, coding: str, data: bytes) -> bytes | None:
+        """Keep *data* as *entry*'s *coding* variant if it saves anything."""
+        kept = data if len(data) < len(entry.body) else None
+        entry.encoded[coding] = kept
+        self._resize(entry)
+        return kept
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until both bounds hold."""
+        while self._entries and (
+            self._bytes > self._max_bytes
+            or len(self._entries) > self._max_entries
+        ):
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
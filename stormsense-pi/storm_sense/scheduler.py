@@ -0,0 +1,145 @@
+"""TickScheduler -- fixed-rate ticks on absolute monotonic deadlines.
+
+Sleeping for the interval after each tick's work makes the period
+``interval + work``, so a 5 s loop slowly falls behind and a fixed-size
+window of samples covers more wall time than intended.  The scheduler instead
+keeps a grid of deadlines ``start + n * interval`` and sleeps until the next
+one, so the work time never accumulates.
+
+When a tick's work runs past the next deadline (an *overrun*), the next tick
+starts immediately.  If one or more whole deadlines went by in the meantime,
+they are counted as *missed* and skipped rather than run back to back, and
+the grid keeps its original phase.
+
+:meth:`TickScheduler.wait_next` blocks its thread; an event loop awaits
+:meth:`TickScheduler.wait_next_async` instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Callable
+
+
+class TickScheduler:
+    """Wait for evenly spaced ticks, tracking lateness.
+
+    Args:
+        interval_s: Seconds between tick deadlines.
+        stop_event: Set to end :meth:`wait_next` early; a private event is
+            used when omitted.
+        clock: Monotonic clock in seconds (for tests).
+
+    Typical use::
+
+        ticks = TickScheduler(SAMPLE_INTERVAL_S, stop_event)
+        while ticks.wait_next():
+            do_work()
+    """
+
+    def __init__(
+        self,
+        interval_s: float,
+        stop_event: threading.Event | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if interval_s <= 0:
+            raise ValueError(f'interval_s must be positive, got {interval_s!r}')
+        self._interval = float(interval_s)
+        self._stop = stop_event if stop_event is not None else threading.Event()
+        self._clock = clock
+        self._deadline: float | None = None
+        self._ticks = 0
+        self._missed = 0
+        self._overruns = 0
+        self._last_jitter = 0.0
+        self._max_jitter = 0.0
+        self._total_jitter = 0.0
+
+    @property
+    def interval_s(self) -> float:
+        return self._interval
+
+    @property
+    def last_jitter_s(self) -> float:
+        """How late the most recent tick started after its deadline."""
+        return self._last_jitter
+
+    @property
+    def stats(self) -> dict:
+        """Tick counts and start-time jitter so far.
+
+        Keys: ``ticks``, ``missed`` (deadlines skipped entirely),
+        ``overruns`` (ticks whose work ran past the next deadline),
+        ``last_jitter_s``, ``max_jitter_s`` and ``mean_jitter_s``.
+        """
+        return {
+            'ticks': self._ticks,
+            'missed': self._missed,
+            'overruns': self._overruns,
+            'last_jitter_s': self._last_jitter,
+            'max_jitter_s': self._max_jitter,
+            'mean_jitter_s': self._total_jitter / self._ticks if self._ticks else 0.0,
+        }
+
+    def stop(self) -> None:
+        """Make the current and every later :meth:`wait_next` return False."""
+        self._stop.set()
+
+    def wait_next(self) -> bool:
+        """Sleep until the next deadline.  False once stopped.
+
+        The first call returns immediately and fixes the grid's phase.
+        """
+        if self._stop.is_set():
+            return False
+        delay = self._advance()
+        while delay > 0:
+            if self._stop.wait(delay):
+                return False
+            delay = self._deadline - self._clock()
+        self._record(-delay)
+        return True
+
+    async def wait_next_async(self) -> bool:
+        """:meth:`wait_next` for an event loop: sleeps without a thread.
+
+        The stop event is checked when each sleep ends, so stopping takes
+        effect within one interval.
+        """
+        if self._stop.is_set():
+            return False
+        delay = self._advance()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            if self._stop.is_set():
+                return False
+            delay = self._deadline - self._clock()
+        self._record(-delay)
+        return True
+
+    # ── Private helpers ─────────────────────────────────────────
+
+    def _advance(self) -> float:
+        """Move to the next deadline; seconds until it (<= 0 when late)."""
+        now = self._clock()
+        if self._deadline is None:
+            self._deadline = now
+            return 0.0
+        self._deadline += self._interval
+        if now > self._deadline:
+            self._overruns += 1
+            skipped = int((now - self._deadline) // self._interval)
+            if skipped:
+                self._missed += skipped
+                self._deadline += skipped * self._interval
+        return self._deadline - now
+
+    def _record(self, jitter: float) -> None:
+        self._ticks += 1
+        self._last_jitter = jitter
+        self._total_jitter += jitter
+        if jitter > self._max_jitter:
+            self._max_jitter = jitter
@@ -3,8 +3,12 @@
 from __future__ import annotations
 
 import logging
+import os
+import threading
 import time
-from collections import deque
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Iterable, NamedTuple
 
 try:
     import rainbowhat as rh
@@ -16,13 +20,31 @@ from storm_sense.config import (
     DRY_THRESHOLD,
     DisplayMode,
     HISTORY_MAX_SAMPLES,
+    OVERSAMPLE_NOISE_FLOOR_CPU_C,
+    OVERSAMPLE_NOISE_FLOOR_PRESSURE_HPA,
+    OVERSAMPLE_NOISE_FLOOR_TEMPERATURE_C,
+    OVERSAMPLE_REDUCER,
     SESSION_LOG_MAX,
     STORM_SEVERE_THRESHOLD,
     STORM_WARNING_THRESHOLD,
     STORM_WATCH_THRESHOLD,
     StormLevel,
 )
-from storm_sense.history_store import HistoryStore, DEFAULT_DB_PATH
+from storm_sense.frame import RowFrame
+from storm_sense.history_store import (
+    BUCKET_COLUMNS,
+    DEFAULT_DB_PATH,
+    HistoryStore,
+    bucket_columns,
+    bucket_readings,
+    history_columns,
+    lttb_rows,
+)
+from storm_sense.metrics import counter, histogram
+from storm_sense.oversample import SubsampleWindow
+from storm_sense.payload import EncodedPayload, encode_payload
+from storm_sense.ring_buffer import ColumnarRing, RingView
+from storm_sense.snapshot import encode_snapshot, load_snapshot, write_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -32,117 +54,648 @@ CPU_TEMP_FALLBACK = 45.0
 CPU_TEMP_EMA_ALPHA = 0.1
 TEMP_EMA_ALPHA = 0.3
 
+# Column layout of the in-memory logs (matches the history_store schema)
+SESSION_LOG_FIELDS = (
+    ('timestamp', 'd'),
+    ('temperature', 'd'),
+    ('temperature_f', 'd'),
+    ('raw_temperature', 'd'),
+    ('pressure', 'd'),
+    ('storm_level', 'b'),
+)
+PRESSURE_HISTORY_FIELDS = (('timestamp', 'd'), ('pressure', 'd'))
+
+# In-memory state is snapshotted next to the database so restarts skip the
+# full SQLite reseed.  Older snapshots fall back to SQLite.
+SNAPSHOT_SUFFIX = '.snapshot'
+SNAPSHOT_INTERVAL_S = 600
+SNAPSHOT_MAX_AGE_S = 3600
+
+_READ_SECONDS = histogram(
+    'stormsense_sensor_read_seconds',
+    'SensorService.read() time per phase.',
+    ('phase',),
+)
+_SUBSAMPLE_SECONDS = histogram(
+    'stormsense_sensor_subsample_seconds',
+    'Sensor I/O time per oversampled sub-sample.',
+)
+_OUTLIERS = counter(
+    'stormsense_sensor_outliers_total',
+    'Sub-sample values rejected as outliers.',
+)
+
+
+class SensorState(NamedTuple):
+    """The service state after one change, published as a single object.
+
+    :class:`SensorService` never mutates one; every reading, display mode
+    change or reset swaps in a new one with a single reference assignment.
+    Any thread can read ``service.state`` without locking and see every
+    field from the same reading.
+    """
+
+    version: int
+    history_version: int
+    last_modified: float
+    temperature: float
+    temperature_f: float
+    raw_temperature: float
+    pressure: float
+    storm_level: StormLevel
+    pressure_delta_3h: float | None
+    samples_collected: int
+    display_mode: DisplayMode
+
+    def to_status(self) -> dict:
+        """The /api/status contract."""
+        return {
+            'temperature': self.temperature,
+            'temperature_f': self.temperature_f,
+            'raw_temperature': self.raw_temperature,
+            'pressure': self.pressure,
+            'storm_level': int(self.storm_level),
+            'storm_label': self.storm_level.name,
+            'samples_collected': self.samples_collected,
+            'history_full': self.samples_collected == HISTORY_MAX_SAMPLES,
+            'display_mode': self.display_mode.name,
+            'pressure_delta_3h': self.pressure_delta_3h,
+        }
+
+
+_INITIAL_STATE = SensorState(
+    version=0,
+    history_version=0,
+    last_modified=0.0,
+    temperature=0.0,
+    temperature_f=32.0,
+    raw_temperature=0.0,
+    pressure=0.0,
+    storm_level=StormLevel.FAIR,
+    pressure_delta_3h=None,
+    samples_collected=0,
+    display_mode=DisplayMode.TEMPERATURE,
+)
+
 
 class SensorService:
-    """Reads BMP280 via Rainbow HAT, calibrates temperature, detects storms."""
-
-    def __init__(self, db_path: str = DEFAULT_DB_PATH) -> None:
-        self.temperature: float = 0.0
-        self.temperature_f: float = 32.0
-        self.raw_temperature: float = 0.0
-        self.pressure: float = 0.0
-        self.storm_level: StormLevel = StormLevel.FAIR
-        self.pressure_delta_3h: float | None = None
-        self.display_mode: DisplayMode = DisplayMode.TEMPERATURE
-
-        self._pressure_history: deque[tuple[float, float]] = deque(
-            maxlen=HISTORY_MAX_SAMPLES,
+    """Reads BMP280 via Rainbow HAT, calibrates temperature, detects storms.
+
+    The current state is a frozen :class:`SensorState` (see :attr:`state`).
+    Writers (the sensor loop, button callbacks) serialize on
+    ``_write_lock``; readers never take it.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        snapshot_path: str | None = None,
+        oversample: int = 1,
+        reducer: str = OVERSAMPLE_REDUCER,
+    ) -> None:
+        # Replaced whole on every state change; its version drives HTTP
+        # cache validators
+        self._state = _INITIAL_STATE
+        # Held by writers only: read(), reset_history(), display_mode
+        self._write_lock = threading.Lock()
+        # get_status() pre-encoded for the current version (see _publish)
+        self._status_payload: EncodedPayload | None = None
+        self._status_lock = threading.Lock()
+        # Called with (reading, previous storm level) after every read()
+        self._listeners: list[Callable[[dict, StormLevel], None]] = []
+
+        self._pressure_history = ColumnarRing(
+            PRESSURE_HISTORY_FIELDS, HISTORY_MAX_SAMPLES,
         )
-        self._session_log: deque[dict] = deque(maxlen=SESSION_LOG_MAX)
+        self._session_log = ColumnarRing(SESSION_LOG_FIELDS, SESSION_LOG_MAX)
 
         self._cpu_temp_ema: float | None = None
         self._temp_ema: float | None = None
+        # Raw temperature, CPU temperature and pressure sub-samples for the
+        # next reading (see sample()); sensor thread only
+        size = max(1, oversample)
+        self._windows = (
+            SubsampleWindow(size, reducer, OVERSAMPLE_NOISE_FLOOR_TEMPERATURE_C),
+            SubsampleWindow(size, reducer, OVERSAMPLE_NOISE_FLOOR_CPU_C),
+            SubsampleWindow(size, reducer, OVERSAMPLE_NOISE_FLOOR_PRESSURE_HPA),
+        )
+
+        # State snapshot for fast restarts (derived from db_path by default)
+        if snapshot_path is None and db_path != ':memory:':
+            snapshot_path = str(Path(db_path).with_suffix(SNAPSHOT_SUFFIX))
+        self._snapshot_path = snapshot_path
+        self._last_snapshot = time.monotonic()
+        # Periodic snapshots are written here so read() never waits on disk
+        self._snapshot_thread: threading.Thread | None = None
 
         # SQLite persistence — survives restarts
         self._store = HistoryStore(db_path)
-        self._seed_from_store()
+        started = time.perf_counter()
+        if not self._load_snapshot():
+            self._seed_from_store()
+        logger.info(
+            'State restored in %.1f ms', (time.perf_counter() - started) * 1000.0,
+        )
 
     # ── Public API ──────────────────────────────────────────────
 
-    def read(self) -> None:
-        """Sample BMP280, calibrate, update storm level, append to history."""
-        now = time.time()
+    @property
+    def state(self) -> SensorState:
+        """The latest consistent state; safe to read from any thread."""
+        return self._state
 
-        self.raw_temperature = rh.weather.temperature()
-        cpu_temp = self._read_cpu_temp()
+    @property
+    def temperature(self) -> float:
+        return self._state.temperature
 
-        if self._cpu_temp_ema is None:
-            self._cpu_temp_ema = cpu_temp
-        else:
-            self._cpu_temp_ema += CPU_TEMP_EMA_ALPHA * (cpu_temp - self._cpu_temp_ema)
+    @property
+    def temperature_f(self) -> float:
+        return self._state.temperature_f
 
-        calibrated = self.raw_temperature - (self._cpu_temp_ema - self.raw_temperature) / CPU_HEAT_FACTOR
+    @property
+    def raw_temperature(self) -> float:
+        return self._state.raw_temperature
 
-        if self._temp_ema is None:
-            self._temp_ema = calibrated
-        else:
-            self._temp_ema += TEMP_EMA_ALPHA * (calibrated - self._temp_ema)
+    @property
+    def pressure(self) -> float:
+        return self._state.pressure
 
-        self.temperature = self._temp_ema
-        self.pressure = rh.weather.pressure()
-        self.temperature_f = self.temperature * 9.0 / 5.0 + 32.0
+    @property
+    def storm_level(self) -> StormLevel:
+        return self._state.storm_level
 
-        self._pressure_history.append((now, self.pressure))
-        self._update_storm_level()
+    @property
+    def pressure_delta_3h(self) -> float | None:
+        return self._state.pressure_delta_3h
 
-        reading = {
-            'timestamp': now,
-            'temperature': self.temperature,
-            'temperature_f': self.temperature_f,
-            'raw_temperature': self.raw_temperature,
-            'pressure': self.pressure,
-            'storm_level': int(self.storm_level),
+    @property
+    def display_mode(self) -> DisplayMode:
+        return self._state.display_mode
+
+    @display_mode.setter
+    def display_mode(self, mode: DisplayMode) -> None:
+        with self._write_lock:
+            self._publish(history=False, display_mode=mode)
+
+    @property
+    def data_version(self) -> int:
+        """Counter bumped whenever status or history output may change."""
+        return self._state.version
+
+    @property
+    def history_version(self) -> int:
+        """Counter bumped whenever history output may change.
+
+        Unlike :attr:`data_version` it ignores display-only changes, so
+        cached history survives a display mode toggle.
+        """
+        return self._state.history_version
+
+    @property
+    def last_modified(self) -> float:
+        """Unix time of the latest state change (0.0 before any)."""
+        return self._state.last_modified
+
+    @property
+    def buffer_sizes(self) -> dict[str, int]:
+        """Items held in each in-memory buffer, for ``/api/metrics``."""
+        return {
+            'pressure_history': len(self._pressure_history),
+            'session_log': len(self._session_log),
+            'history_pending': self._store.pending_count,
         }
-        self._session_log.append(reading)
-        self._store.add_reading(reading)
-        self._store.prune_if_due()
+
+    @property
+    def oversample(self) -> int:
+        """Sub-samples reduced into each reading."""
+        return self._windows[0].size
+
+    def sample(self) -> bool:
+        """Take one sub-sample for the next reading.  True once enough are in.
+
+        Call :meth:`read` when this returns True.  Sub-samples are stored in
+        preallocated arrays, so this allocates nothing of its own.  Every
+        channel is read before any is stored, so a failed read leaves all
+        windows the same length.
+        """
+        started = perf_counter()
+        values = (
+            rh.weather.temperature(),
+            self._read_cpu_temp(),
+            rh.weather.pressure(),
+        )
+        _SUBSAMPLE_SECONDS.observe(perf_counter() - started)
+        temperature, cpu, pressure = self._windows
+        temperature.add(values[0])
+        cpu.add(values[1])
+        return pressure.add(values[2])
+
+    def read(self) -> None:
+        """Reduce sub-samples, calibrate, update storm level, append to history.
+
+        Takes a single sub-sample first if none were collected, so without
+        oversampling this is one direct BMP280 read.
+        """
+        now = time.time()
+        started = perf_counter()
+
+        # Oversampled readings did their I/O in sample(), which times it as
+        # stormsense_sensor_subsample_seconds; only a direct read is 'sensor'
+        if not self._windows[0]:
+            self.sample()
+            _READ_SECONDS.observe(perf_counter() - started, 'sensor')
+        reducing = perf_counter()
+        values = []
+        rejected = 0
+        for window in self._windows:
+            value, dropped = window.reduce()
+            values.append(value)
+            rejected += dropped
+        raw_temperature, cpu_temp, pressure = values
+        if rejected:
+            _OUTLIERS.inc(amount=rejected)
+        reduced = perf_counter()
+
+        # A reset_history() from the button thread waits for this reading
+        # to be published whole, and vice versa
+        with self._write_lock:
+            if self._cpu_temp_ema is None:
+                self._cpu_temp_ema = cpu_temp
+            else:
+                self._cpu_temp_ema += CPU_TEMP_EMA_ALPHA * (cpu_temp - self._cpu_temp_ema)
+
+            calibrated = raw_temperature - (self._cpu_temp_ema - raw_temperature) / CPU_HEAT_FACTOR
+
+            if self._temp_ema is None:
+                self._temp_ema = calibrated
+            else:
+                self._temp_ema += TEMP_EMA_ALPHA * (calibrated - self._temp_ema)
+
+            temperature = self._temp_ema
+            temperature_f = temperature * 9.0 / 5.0 + 32.0
+
+            self._pressure_history.append((now, pressure))
+            previous_level = self._state.storm_level
+            storm_level, delta = self._storm_state(pressure)
+
+            reading = {
+                'timestamp': now,
+                'temperature': temperature,
+                'temperature_f': temperature_f,
+                'raw_temperature': raw_temperature,
+                'pressure': pressure,
+                'storm_level': int(storm_level),
+            }
+            calibrated_at = perf_counter()
+            self._session_log.append_row(reading)
+            self._store.add_reading(reading)
+            stored = perf_counter()
+            self._publish(
+                now,
+                temperature=temperature,
+                temperature_f=temperature_f,
+                raw_temperature=raw_temperature,
+                pressure=pressure,
+                storm_level=storm_level,
+                pressure_delta_3h=delta,
+            )
+        published = perf_counter()
+        if (
+            self._snapshot_path is not None
+            and time.monotonic() - self._last_snapshot >= SNAPSHOT_INTERVAL_S
+        ):
+            self.save_snapshot(block=False)
+        # Retention runs on its own thread so sampling never waits on it
+        self._store.prune_if_due(block=False)
+        pruned = perf_counter()
+        for listener in self._listeners:
+            try:
+                listener(reading, previous_level)
+            except Exception:
+                logger.exception('Reading listener failed')
+        finished = perf_counter()
+
+        _READ_SECONDS.observe(reduced - reducing, 'reduce')
+        _READ_SECONDS.observe(calibrated_at - reduced, 'calibration')
+        _READ_SECONDS.observe(stored - calibrated_at, 'db_write')
+        _READ_SECONDS.observe(published - stored, 'publish')
+        _READ_SECONDS.observe(pruned - published, 'snapshot_prune')
+        _READ_SECONDS.observe(finished - pruned, 'listeners')
+        _READ_SECONDS.observe(finished - started, 'total')
+
+    def add_listener(self, listener: Callable[[dict, StormLevel], None]) -> None:
+        """Call *listener(reading, previous_storm_level)* after every read().
+
+        Listeners run on the sensor thread and must return quickly.
+        """
+        self._listeners.append(listener)
 
     def get_status(self) -> dict:
         """Return current state matching the /api/status contract."""
-        return {
-            'temperature': self.temperature,
-            'temperature_f': self.temperature_f,
-            'raw_temperature': self.raw_temperature,
-            'pressure': self.pressure,
-            'storm_level': int(self.storm_level),
-            'storm_label': self.storm_level.name,
-            'samples_collected': len(self._pressure_history),
-            'history_full': len(self._pressure_history) == HISTORY_MAX_SAMPLES,
-            'display_mode': self.display_mode.name,
-            'pressure_delta_3h': self.pressure_delta_3h,
-        }
+        return self._state.to_status()
+
+    @property
+    def status_payload(self) -> EncodedPayload:
+        """get_status() as JSON plus gzip/brotli variants, built once per change.
 
-    def get_history(self, since: float = 0, limit: int = 1000) -> list[dict]:
+        Published by every state change, so serving it costs no encoding
+        work however many clients poll.
+        """
+        payload = self._status_payload
+        if payload is None or payload.version != self._state.version:
+            payload = self._publish_status()
+        return payload
+
+    def get_history(
+        self, since: float = 0, limit: int = 1000, fields: Iterable[str] | None = None,
+    ) -> list[dict]:
         """Return readings matching the /api/history contract.
 
         Queries SQLite when available (full multi-day history); falls back to
-        the capped in-memory session log otherwise.
+        the capped in-memory session log otherwise.  *fields* projects the
+        rows onto those columns (see :func:`history_columns`).
+        """
+        if self._store.is_available:
+            if since > 0:
+                return self._store.get_history(limit=limit, since=since, fields=fields)
+            return self._store.get_latest(limit=limit, fields=fields)
+        return self._session_frame(since, limit, fields).dicts()
+
+    def get_session_log(self, since: float, inclusive: bool = False) -> list[dict]:
+        """Readings from the in-memory session log newer than *since*.
+
+        With *inclusive*, a reading at exactly *since* is included too.
+        Never touches SQLite, so it is cheap enough for stream replays.
+        """
+        return self._session_log.after('timestamp', since, inclusive).dicts()
+
+    def get_history_buckets(
+        self,
+        bucket_s: int,
+        since: float = 0,
+        limit: int = 1000,
+        fields: Iterable[str] | None = None,
+    ) -> list[dict]:
+        """Return min/mean/max aggregates per *bucket_s*-second time bucket.
+
+        Queries SQLite when available; falls back to aggregating the
+        in-memory session log otherwise.
         """
         if self._store.is_available:
+            return self._store.get_buckets(
+                bucket_s, since=since, limit=limit, fields=fields,
+            )
+        rows = self._session_log_since(since).dicts()
+        rows = bucket_readings(rows, bucket_s)[-limit:]
+        if fields is None:
+            return rows
+        columns = bucket_columns(history_columns(fields))
+        return RowFrame.from_dicts(BUCKET_COLUMNS, rows).select(columns).dicts()
+
+    def get_history_lttb(
+        self,
+        since: float = 0,
+        limit: int = 1000,
+        field: str = 'pressure',
+        fields: Iterable[str] | None = None,
+    ) -> list[dict]:
+        """Return up to *limit* readings picked by LTTB on *field*.
+
+        Queries SQLite when available; falls back to the in-memory session
+        log otherwise.
+        """
+        if self._store.is_available:
+            return self._store.get_history_lttb(
+                limit=limit, since=since, field=field, fields=fields,
+            )
+        rows = lttb_rows(self._session_log_since(since).tuples(), limit, field)
+        if fields is None:
+            return rows
+        frame = RowFrame.from_dicts(self._session_log.fields, rows)
+        return frame.select(history_columns(fields)).dicts()
+
+    def get_history_frame(
+        self,
+        since: float = 0,
+        limit: int = 1000,
+        bucket_s: int = 0,
+        lttb_field: str | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> RowFrame:
+        """Return history as a :class:`RowFrame` for the columnar wire formats.
+
+        Selects the same rows as :meth:`get_history` (or
+        :meth:`get_history_buckets` with *bucket_s*, or
+        :meth:`get_history_lttb` with *lttb_field*), but straight from the
+        query tuples, without building a dict per row.
+        """
+        if self._store.is_available:
+            if bucket_s:
+                return self._store.get_buckets_frame(
+                    bucket_s, since=since, limit=limit, fields=fields,
+                )
+            if lttb_field is not None:
+                return self._store.get_lttb_frame(
+                    limit=limit, since=since, field=lttb_field, fields=fields,
+                )
             if since > 0:
-                return self._store.get_history(limit=limit, since=since)
-            return self._store.get_latest(limit=limit)
-        if since > 0:
-            rows = [r for r in self._session_log if r['timestamp'] > since]
-            return rows[-limit:]
-        return list(self._session_log)[-limit:]
+                return self._store.get_history_frame(
+                    limit=limit, since=since, fields=fields,
+                )
+            return self._store.get_latest_frame(limit=limit, fields=fields)
+        if bucket_s:
+            return RowFrame.from_dicts(
+                bucket_columns(history_columns(fields)),
+                self.get_history_buckets(bucket_s, since, limit, fields),
+            )
+        if lttb_field is not None:
+            return RowFrame.from_dicts(
+                history_columns(fields),
+                self.get_history_lttb(since, limit, lttb_field, fields),
+            )
+        return self._session_frame(since, limit, fields)
+
+    def get_history_after_id(
+        self, after_id: int, limit: int = 1000, fields: Iterable[str] | None = None,
+    ) -> dict | None:
+        """Return one page of an incremental, id-cursored history sync.
+
+        The page holds ``readings`` (each with its ``id``), the
+        ``next_after_id`` to send for the following page and ``has_more``.
+        Row ids only exist in SQLite, so this returns None while the store
+        is unavailable.  A cursor behind the retention window raises
+        :class:`~storm_sense.history_store.CursorExpired`.
+        """
+        if not self._store.is_available:
+            return None
+        rows = self._store.get_after_id(after_id, limit=limit + 1, fields=fields)
+        has_more = len(rows) > limit
+        del rows[limit:]
+        return {
+            'readings': rows,
+            'next_after_id': rows[-1]['id'] if rows else after_id,
+            'has_more': has_more,
+        }
 
     def reset_history(self) -> None:
         """Clear all history (in-memory and persisted) and reset storm state."""
-        self._pressure_history.clear()
-        self._session_log.clear()
-        self._store.clear()
-        self.storm_level = StormLevel.FAIR
-        self.pressure_delta_3h = None
-        self._cpu_temp_ema = None
-        self._temp_ema = None
+        with self._write_lock:
+            self._pressure_history.clear()
+            self._session_log.clear()
+            self._store.clear()
+            if self._snapshot_path is not None:
+                # An in-flight write would bring the old state back
+                self._join_snapshot()
+                try:
+                    os.remove(self._snapshot_path)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    logger.exception('Failed to remove state snapshot')
+            self._cpu_temp_ema = None
+            self._temp_ema = None
+            self._publish(storm_level=StormLevel.FAIR, pressure_delta_3h=None)
+
+    def flush(self) -> None:
+        """Write any buffered readings through to the history store."""
+        self._store.flush()
+
+    def save_snapshot(self, block: bool = True) -> None:
+        """Write the in-memory state to the snapshot file (if configured).
+
+        The rings and EMAs are copied under ``_write_lock``, so the snapshot
+        is one consistent state.  With ``block=False`` the file is written
+        and fsynced on a background thread, and skipped while the previous
+        one is still being written.
+        """
+        self._last_snapshot = time.monotonic()
+        if self._snapshot_path is None:
+            return
+        thread = self._snapshot_thread
+        if not block and thread is not None and thread.is_alive():
+            return
+        with self._write_lock:
+            data = encode_snapshot(
+                (self._session_log, self._pressure_history),
+                (self._cpu_temp_ema, self._temp_ema),
+            )
+        if block:
+            self._join_snapshot()
+            self._write_snapshot(data)
+            return
+        self._snapshot_thread = threading.Thread(
+            target=self._write_snapshot, args=(data,),
+            name='state-snapshot', daemon=True,
+        )
+        self._snapshot_thread.start()
 
     def close(self) -> None:
-        """Shut down the history store cleanly."""
+        """Snapshot in-memory state and shut down the history store cleanly."""
+        self.save_snapshot()
         self._store.close()
 
     # ── Private helpers ─────────────────────────────────────────
 
+    def _write_snapshot(self, data: bytes) -> None:
+        try:
+            write_snapshot(self._snapshot_path, data)
+        except OSError:
+            logger.exception('Failed to write state snapshot')
+
+    def _join_snapshot(self) -> None:
+        """Wait for a background snapshot write, if one is running."""
+        thread = self._snapshot_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _publish(
+        self, now: float | None = None, history: bool = True, **changes,
+    ) -> None:
+        """Swap in the next state with *changes*.  Caller holds _write_lock.
+
+        Bumps the version (and the history version unless *history* is
+        false), stamps ``last_modified`` (*now*, default the current time)
+        and re-encodes the status payload.
+        """
+        state = self._state
+        self._state = state._replace(
+            version=state.version + 1,
+            history_version=state.history_version + int(history),
+            last_modified=time.time() if now is None else now,
+            samples_collected=len(self._pressure_history),
+            **changes,
+        )
+        self._publish_status()
+
+    def _publish_status(self) -> EncodedPayload:
+        """Encode the status for the current state, unless already done."""
+        with self._status_lock:
+            state = self._state
+            payload = self._status_payload
+            if payload is None or payload.version != state.version:
+                payload = encode_payload(state.to_status(), state.version)
+                self._status_payload = payload
+            return payload
+
+    def _restore_latest(self, latest: dict) -> None:
+        """Rebuild the startup state from the newest stored reading."""
+        pressure = latest['pressure']
+        storm_level, delta = self._storm_state(pressure)
+        self._state = self._state._replace(
+            last_modified=latest['timestamp'],
+            temperature=latest['temperature'],
+            temperature_f=latest['temperature_f'],
+            raw_temperature=latest['raw_temperature'],
+            pressure=pressure,
+            storm_level=storm_level,
+            pressure_delta_3h=delta,
+            samples_collected=len(self._pressure_history),
+        )
+
+    def _load_snapshot(self) -> bool:
+        """Restore in-memory state from the snapshot file.
+
+        Readings persisted after the snapshot was written (e.g. before a
+        crash) are topped up from SQLite.  Returns False if there is no
+        usable snapshot, so the caller can reseed from SQLite instead.
+        """
+        if self._snapshot_path is None:
+            return False
+        result = load_snapshot(
+            self._snapshot_path,
+            (self._session_log, self._pressure_history),
+            2,
+            SNAPSHOT_MAX_AGE_S,
+        )
+        if result is None:
+            return False
+        _, (self._cpu_temp_ema, self._temp_ema) = result
+        if not self._session_log:
+            return True
+
+        topped_up = 0
+        if self._store.is_available:
+            since = self._session_log[-1][0]
+            for row in self._store.get_history(limit=SESSION_LOG_MAX, since=since):
+                if 'count' in row:
+                    # The gap was too long to replay reading by reading
+                    break
+                self._session_log.append_row(row)
+                self._pressure_history.append((row['timestamp'], row['pressure']))
+                topped_up += 1
+
+        latest = dict(zip(self._session_log.fields, self._session_log[-1]))
+        self._restore_latest(latest)
+        if topped_up or self._temp_ema is None:
+            self._temp_ema = latest['temperature']
+
+        logger.info(
+            'Restored %d readings from snapshot (%d newer from SQLite)',
+            len(self._session_log) - topped_up,
+            topped_up,
+        )
+        return True
+
     def _seed_from_store(self) -> None:
         """Populate in-memory structures from persisted history on startup."""
         if not self._store.is_available:
@@ -151,7 +704,7 @@ class SensorService:
         # Seed session log (most recent SESSION_LOG_MAX readings)
         rows = self._store.get_latest(limit=SESSION_LOG_MAX)
         for row in rows:
-            self._session_log.append(row)
+            self._session_log.append_row(row)
 
         # Seed pressure history for storm detection (most recent 3-hour window)
         # Only use the tail end that fits the rolling window
@@ -161,13 +714,8 @@ class SensorService:
         if rows:
             # Restore latest values so get_status() works before first read()
             latest = rows[-1]
-            self.temperature = latest['temperature']
-            self.temperature_f = latest['temperature_f']
-            self.raw_temperature = latest['raw_temperature']
-            self.pressure = latest['pressure']
-            self.storm_level = StormLevel(latest['storm_level'])
-            self._temp_ema = self.temperature
-            self._update_storm_level()
+            self._restore_latest(latest)
+            self._temp_ema = latest['temperature']
 
             logger.info(
                 'Seeded %d readings from SQLite (%d for storm detection)',
@@ -175,6 +723,24 @@ class SensorService:
                 len(self._pressure_history),
             )
 
+    def _session_log_since(self, since: float) -> RingView:
+        """View of the session log entries with timestamp > *since*.
+
+        Timestamps are monotonic, so the start is found by bisection and
+        incremental polls only touch the rows they return.
+        """
+        if since <= 0:
+            return self._session_log.view()
+        return self._session_log.after('timestamp', since)
+
+    def _session_frame(
+        self, since: float, limit: int, fields: Iterable[str] | None,
+    ) -> RowFrame:
+        """The newest *limit* session-log readings after *since*, projected."""
+        rows = self._session_log_since(since)[-limit:].tuples()
+        frame = RowFrame(self._session_log.fields, rows)
+        return frame.select(history_columns(fields))
+
     def _read_cpu_temp(self) -> float:
         """Read SoC temperature from sysfs. Falls back to 45.0 on macOS."""
         try:
@@ -183,27 +749,26 @@ class SensorService:
         except (FileNotFoundError, OSError):
             return CPU_TEMP_FALLBACK
 
-    def _update_storm_level(self) -> None:
+    def _storm_state(self, pressure: float) -> tuple[StormLevel, float | None]:
         """Compute pressure delta and classify weather condition.
 
+        Returns ``(storm_level, pressure_delta_3h)`` for *pressure* against
+        the oldest reading in the rolling window.
+
         Barometer scale (left to right on LEDs):
         Stormy | Rain | Change | Fair | Dry
         """
         if len(self._pressure_history) < 2:
-            self.pressure_delta_3h = None
-            self.storm_level = StormLevel.FAIR
-            return
-
-        oldest_pressure = self._pressure_history[0][1]
-        self.pressure_delta_3h = self.pressure - oldest_pressure
-
-        if self.pressure_delta_3h <= STORM_SEVERE_THRESHOLD:
-            self.storm_level = StormLevel.STORMY
-        elif self.pressure_delta_3h <= STORM_WARNING_THRESHOLD:
-            self.storm_level = StormLevel.RAIN
-        elif self.pressure_delta_3h <= STORM_WATCH_THRESHOLD:
-            self.storm_level = StormLevel.CHANGE
-        elif self.pressure_delta_3h >= DRY_THRESHOLD:
-            self.storm_level = StormLevel.DRY
-        else:
-            self.storm_level = StormLevel.FAIR
+            return StormLevel.FAIR, None
+
+        delta = pressure - self._pressure_history[0][1]
+
+        if delta <= STORM_SEVERE_THRESHOLD:
+            return StormLevel.STORMY, delta
+        if delta <= STORM_WARNING_THRESHOLD:
+            return StormLevel.RAIN, delta
+        if delta <= STORM_WATCH_THRESHOLD:
+            return StormLevel.CHANGE, delta
+        if delta >= DRY_THRESHOLD:
+            return StormLevel.DRY, delta
+        return StormLevel.FAIR, delta
@@ -0,0 +1,142 @@
+"""Snapshot — compact binary dump of SensorService's in-memory state.
+
+Written periodically and on clean shutdown so that a restart can restore the
+session log, the storm-detection window and the calibration EMAs with one
+bulk read instead of rebuilding them row by row from SQLite.
+
+Layout (native byte order; snapshots never leave the machine that wrote
+them): a fixed header, then for each ring its typecodes, row count and raw
+column bytes.  Files are replaced atomically, so a crash mid-write leaves
+the previous snapshot intact.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import struct
+import time
+from array import array
+from typing import Sequence
+
+from storm_sense.ring_buffer import ColumnarRing
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# magic, version, ring count, value count, written_at (Unix time)
+_HEADER = struct.Struct('=4sHHHd')
+_MAGIC = b'SSNP'
+# typecode string length, row count
+_RING_HEADER = struct.Struct('=HI')
+
+
+def save_snapshot(
+    path: str,
+    rings: Sequence[ColumnarRing],
+    values: Sequence[float | None],
+) -> None:
+    """Atomically write *rings* and scalar *values* to *path*.
+
+    None values are stored as NaN and read back as None.
+    """
+    write_snapshot(path, encode_snapshot(rings, values))
+
+
+def encode_snapshot(
+    rings: Sequence[ColumnarRing],
+    values: Sequence[float | None],
+) -> bytes:
+    """Serialise *rings* and *values*; the copy step of :func:`save_snapshot`.
+
+    Cheap next to the write, so callers can run it under their own lock and
+    leave :func:`write_snapshot` to another thread.
+    """
+    parts = [
+        _HEADER.pack(_MAGIC, SNAPSHOT_VERSION, len(rings), len(values), time.time()),
+        array('d', [math.nan if v is None else v for v in values]).tobytes(),
+    ]
+    for ring in rings:
+        columns = ring.to_columns()
+        typecodes = ring.typecodes.encode('ascii')
+        parts.append(_RING_HEADER.pack(len(typecodes), len(columns[0])))
+        parts.append(typecodes)
+        parts.extend(column.tobytes() for column in columns)
+    return b''.join(parts)
+
+
+def write_snapshot(path: str, data: bytes) -> None:
+    """Atomically replace *path* with encoded snapshot *data* (fsynced)."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(
+    path: str,
+    rings: Sequence[ColumnarRing],
+    value_count: int,
+    max_age_s: float,
+) -> tuple[float, list[float | None]] | None:
+    """Restore *rings* from *path* and return ``(written_at, values)``.
+
+    Returns None, leaving *rings* untouched, when the file is missing,
+    older than *max_age_s*, or doesn't match the rings' layout.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as exc:
+        logger.warning('Could not read snapshot %s: %s', path, exc)
+        return None
+
+    try:
+        magic, version, ring_count, count, written_at = _HEADER.unpack_from(data)
+        if (magic, version, ring_count, count) != (
+            _MAGIC, SNAPSHOT_VERSION, len(rings), value_count,
+        ):
+            logger.info('Ignoring snapshot %s with a different layout', path)
+            return None
+        age = time.time() - written_at
+        if not 0 <= age <= max_age_s:
+            logger.info('Ignoring stale snapshot %s (%.0f s old)', path, age)
+            return None
+
+        offset = _HEADER.size
+        values = array('d')
+        values.frombytes(data[offset:offset + 8 * count])
+        offset += 8 * count
+
+        loaded = []
+        for ring in rings:
+            code_len, n = _RING_HEADER.unpack_from(data, offset)
+            offset += _RING_HEADER.size
+            typecodes = data[offset:offset + code_len].decode('ascii')
+            offset += code_len
+            if typecodes != ring.typecodes:
+                logger.info('Ignoring snapshot %s with a different layout', path)
+                return None
+            columns = []
+            for typecode in typecodes:
+                column = array(typecode)
+                size = column.itemsize * n
+                column.frombytes(data[offset:offset + size])
+                if len(column) != n:
+                    raise ValueError('truncated column')
+                offset += size
+                columns.append(column)
+            loaded.append(columns)
+    except (struct.error, ValueError, UnicodeDecodeError) as exc:
+        logger.warning('Ignoring damaged snapshot %s: %s', path, exc)
+        return None
+
+    for ring, columns in zip(rings, loaded):
+        ring.load_columns(columns)
+    return written_at, [None if math.isnan(v) else v for v in values]
@@ -0,0 +1,104 @@
+"""PooledWSGIServer — bounded-concurrency WSGI server for the REST API.
+
+Flask's development server starts a new thread for every connection, with
+no upper bound and no idle timeout, so a burst of dashboards can exhaust a
+Pi's memory.  This server hands connections to a fixed pool of worker
+threads instead.  A worker is reserved before each ``accept()``, so while
+every worker is busy new connections wait in the kernel's listen backlog and
+are not accepted.  HTTP/1.1 keep-alive is on,
+and idle connections are closed after a short timeout so they don't tie
+up workers.
+
+It is built on werkzeug's server (already a Flask dependency), so request
+handling, chunked responses and logging match the development server.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from storm_sense.config import API_BACKLOG, API_KEEPALIVE_S, API_THREADS
+
+# How long the serve loop waits for a free worker before polling again (so
+# shutdown() is still noticed while the pool is full)
+_SLOT_WAIT_S = 0.5
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """WSGI server that serves connections on a bounded thread pool.
+
+    Args:
+        host: Interface to bind.
+        port: TCP port (0 picks a free one; see ``server_port``).
+        app: The WSGI application.
+        threads: Worker threads, i.e. connections served at once.
+        backlog: Listen queue length for connections waiting on a worker.
+        keepalive_s: Idle time after which a kept-alive connection is
+            closed (also the socket timeout while reading a request).
+    """
+
+    multithread = True
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        app,
+        threads: int = API_THREADS,
+        backlog: int = API_BACKLOG,
+        keepalive_s: float = API_KEEPALIVE_S,
+    ) -> None:
+        self.threads = max(1, threads)
+        self.request_queue_size = max(1, backlog)
+        handler = type('PooledRequestHandler', (WSGIRequestHandler,), {
+            'protocol_version': 'HTTP/1.1',
+            'timeout': keepalive_s,
+        })
+        super().__init__(host, port, app, handler=handler)
+        self._slots = threading.Semaphore(self.threads)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.threads, thread_name_prefix='api-worker',
+        )
+
+    def get_request(self):
+        """Accept a connection once a worker is free to take it.
+
+        Until then the connection stays in the listen backlog.  Raising
+        OSError sends the serve loop back to its poll, which retries.
+        """
+        if not self._slots.acquire(timeout=_SLOT_WAIT_S):
+            raise OSError('no free worker')
+        try:
+            return super().get_request()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def process_request(self, request, client_address) -> None:
+        """Hand the connection to the worker reserved in get_request()."""
+        try:
+            self._pool.submit(self._work, request, client_address)
+        except RuntimeError:
+            # Pool already shut down
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        pool = getattr(self, '_pool', None)
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    # ── Private helpers ─────────────────────────────────────────
+
+    def _work(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
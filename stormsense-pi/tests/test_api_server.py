@@ -1,11 +1,20 @@
 """Tests for ApiServer — Flask REST API endpoints."""
 
+import gzip
+import http.client
+import json
+import threading
+import time
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, PropertyMock, patch
 
 from flask import Flask
 
 from storm_sense.api_server import ApiServer
+from storm_sense.config import StormLevel
+from storm_sense.frame import BINARY_MAGIC, RowFrame
+from storm_sense.history_store import CursorExpired
+from storm_sense.payload import encode_payload
 
 
 def _make_mock_sensor() -> MagicMock:
@@ -29,7 +38,20 @@ def _make_mock_sensor() -> MagicMock:
         'pressure': 1013.25,
         'storm_level': 0,
     }]
-    mock._pressure_history = [None] * 42  # len() == 42 for health endpoint
+    mock.get_history_buckets.return_value = []
+    mock.get_history_lttb.return_value = []
+    mock.state.samples_collected = 42  # health endpoint
+    mock.buffer_sizes = {'pressure_history': 42, 'session_log': 42, 'history_pending': 3}
+    mock.get_session_log.return_value = []
+    mock.data_version = 7
+    mock.history_version = 3
+    mock.last_modified = 1708635600.0
+    # Like SensorService: the status encoded for the current data_version
+    type(mock).status_payload = PropertyMock(
+        side_effect=lambda: encode_payload(
+            mock.get_status.return_value, mock.data_version,
+        ),
+    )
     return mock
 
 
@@ -59,9 +81,25 @@ class TestStatusEndpoint(unittest.TestCase):
         self.assertEqual(data['display_mode'], 'TEMPERATURE')
         self.assertIsNone(data['pressure_delta_3h'])
 
-    def test_status_calls_sensor_get_status(self):
-        self.client.get('/api/status')
-        self.mock_sensor.get_status.assert_called_once()
+    def test_status_served_from_encoded_payload(self):
+        resp = self.client.get('/api/status')
+        self.assertEqual(resp.content_type, 'application/json')
+        self.assertEqual(
+            resp.data, encode_payload(self.mock_sensor.get_status.return_value, 7).body,
+        )
+        self.mock_sensor.get_status.assert_not_called()
+
+    def test_status_precompressed_variants(self):
+        for coding in ('gzip', 'br'):
+            resp = self.client.get('/api/status', headers={'Accept-Encoding': coding})
+            self.assertEqual(resp.headers['Content-Encoding'], coding)
+            self.assertTrue(resp.headers['ETag'].endswith(f':{coding}"'))
+            self.assertIn('Accept-Encoding', resp.headers['Vary'])
+
+    def test_status_identity_when_not_accepted(self):
+        resp = self.client.get('/api/status', headers={'Accept-Encoding': 'gzip;q=0'})
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertEqual(resp.get_json()['storm_label'], 'CLEAR')
 
 
 class TestHistoryEndpoint(unittest.TestCase):
@@ -96,36 +134,566 @@ class TestHistoryEndpoint(unittest.TestCase):
     def test_history_calls_sensor_get_history(self):
         self.client.get('/api/history')
         self.mock_sensor.get_history.assert_called_once_with(
-            since=0, limit=1000,
+            since=0, limit=1000, fields=None,
         )
 
     def test_history_since_query_param(self):
         resp = self.client.get('/api/history?since=1708635500.0')
         self.assertEqual(resp.status_code, 200)
         self.mock_sensor.get_history.assert_called_once_with(
-            since=1708635500.0, limit=1000,
+            since=1708635500.0, limit=1000, fields=None,
         )
 
     def test_history_since_invalid_falls_back_to_zero(self):
         resp = self.client.get('/api/history?since=notanumber')
         self.assertEqual(resp.status_code, 200)
         self.mock_sensor.get_history.assert_called_once_with(
-            since=0, limit=1000,
+            since=0, limit=1000, fields=None,
         )
 
     def test_history_custom_limit(self):
         resp = self.client.get('/api/history?limit=500')
         self.assertEqual(resp.status_code, 200)
         self.mock_sensor.get_history.assert_called_once_with(
-            since=0, limit=500,
+            since=0, limit=500, fields=None,
         )
 
     def test_history_limit_clamped_to_max(self):
         resp = self.client.get('/api/history?limit=99999')
         self.assertEqual(resp.status_code, 200)
         self.mock_sensor.get_history.assert_called_once_with(
-            since=0, limit=5000,
+            since=0, limit=5000, fields=None,
+        )
+
+    def test_history_bucket_param_uses_bucketed_query(self):
+        resp = self.client.get('/api/history?bucket=300&since=1708635500.0')
+        self.assertEqual(resp.status_code, 200)
+        self.mock_sensor.get_history_buckets.assert_called_once_with(
+            bucket_s=300, since=1708635500.0, limit=1000, fields=None,
+        )
+        self.mock_sensor.get_history.assert_not_called()
+
+    def test_history_bucket_clamped_to_one_week(self):
+        self.client.get('/api/history?bucket=99999999')
+        self.mock_sensor.get_history_buckets.assert_called_once_with(
+            bucket_s=7 * 24 * 3600, since=0, limit=1000, fields=None,
+        )
+
+    def test_history_invalid_bucket_ignored(self):
+        self.client.get('/api/history?bucket=-5')
+        self.mock_sensor.get_history_buckets.assert_not_called()
+        self.mock_sensor.get_history.assert_called_once()
+
+    def test_history_lttb_mode(self):
+        resp = self.client.get('/api/history?mode=lttb&since=1708635500.0&limit=300')
+        self.assertEqual(resp.status_code, 200)
+        self.mock_sensor.get_history_lttb.assert_called_once_with(
+            since=1708635500.0, limit=300, field='pressure', fields=None,
+        )
+        self.mock_sensor.get_history.assert_not_called()
+
+    def test_history_lttb_custom_field(self):
+        self.client.get('/api/history?mode=lttb&lttb_field=temperature')
+        self.mock_sensor.get_history_lttb.assert_called_once_with(
+            since=0, limit=1000, field='temperature', fields=None,
+        )
+
+    def test_history_lttb_unknown_field_rejected(self):
+        resp = self.client.get('/api/history?mode=lttb&lttb_field=humidity')
+        self.assertEqual(resp.status_code, 400)
+        self.mock_sensor.get_history_lttb.assert_not_called()
+
+    def test_history_after_id_returns_cursor_page(self):
+        page = {'readings': [], 'next_after_id': 42, 'has_more': False}
+        self.mock_sensor.get_history_after_id.return_value = page
+        resp = self.client.get('/api/history?after_id=42&limit=200&since=5')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json(), page)
+        self.assertIsNotNone(resp.headers.get('ETag'))
+        self.mock_sensor.get_history_after_id.assert_called_once_with(
+            after_id=42, limit=200, fields=None,
+        )
+        self.mock_sensor.get_history.assert_not_called()
+
+    def test_history_after_id_unavailable_returns_503(self):
+        self.mock_sensor.get_history_after_id.return_value = None
+        resp = self.client.get('/api/history?after_id=0')
+        self.assertEqual(resp.status_code, 503)
+        self.assertIn('error', resp.get_json())
+
+    def test_history_expired_after_id_returns_410(self):
+        self.mock_sensor.get_history_after_id.side_effect = CursorExpired(3, 120)
+        resp = self.client.get('/api/history?after_id=3')
+        self.assertEqual(resp.status_code, 410)
+        self.assertEqual(resp.get_json()['resume_after_id'], 120)
+
+    def test_history_invalid_after_id_ignored(self):
+        self.client.get('/api/history?after_id=abc')
+        self.mock_sensor.get_history_after_id.assert_not_called()
+        self.mock_sensor.get_history.assert_called_once()
+
+
+class TestHistoryCache(unittest.TestCase):
+    """Repeat /api/history queries are served from the response cache."""
+
+    def setUp(self):
+        self.mock_sensor = _make_mock_sensor()
+        self.server = ApiServer(self.mock_sensor)
+        self.client = self.server.get_app().test_client()
+        self.on_reading = self.mock_sensor.add_listener.call_args_list[1][0][0]
+
+    def _new_reading(self, ts):
+        self.mock_sensor.data_version += 1
+        self.mock_sensor.history_version += 1
+        reading = dict(self.mock_sensor.get_history.return_value[0], timestamp=ts)
+        self.on_reading(reading, StormLevel.FAIR)
+        return reading
+
+    def test_repeat_query_hits_cache(self):
+        first = self.client.get('/api/history?since=1708635500.0')
+        second = self.client.get('/api/history?since=1708635500.0')
+
+        self.assertEqual(first.get_data(), second.get_data())
+        self.mock_sensor.get_history.assert_called_once()
+        stats = self.server.history_cache_stats
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertGreater(stats['bytes'], 0)
+
+    def test_distinct_queries_cached_separately(self):
+        self.client.get('/api/history?since=1708635500.0')
+        self.client.get('/api/history?since=1708635500.0&limit=10')
+        self.assertEqual(self.mock_sensor.get_history.call_count, 2)
+
+    def test_new_reading_extends_since_window(self):
+        self.client.get('/api/history?since=1708635500.0')
+        reading = self._new_reading(1708635605.0)
+
+        resp = self.client.get('/api/history?since=1708635500.0')
+        data = resp.get_json()
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[-1], reading)
+        self.mock_sensor.get_history.assert_called_once()
+
+    def test_new_reading_invalidates_latest_window(self):
+        self.client.get('/api/history')
+        self._new_reading(1708635605.0)
+        self.client.get('/api/history')
+        self.assertEqual(self.mock_sensor.get_history.call_count, 2)
+
+    def test_reset_invalidates_without_reading(self):
+        self.client.get('/api/history?since=1708635500.0')
+        self.mock_sensor.data_version += 1
+        self.mock_sensor.history_version += 1
+        self.client.get('/api/history?since=1708635500.0')
+        self.assertEqual(self.mock_sensor.get_history.call_count, 2)
+
+    def test_display_change_keeps_cache(self):
+        first = self.client.get('/api/history?since=1708635500.0')
+        self.mock_sensor.data_version += 1
+        second = self.client.get(
+            '/api/history?since=1708635500.0',
+            headers={'If-None-Match': first.headers['ETag']},
+        )
+        self.assertEqual(second.status_code, 304)
+        self.client.get('/api/history?since=1708635500.0')
+        self.mock_sensor.get_history.assert_called_once()
+
+    def test_equivalent_since_values_share_entry(self):
+        for query in ('', '?since=0', '?since=-5', '?since=nan', '?since=abc'):
+            self.client.get(f'/api/history{query}')
+        self.mock_sensor.get_history.assert_called_once_with(
+            since=0.0, limit=1000, fields=None,
+        )
+
+
+class TestHistoryFormats(unittest.TestCase):
+    """/api/history negotiates columnar JSON and binary wire formats."""
+
+    COLUMNS = ('timestamp', 'pressure', 'storm_level')
+
+    def setUp(self):
+        self.mock_sensor = _make_mock_sensor()
+        self.mock_sensor.get_history_frame.return_value = RowFrame(
+            self.COLUMNS, [(1708635600.0, 1013.25, 0), (1708635605.0, 1013.0, 1)],
+        )
+        self.server = ApiServer(self.mock_sensor)
+        self.client = self.server.get_app().test_client()
+
+    def test_default_is_json_list(self):
+        resp = self.client.get('/api/history')
+        self.assertEqual(resp.mimetype, 'application/json')
+        self.assertIsInstance(resp.get_json(), list)
+        self.assertIn('Accept', resp.headers['Vary'])
+        self.mock_sensor.get_history_frame.assert_not_called()
+
+    def test_columns_format_param(self):
+        resp = self.client.get('/api/history?format=columns&since=1.0&limit=10')
+        self.assertEqual(resp.mimetype, 'application/vnd.stormsense.columns+json')
+        self.assertEqual(json.loads(resp.get_data()), {
+            'timestamp': [1708635600.0, 1708635605.0],
+            'pressure': [1013.25, 1013.0],
+            'storm_level': [0, 1],
+        })
+        self.mock_sensor.get_history_frame.assert_called_once_with(
+            since=1.0, limit=10, fields=None,
+        )
+        self.mock_sensor.get_history.assert_not_called()
+
+    def test_binary_via_accept_header(self):
+        resp = self.client.get(
+            '/api/history', headers={'Accept': 'application/vnd.stormsense.columns'},
+        )
+        self.assertEqual(resp.mimetype, 'application/vnd.stormsense.columns')
+        self.assertEqual(resp.get_data(), self.mock_sensor.get_history_frame.return_value.pack())
+        self.assertTrue(resp.get_data().startswith(BINARY_MAGIC))
+
+    def test_format_param_overrides_accept(self):
+        resp = self.client.get(
+            '/api/history?format=json',
+            headers={'Accept': 'application/vnd.stormsense.columns'},
+        )
+        self.assertEqual(resp.mimetype, 'application/json')
+
+    def test_bucket_and_lttb_modes_forwarded(self):
+        self.client.get('/api/history?format=binary&bucket=60')
+        self.mock_sensor.get_history_frame.assert_called_with(
+            since=0.0, limit=1000, fields=None, bucket_s=60,
+        )
+        self.client.get('/api/history?format=binary&mode=lttb&lttb_field=temperature')
+        self.mock_sensor.get_history_frame.assert_called_with(
+            since=0.0, limit=1000, fields=None, lttb_field='temperature',
+        )
+
+    def test_unknown_format_rejected(self):
+        resp = self.client.get('/api/history?format=xml')
+        self.assertEqual(resp.status_code, 400)
+
+    def test_after_id_stays_json(self):
+        self.mock_sensor.get_history_after_id.return_value = {
+            'readings': [], 'next_after_id': 5, 'has_more': False,
+        }
+        resp = self.client.get('/api/history?after_id=5&format=columns')
+        self.assertEqual(resp.get_json()['next_after_id'], 5)
+
+    def test_formats_cached_and_validated_separately(self):
+        as_json = self.client.get('/api/history')
+        as_columns = self.client.get('/api/history?format=columns')
+        self.client.get('/api/history?format=columns')
+        self.assertNotEqual(as_json.headers['ETag'], as_columns.headers['ETag'])
+        self.mock_sensor.get_history_frame.assert_called_once()
+        self.mock_sensor.get_history.assert_called_once()
+
+    def test_columnar_json_is_compressed(self):
+        rows = [(1708635600.0 + i * 5, 1013.25, 0) for i in range(200)]
+        self.mock_sensor.get_history_frame.return_value = RowFrame(self.COLUMNS, rows)
+        resp = self.client.get(
+            '/api/history?format=columns', headers={'Accept-Encoding': 'gzip'},
+        )
+        self.assertEqual(resp.headers.get('Content-Encoding'), 'gzip')
+
+
+class TestHistoryFields(unittest.TestCase):
+    """/api/history?fields= projects the returned columns."""
+
+    def setUp(self):
+        self.mock_sensor = _make_mock_sensor()
+        self.server = ApiServer(self.mock_sensor)
+        self.client = self.server.get_app().test_client()
+
+    def test_fields_canonicalised_and_forwarded(self):
+        self.client.get('/api/history?since=1.0&fields=storm_level, pressure')
+        self.mock_sensor.get_history.assert_called_once_with(
+            since=1.0, limit=1000, fields=('timestamp', 'pressure', 'storm_level'),
+        )
+
+    def test_all_fields_same_as_none(self):
+        self.client.get(
+            '/api/history?fields=timestamp,temperature,temperature_f,'
+            'raw_temperature,pressure,storm_level',
+        )
+        self.mock_sensor.get_history.assert_called_once_with(
+            since=0, limit=1000, fields=None,
+        )
+
+    def test_unknown_field_rejected(self):
+        resp = self.client.get('/api/history?fields=pressure,humidity')
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('humidity', resp.get_json()['error'])
+        self.mock_sensor.get_history.assert_not_called()
+
+    def test_forwarded_to_every_mode(self):
+        self.client.get('/api/history?bucket=60&fields=pressure')
+        self.assertEqual(
+            self.mock_sensor.get_history_buckets.call_args.kwargs['fields'],
+            ('timestamp', 'pressure'),
+        )
+        self.client.get('/api/history?mode=lttb&fields=pressure')
+        self.assertEqual(
+            self.mock_sensor.get_history_lttb.call_args.kwargs['fields'],
+            ('timestamp', 'pressure'),
+        )
+        self.mock_sensor.get_history_frame.return_value = RowFrame(('timestamp',), [])
+        self.client.get('/api/history?format=columns&fields=pressure')
+        self.assertEqual(
+            self.mock_sensor.get_history_frame.call_args.kwargs['fields'],
+            ('timestamp', 'pressure'),
+        )
+
+    def test_projected_window_not_extended_by_new_reading(self):
+        self.mock_sensor.get_history.return_value = [
+            {'timestamp': 1708635600.0, 'pressure': 1013.25},
+        ]
+        on_reading = self.mock_sensor.add_listener.call_args_list[1][0][0]
+        self.client.get('/api/history?since=1708635500.0&fields=pressure')
+        self.mock_sensor.data_version += 1
+        self.mock_sensor.history_version += 1
+        on_reading(_reading(1708635605.0), StormLevel.FAIR)
+        self.client.get('/api/history?since=1708635500.0&fields=pressure')
+        self.assertEqual(self.mock_sensor.get_history.call_count, 2)
+
+
+class TestHistoryCompression(unittest.TestCase):
+    """Cached history bodies are compressed once, not on every request."""
+
+    def setUp(self):
+        self.mock_sensor = _make_mock_sensor()
+        row = self.mock_sensor.get_history.return_value[0]
+        self.mock_sensor.get_history.return_value = [
+            dict(row, timestamp=row['timestamp'] + i * 5) for i in range(100)
+        ]
+        self.server = ApiServer(self.mock_sensor)
+        self.client = self.server.get_app().test_client()
+
+    def _get(self, encoding='gzip', **headers):
+        return self.client.get(
+            '/api/history', headers={'Accept-Encoding': encoding, **headers},
+        )
+
+    def test_served_precompressed(self):
+        plain = self._get('identity')
+        resp = self._get()
+
+        self.assertEqual(resp.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(resp.get_data()), plain.get_data())
+        self.assertEqual(resp.headers['ETag'], f'{plain.headers["ETag"][:-1]}:gzip"')
+        self.assertIn('Accept-Encoding', resp.headers['Vary'])
+
+    def test_repeat_requests_compress_once(self):
+        first = self._get()
+        second = self._get()
+        self.assertEqual(first.get_data(), second.get_data())
+        self.assertEqual(self.server.history_cache_stats['compressions'], 1)
+
+    def test_compressed_etag_revalidates(self):
+        etag = self._get().headers['ETag']
+        resp = self._get(**{'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 304)
+
+    def test_small_body_left_uncompressed(self):
+        self.mock_sensor.get_history.return_value = []
+        resp = self._get()
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertEqual(self.server.history_cache_stats['compressions'], 0)
+
+
+class TestConditionalGet(unittest.TestCase):
+    """Unchanged polls get 304 without reading or encoding any data."""
+
+    def setUp(self):
+        self.mock_sensor = _make_mock_sensor()
+        self.server = ApiServer(self.mock_sensor)
+        self.client = self.server.get_app().test_client()
+
+    def test_status_sets_validators(self):
+        resp = self.client.get('/api/status')
+        self.assertIsNotNone(resp.headers.get('ETag'))
+        self.assertEqual(
+            resp.headers['Last-Modified'], 'Thu, 22 Feb 2024 21:00:00 GMT',
         )
+        self.assertIn('no-cache', resp.headers['Cache-Control'])
+
+    def test_status_if_none_match_returns_304(self):
+        etag = self.client.get('/api/status').headers['ETag']
+        self.mock_sensor.get_status.reset_mock()
+        resp = self.client.get('/api/status', headers={'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.data, b'')
+        self.assertEqual(resp.headers['ETag'], etag)
+        self.mock_sensor.get_status.assert_not_called()
+
+    def test_new_data_invalidates_etag(self):
+        etag = self.client.get('/api/status').headers['ETag']
+        self.mock_sensor.data_version = 8
+        resp = self.client.get('/api/status', headers={'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp.headers['ETag'], etag)
+
+    def test_history_if_none_match_returns_304(self):
+        etag = self.client.get('/api/history?since=5&limit=10').headers['ETag']
+        self.mock_sensor.get_history.reset_mock()
+        resp = self.client.get(
+            '/api/history?since=5&limit=10', headers={'If-None-Match': etag},
+        )
+        self.assertEqual(resp.status_code, 304)
+        self.mock_sensor.get_history.assert_not_called()
+
+    def test_history_etag_depends_on_query(self):
+        tags = {
+            self.client.get(url).headers['ETag']
+            for url in (
+                '/api/history', '/api/history?limit=10', '/api/history?since=5',
+                '/api/history?bucket=60', '/api/history?mode=lttb',
+                '/api/history?mode=lttb&lttb_field=temperature',
+            )
+        }
+        self.assertEqual(len(tags), 6)
+
+    def test_compressed_etag_suffix_matches(self):
+        resp = self.client.get('/api/status')
+        etag = resp.headers['ETag'].strip('"')
+        resp = self.client.get(
+            '/api/status', headers={'If-None-Match': f'"{etag}:gzip"'},
+        )
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.headers['ETag'], f'"{etag}:gzip"')
+
+    def test_if_modified_since(self):
+        resp = self.client.get('/api/status', headers={
+            'If-Modified-Since': 'Thu, 22 Feb 2024 21:00:00 GMT',
+        })
+        self.assertEqual(resp.status_code, 304)
+        self.mock_sensor.last_modified = 1708635605.0
+        resp = self.client.get('/api/status', headers={
+            'If-Modified-Since': 'Thu, 22 Feb 2024 21:00:00 GMT',
+        })
+        self.assertEqual(resp.status_code, 200)
+
+    def test_if_modified_since_same_second_change_not_304(self):
+        # Last-Modified is truncated to 21:00:00; a later reading in that
+        # second must not match it
+        self.mock_sensor.last_modified = 1708635600.4
+        resp = self.client.get('/api/status', headers={
+            'If-Modified-Since': 'Thu, 22 Feb 2024 21:00:00 GMT',
+        })
+        self.assertEqual(resp.status_code, 200)
+
+    def test_if_none_match_takes_precedence(self):
+        resp = self.client.get('/api/status', headers={
+            'If-None-Match': '"stale"',
+            'If-Modified-Since': 'Thu, 22 Feb 2024 21:00:00 GMT',
+        })
+        self.assertEqual(resp.status_code, 200)
+
+
+def _reading(ts: float, storm_level: int = 1) -> dict:
+    return {
+        'timestamp': ts,
+        'temperature': 22.0,
+        'temperature_f': 71.6,
+        'raw_temperature': 27.0,
+        'pressure': 1013.0,
+        'storm_level': storm_level,
+    }
+
+
+class TestStreamEndpoint(unittest.TestCase):
+    """GET /api/stream pushes readings as Server-Sent Events."""
+
+    def setUp(self):
+        self.mock_sensor = _make_mock_sensor()
+        self.mock_sensor.get_history.return_value = [_reading(100.0)]
+        self.server = ApiServer(self.mock_sensor)
+        self.client = self.server.get_app().test_client()
+        self.publish = self.mock_sensor.add_listener.call_args_list[0][0][0]
+        patcher = patch('storm_sense.api_server._STREAM_KEEPALIVE_S', 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _open(self, **headers):
+        resp = self.client.get('/api/stream', headers=headers)
+        self.addCleanup(resp.close)
+        return resp, iter(resp.response)
+
+    def _next_event(self, frames) -> bytes:
+        """Next non-keepalive frame."""
+        for frame in frames:
+            if not frame.startswith(b':'):
+                return frame
+        self.fail('stream ended')
+
+    def test_stream_headers(self):
+        resp, frames = self._open()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.mimetype, 'text/event-stream')
+        self.assertEqual(next(frames), b'retry: 5000\n\n')
+
+    def test_starts_with_latest_reading(self):
+        _, frames = self._open()
+        next(frames)
+        frame = self._next_event(frames)
+        self.assertTrue(frame.startswith(b'id: 100.0\nevent: reading\n'))
+
+    def test_pushes_published_readings(self):
+        _, frames = self._open()
+        next(frames)
+        self._next_event(frames)
+        self.publish(_reading(105.0), StormLevel.FAIR)
+        self.assertIn(b'id: 105.0\n', self._next_event(frames))
+
+    def test_storm_level_change_event(self):
+        _, frames = self._open()
+        next(frames)
+        self._next_event(frames)
+        self.publish(_reading(105.0, storm_level=3), StormLevel.FAIR)
+        self._next_event(frames)
+        frame = self._next_event(frames)
+        self.assertTrue(frame.startswith(b'event: storm_level\n'))
+        self.assertIn(b'"storm_label":"RAIN"', frame)
+        self.assertIn(b'"previous_level":1', frame)
+
+    def test_last_event_id_replays_missed_readings(self):
+        self.mock_sensor.get_session_log.return_value = [
+            _reading(100.0), _reading(105.0), _reading(110.0, storm_level=2),
+        ]
+        _, frames = self._open(**{'Last-Event-ID': '100.0'})
+        next(frames)
+        self.assertIn(b'id: 105.0\n', self._next_event(frames))
+        self.assertIn(b'id: 110.0\n', self._next_event(frames))
+        self.assertIn(b'event: storm_level', self._next_event(frames))
+        self.mock_sensor.get_session_log.assert_called_once_with(100.0, inclusive=True)
+
+    def test_replayed_readings_not_repeated_live(self):
+        self.mock_sensor.get_session_log.return_value = [
+            _reading(100.0), _reading(105.0),
+        ]
+        resp, frames = self._open(**{'Last-Event-ID': '100.0'})
+        # Published between taking the cursor and replaying
+        self.publish(_reading(105.0), StormLevel.FAIR)
+        next(frames)
+        self.assertIn(b'id: 105.0\n', self._next_event(frames))
+        self.publish(_reading(110.0), StormLevel.FAIR)
+        self.assertIn(b'id: 110.0\n', self._next_event(frames))
+
+    def test_subscriber_limit(self):
+        with patch('storm_sense.api_server._STREAM_MAX_CLIENTS', 1):
+            self._open()
+            resp = self.client.get('/api/stream')
+        self.assertEqual(resp.status_code, 503)
+
+    def test_close_releases_subscriber(self):
+        resp, frames = self._open()
+        next(frames)
+        self.assertEqual(self.server._events.subscriber_count, 1)
+        resp.close()
+        self.assertEqual(self.server._events.subscriber_count, 0)
+
+    def test_server_close_ends_stream(self):
+        _, frames = self._open()
+        next(frames)
+        self._next_event(frames)
+        self.server.close()
+        # The generator finishes instead of blocking forever
+        self.assertTrue(all(frame.startswith(b':') for frame in list(frames)))
 
 
 class TestHealthEndpoint(unittest.TestCase):
@@ -147,6 +715,73 @@ class TestHealthEndpoint(unittest.TestCase):
         self.assertEqual(data, {'status': 'ok', 'uptime_samples': 42})
 
 
+class TestMetricsEndpoint(unittest.TestCase):
+    """GET /api/metrics renders request, cache and buffer metrics."""
+
+    def setUp(self):
+        self.mock_sensor = _make_mock_sensor()
+        self.server = ApiServer(self.mock_sensor)
+        self.client = self.server.get_app().test_client()
+
+    def _metrics(self) -> str:
+        resp = self.client.get('/api/metrics')
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.content_type.startswith('text/plain; version=0.0.4'))
+        return resp.get_data(as_text=True)
+
+    def _sample(self, text: str, series: str) -> float:
+        for line in text.splitlines():
+            if line.startswith(series + ' '):
+                return float(line.rsplit(' ', 1)[1])
+        self.fail(f'{series} not in metrics output')
+
+    def test_requests_counted_per_route_and_status(self):
+        before = self._metrics()
+        series = 'stormsense_http_requests_total{route="/api/history",status="200"}'
+        start = self._sample(before, series) if series + ' ' in before else 0
+        self.client.get('/api/history')
+        self.client.get('/api/history?limit=2')
+        self.assertEqual(self._sample(self._metrics(), series), start + 2)
+
+    def test_latency_and_size_histograms(self):
+        self.client.get('/api/status')
+        text = self._metrics()
+        self.assertIn(
+            'stormsense_http_request_duration_seconds_count{route="/api/status"}', text,
+        )
+        self.assertIn(
+            'stormsense_http_response_size_bytes_count{route="/api/status"}', text,
+        )
+
+    def test_response_size_is_compressed_size(self):
+        series = 'stormsense_http_response_size_bytes_sum{route="/api/status"}'
+        before = self._metrics()
+        start = self._sample(before, series) if series + ' ' in before else 0
+        resp = self.client.get('/api/status', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(resp.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            self._sample(self._metrics(), series), start + len(resp.data),
+        )
+
+    def test_unmatched_route_label(self):
+        self.client.get('/api/nope')
+        self.assertIn(
+            'stormsense_http_requests_total{route="unmatched",status="404"}',
+            self._metrics(),
+        )
+
+    def test_buffer_and_cache_gauges(self):
+        self.client.get('/api/history')
+        text = self._metrics()
+        self.assertEqual(self._sample(text, 'stormsense_buffer_items{buffer="history_pending"}'), 3)
+        self.assertEqual(self._sample(text, 'stormsense_buffer_items{buffer="history_cache"}'), 1)
+        self.assertEqual(
+            self._sample(text, 'stormsense_history_cache_events_total{event="misses"}'), 1,
+        )
+        self.assertGreater(self._sample(text, 'stormsense_history_cache_bytes'), 0)
+        self.assertEqual(self._sample(text, 'stormsense_stream_subscribers'), 0)
+
+
 class TestCorsHeaders(unittest.TestCase):
     """CORS headers present (Access-Control-Allow-Origin)."""
 
@@ -186,5 +821,45 @@ class TestGetApp(unittest.TestCase):
         self.assertIsInstance(app, Flask)
 
 
+
+class TestServe(unittest.TestCase):
+    """serve() runs the pooled server until stop()."""
+
+    def setUp(self):
+        self.server = ApiServer(_make_mock_sensor())
+        self.thread = threading.Thread(
+            target=self.server.serve,
+            kwargs={'host': '127.0.0.1', 'port': 0, 'threads': 4},
+        )
+        self.thread.start()
+        deadline = time.monotonic() + 5
+        while self.server._server is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.server.stop()
+        self.thread.join(timeout=5)
+
+    def test_serves_requests_and_stops(self):
+        port = self.server._server.server_port
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        try:
+            conn.request('GET', '/api/health')
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 200)
+            self.assertEqual(json.loads(resp.read())['status'], 'ok')
+        finally:
+            conn.close()
+        self.server.stop()
+        self.thread.join(timeout=5)
+        self.assertFalse(self.thread.is_alive())
+
+    def test_streams_capped_at_half_the_pool(self):
+        events = self.server._events
+        self.assertTrue(events.try_subscribe(2))
+        self.assertTrue(events.try_subscribe(2))
+        resp = self.server.get_app().test_client().get('/api/stream')
+        self.assertEqual(resp.status_code, 503)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,103 @@
+"""Tests for ReadingArchive — compressed per-day archive of pruned readings."""
+
+from __future__ import annotations
+
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+from storm_sense.archive import ReadingArchive
+
+START = 1700006400.0  # 2023-11-15 00:00:00 UTC
+
+
+def _rows(n: int, start: float = START, step: float = 60.0) -> list[tuple]:
+    """Readings in history-store column order."""
+    rows = []
+    for i in range(n):
+        temp = 21.0 + math.sin(i / 50.0) * 3.1
+        rows.append((
+            start + i * step, temp, temp * 9.0 / 5.0 + 32.0,
+            temp + 5.7, 1013.25 - i * 0.013, (i // 40) % 5,
+        ))
+    return rows
+
+
+class TestReadingArchive(unittest.TestCase):
+    """Rows round-trip exactly and range queries skip untouched data."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.archive = ReadingArchive(os.path.join(self.dir, 'archive'))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_round_trip_is_exact(self):
+        rows = _rows(500)
+        self.assertEqual(self.archive.append(rows), 500)
+        self.assertEqual(self.archive.rows(0, math.inf), rows)
+
+    def test_one_file_per_utc_day(self):
+        self.archive.append(_rows(3 * 24, step=3600.0))
+        self.assertEqual(
+            sorted(os.listdir(self.archive.directory)),
+            ['2023-11-15.ssa', '2023-11-16.ssa', '2023-11-17.ssa'],
+        )
+
+    def test_appends_accumulate_blocks(self):
+        rows = _rows(300)
+        for i in range(0, 300, 100):
+            self.archive.append(rows[i:i + 100])
+        self.assertEqual(self.archive.rows(0, math.inf), rows)
+
+    def test_range_query_and_count(self):
+        rows = _rows(300)
+        for i in range(0, 300, 100):
+            self.archive.append(rows[i:i + 100])
+        start, stop = rows[50][0], rows[250][0]
+        expected = [row for row in rows if start <= row[0] < stop]
+        self.assertEqual(self.archive.rows(start, stop), expected)
+        self.assertEqual(self.archive.count(start, stop), 200)
+        self.assertEqual(self.archive.count(0, START), 0)
+
+    def test_reappending_is_ignored(self):
+        rows = _rows(100)
+        self.archive.append(rows)
+        self.assertEqual(self.archive.append(rows[50:]), 0)
+        self.assertEqual(self.archive.count(0, math.inf), 100)
+
+    def test_oldest(self):
+        self.assertIsNone(self.archive.oldest())
+        self.archive.append(_rows(10))
+        self.assertEqual(self.archive.oldest(), START)
+
+    def test_torn_block_is_ignored(self):
+        rows = _rows(100)
+        self.archive.append(rows[:50])
+        self.archive.append(rows[50:])
+        path = self.archive.directory / '2023-11-15.ssa'
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 10)
+        self.assertEqual(self.archive.rows(0, math.inf), rows[:50])
+
+    def test_smaller_than_raw_floats(self):
+        self.archive.append(_rows(1440))
+        size = os.path.getsize(self.archive.directory / '2023-11-15.ssa')
+        self.assertLess(size, 1440 * 6 * 8 / 2)
+
+    def test_clear(self):
+        self.archive.append(_rows(10))
+        self.archive.clear()
+        self.assertEqual(self.archive.rows(0, math.inf), [])
+        self.assertEqual(os.listdir(self.archive.directory), [])
+
+    def test_missing_directory_reads_empty(self):
+        self.assertEqual(self.archive.rows(0, math.inf), [])
+        self.assertEqual(self.archive.count(0, math.inf), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,275 @@
+"""Tests for AsyncAPIServer — asyncio HTTP front end and native streams."""
+
+import asyncio
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from storm_sense.api_server import ApiServer
+from storm_sense.async_server import AsyncAPIServer, _parse_head
+from storm_sense.config import StormLevel
+
+from tests.test_api_server import _make_mock_sensor, _reading
+
+
+async def _read_response(reader: asyncio.StreamReader, head_only: bool = False):
+    """``(status, headers, body)`` of one Content-Length response."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    body = b'' if head_only else await reader.readexactly(length)
+    return status, headers, body
+
+
+async def _next_event(reader: asyncio.StreamReader) -> bytes:
+    """Next non-comment SSE frame."""
+    while True:
+        frame = await asyncio.wait_for(reader.readuntil(b'\n\n'), 5)
+        if not frame.startswith(b':'):
+            return frame
+
+
+class _ServerTest(unittest.TestCase):
+    """Runs each scenario against a live server on a free port."""
+
+    threads = 4
+    max_streams = 512
+
+    def setUp(self):
+        self.mock_sensor = _make_mock_sensor()
+        self.mock_sensor.get_history.return_value = [_reading(100.0)]
+        self.api = ApiServer(self.mock_sensor)
+        self.publish = self.mock_sensor.add_listener.call_args_list[0][0][0]
+        self.executor = ThreadPoolExecutor(self.threads)
+        self.addCleanup(self.executor.shutdown)
+        patcher = patch('storm_sense.api_server._STREAM_KEEPALIVE_S', 0.05)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, scenario):
+        async def main():
+            server = AsyncAPIServer(
+                self.api, self.executor, host='127.0.0.1', port=0,
+                threads=self.threads, max_streams=self.max_streams,
+            )
+            await server.start()
+            try:
+                return await asyncio.wait_for(scenario(server), 20)
+            finally:
+                await server.close()
+
+        return asyncio.run(main())
+
+    async def _connect(self, server):
+        return await asyncio.open_connection('127.0.0.1', server.port)
+
+    async def _open_stream(self, server, *extra: bytes):
+        reader, writer = await self._connect(server)
+        writer.write(b'GET /api/stream HTTP/1.1\r\n' + b''.join(extra) + b'\r\n')
+        head = await reader.readuntil(b'\r\n\r\n')
+        return reader, writer, head
+
+
+class TestRequests(_ServerTest):
+    """Plain requests go through the Flask app on the executor."""
+
+    def test_status(self):
+        async def scenario(server):
+            reader, writer = await self._connect(server)
+            writer.write(b'GET /api/status HTTP/1.1\r\nHost: x\r\n\r\n')
+            result = await _read_response(reader)
+            writer.close()
+            return result
+
+        status, headers, body = self._run(scenario)
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['pressure'], 1013.25)
+        self.assertEqual(headers['access-control-allow-origin'], '*')
+
+    def test_keep_alive_serves_several_requests(self):
+        async def scenario(server):
+            reader, writer = await self._connect(server)
+            statuses = []
+            for path in (b'/api/health', b'/api/status', b'/api/nope'):
+                writer.write(b'GET ' + path + b' HTTP/1.1\r\nHost: x\r\n\r\n')
+                statuses.append((await _read_response(reader))[0])
+            writer.close()
+            return statuses
+
+        self.assertEqual(self._run(scenario), [200, 200, 404])
+
+    def test_connection_close(self):
+        async def scenario(server):
+            reader, writer = await self._connect(server)
+            writer.write(
+                b'GET /api/health HTTP/1.1\r\nConnection: close\r\n\r\n',
+            )
+            status, headers, _ = await _read_response(reader)
+            rest = await reader.read()
+            writer.close()
+            return status, headers, rest
+
+        status, headers, rest = self._run(scenario)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['connection'], 'close')
+        self.assertEqual(rest, b'')
+
+    def test_head_has_no_body(self):
+        async def scenario(server):
+            reader, writer = await self._connect(server)
+            writer.write(b'HEAD /api/status HTTP/1.1\r\n\r\n')
+            status, headers, _ = await _read_response(reader, head_only=True)
+            # The next response follows directly on the same connection
+            writer.write(b'GET /api/health HTTP/1.1\r\n\r\n')
+            following = (await _read_response(reader))[0]
+            writer.close()
+            return status, headers, following
+
+        status, headers, following = self._run(scenario)
+        self.assertEqual(status, 200)
+        self.assertGreater(int(headers['content-length']), 0)
+        self.assertEqual(following, 200)
+
+    def test_malformed_request(self):
+        async def scenario(server):
+            reader, writer = await self._connect(server)
+            writer.write(b'NONSENSE\r\n\r\n')
+            result = await _read_response(reader)
+            writer.close()
+            return result
+
+        self.assertEqual(self._run(scenario)[0], 400)
+
+    def test_parse_head(self):
+        method, target, version, headers = _parse_head(
+            b'GET /a?b=1 HTTP/1.1\r\nX-A: 1\r\nx-a: 2\r\n\r\n',
+        )
+        self.assertEqual((method, target, version), ('GET', '/a?b=1', 'HTTP/1.1'))
+        self.assertEqual(headers, {'x-a': '1, 2'})
+        self.assertIsNone(_parse_head(b'GET / SPDY/3\r\n\r\n'))
+
+
+class TestNativeStream(_ServerTest):
+    """/api/stream is served on the loop, without a thread per client."""
+
+    def test_stream_pushes_readings(self):
+        async def scenario(server):
+            reader, writer, head = await self._open_stream(server)
+            retry = await reader.readuntil(b'\n\n')
+            first = await _next_event(reader)
+            self.publish(_reading(105.0), StormLevel.FAIR)
+            pushed = await _next_event(reader)
+            writer.close()
+            return head, retry, first, pushed
+
+        head, retry, first, pushed = self._run(scenario)
+        self.assertIn(b'200 OK', head)
+        self.assertIn(b'text/event-stream', head)
+        self.assertEqual(retry, b'retry: 5000\n\n')
+        self.assertTrue(first.startswith(b'id: 100.0\n'))
+        self.assertTrue(pushed.startswith(b'id: 105.0\n'))
+
+    def test_last_event_id_replays(self):
+        self.mock_sensor.get_session_log.return_value = [
+            _reading(100.0), _reading(105.0), _reading(110.0),
+        ]
+
+        async def scenario(server):
+            reader, writer, _ = await self._open_stream(
+                server, b'Last-Event-ID: 100.0\r\n',
+            )
+            await reader.readuntil(b'\n\n')
+            frames = [await _next_event(reader), await _next_event(reader)]
+            writer.close()
+            return frames
+
+        first, second = self._run(scenario)
+        self.assertTrue(first.startswith(b'id: 105.0\n'))
+        self.assertTrue(second.startswith(b'id: 110.0\n'))
+
+    def test_many_idle_streams_with_fixed_threads(self):
+        clients = 200
+
+        async def scenario(server):
+            streams = [await self._open_stream(server) for _ in range(clients)]
+            for reader, _, _ in streams:
+                await reader.readuntil(b'\n\n')
+                await _next_event(reader)
+            subscribers = self.api.events.subscriber_count
+            threads = threading.active_count()
+            self.publish(_reading(105.0), StormLevel.FAIR)
+            pushed = [await _next_event(reader) for reader, _, _ in streams]
+            for _, writer, _ in streams:
+                writer.close()
+            return subscribers, threads, pushed
+
+        before = threading.active_count()
+        subscribers, threads, pushed = self._run(scenario)
+        self.assertEqual(subscribers, clients)
+        self.assertLessEqual(threads, before + self.threads)
+        self.assertTrue(all(frame.startswith(b'id: 105.0\n') for frame in pushed))
+
+    def test_close_ends_streams(self):
+        async def scenario(server):
+            reader, _, _ = await self._open_stream(server)
+            await reader.readuntil(b'\n\n')
+            await server.close()
+            # Everything up to EOF is keepalives or the initial reading
+            return await asyncio.wait_for(reader.read(), 5)
+
+        self._run(scenario)
+        self.assertEqual(self.api.events.subscriber_count, 0)
+
+
+class TestStreamRouting(_ServerTest):
+    """Any path Flask routes to /api/stream is served natively."""
+
+    threads = 2  # one app slot
+
+    def test_encoded_path_served_natively(self):
+        async def scenario(server):
+            reader, writer = await self._connect(server)
+            writer.write(b'GET /api/%73tream HTTP/1.1\r\n\r\n')
+            head = await reader.readuntil(b'\r\n\r\n')
+            await reader.readuntil(b'\n\n')
+            await _next_event(reader)
+            # A Flask-served stream would hold the only app slot
+            busy = server._slots.locked()
+            writer.close()
+            return head, busy
+
+        head, busy = self._run(scenario)
+        self.assertIn(b'text/event-stream', head)
+        self.assertFalse(busy)
+
+
+class TestStreamLimit(_ServerTest):
+    """Streams beyond max_streams are refused with 503."""
+
+    max_streams = 1
+
+    def test_limit(self):
+        async def scenario(server):
+            _, first, _ = await self._open_stream(server)
+            reader, writer = await self._connect(server)
+            writer.write(b'GET /api/stream HTTP/1.1\r\n\r\n')
+            result = await _read_response(reader)
+            first.close()
+            writer.close()
+            return result
+
+        status, _, body = self._run(scenario)
+        self.assertEqual(status, 503)
+        self.assertIn('error', json.loads(body))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""Tests for downsample — Largest-Triangle-Three-Buckets selection."""
+
+from __future__ import annotations
+
+import math
+import unittest
+
+from storm_sense.downsample import lttb_indices, lttb_pairs
+
+
+def _series(n: int = 1000) -> tuple[list[float], list[float]]:
+    """A smooth pressure curve with one sharp dip at index 437 (if present)."""
+    x = [1700000000.0 + i * 5 for i in range(n)]
+    y = [
+        995.0 if i == 437 else 1013.0 + 2.0 * math.sin(i / 80.0)
+        for i in range(n)
+    ]
+    return x, y
+
+
+class TestLttbIndices(unittest.TestCase):
+    """lttb_indices() keeps the shape-defining points."""
+
+    def test_returns_threshold_points(self):
+        x, y = _series()
+        self.assertEqual(len(lttb_indices(x, y, 100)), 100)
+
+    def test_keeps_first_and_last(self):
+        x, y = _series()
+        idx = lttb_indices(x, y, 50)
+        self.assertEqual(idx[0], 0)
+        self.assertEqual(idx[-1], len(x) - 1)
+
+    def test_indices_strictly_increasing(self):
+        x, y = _series()
+        idx = lttb_indices(x, y, 73)
+        self.assertEqual(idx, sorted(set(idx)))
+
+    def test_preserves_sharp_dip(self):
+        x, y = _series()
+        self.assertIn(437, lttb_indices(x, y, 40))
+
+    def test_threshold_above_length_keeps_everything(self):
+        x, y = _series(10)
+        self.assertEqual(lttb_indices(x, y, 10), list(range(10)))
+        self.assertEqual(lttb_indices(x, y, 500), list(range(10)))
+
+    def test_tiny_thresholds(self):
+        x, y = _series(10)
+        self.assertEqual(lttb_indices(x, y, 2), [0, 9])
+        self.assertEqual(lttb_indices(x, y, 1), [9])
+
+    def test_empty_series(self):
+        self.assertEqual(lttb_indices([], [], 10), [])
+
+    def test_pairs_use_first_two_items(self):
+        x, y = _series()
+        rows = [(t, v, i) for i, (t, v) in enumerate(zip(x, y))]
+        self.assertEqual(lttb_pairs(rows, 40), lttb_indices(x, y, 40))
+
+
+class TestLttbReference(unittest.TestCase):
+    """Selections match a direct transcription of the LTTB definition."""
+
+    @staticmethod
+    def _reference(x, y, threshold):
+        n = len(x)
+        every = (n - 2) / (threshold - 2)
+        selected = [0]
+        for i in range(threshold - 2):
+            lo = int(i * every) + 1
+            hi = int((i + 1) * every) + 1 if i < threshold - 3 else n - 1
+            next_hi = int((i + 2) * every) + 1 if i < threshold - 4 else n - 1
+            nxt = range(hi, next_hi) if i < threshold - 3 else range(n - 1, n)
+            avg_x = sum(x[k] - x[0] for k in nxt) / len(nxt)
+            avg_y = sum(y[k] for k in nxt) / len(nxt)
+            a = selected[-1]
+            ax, ay = x[a] - x[0], y[a]
+            areas = [
+                abs((ax - avg_x) * (y[j] - ay) - (ax - (x[j] - x[0])) * (avg_y - ay))
+                for j in range(lo, hi)
+            ]
+            selected.append(lo + areas.index(max(areas)))
+        selected.append(n - 1)
+        return selected
+
+    def test_matches_reference(self):
+        x, y = _series(2000)
+        for threshold in (3, 4, 17, 250, 1999):
+            self.assertEqual(
+                lttb_indices(x, y, threshold), self._reference(x, y, threshold),
+                threshold,
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Tests for EventBroadcaster — pre-serialised SSE fan-out."""
+
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from storm_sense.event_stream import EventBroadcaster, format_event
+
+
+class TestFormatEvent(unittest.TestCase):
+
+    def test_frame_layout(self):
+        frame = format_event('reading', {'pressure': 1013.5}, '1700000000.5')
+        self.assertEqual(
+            frame,
+            b'id: 1700000000.5\nevent: reading\ndata: {"pressure":1013.5}\n\n',
+        )
+
+    def test_frame_without_id(self):
+        self.assertEqual(format_event('x', {}), b'event: x\ndata: {}\n\n')
+
+
+class TestEventBroadcaster(unittest.TestCase):
+    """Subscribers block until new frames arrive and share one encoding."""
+
+    def test_wait_returns_frames_after_cursor(self):
+        events = EventBroadcaster()
+        events.publish([(1.0, b'a')])
+        cursor = events.cursor
+        events.publish([(2.0, b'b'), (2.0, b'c')])
+        frames, cursor = events.wait(cursor, timeout=0)
+        self.assertEqual(frames, [(2.0, b'b'), (2.0, b'c')])
+        self.assertEqual(cursor, 3)
+
+    def test_wait_times_out_empty(self):
+        events = EventBroadcaster()
+        started = time.monotonic()
+        self.assertEqual(events.wait(events.cursor, timeout=0.05), ([], 0))
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+
+    def test_publish_wakes_all_waiters(self):
+        events = EventBroadcaster()
+        received = []
+
+        def subscriber():
+            frames, _ = events.wait(events.cursor, timeout=5)
+            received.append(frames)
+
+        threads = [threading.Thread(target=subscriber) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        events.publish([(1.0, b'frame')])
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(received, [[(1.0, b'frame')]] * 5)
+        # Every subscriber got the very same bytes object
+        self.assertEqual(len({id(frames[0][1]) for frames in received}), 1)
+
+    def test_backlog_is_bounded(self):
+        events = EventBroadcaster(backlog=3)
+        events.publish([(float(i), b'x') for i in range(10)])
+        frames, cursor = events.wait(0, timeout=0)
+        self.assertEqual([key for key, _ in frames], [7.0, 8.0, 9.0])
+        self.assertEqual(cursor, 10)
+
+    def test_subscriber_limit(self):
+        events = EventBroadcaster()
+        self.assertTrue(events.try_subscribe(2))
+        self.assertTrue(events.try_subscribe(2))
+        self.assertFalse(events.try_subscribe(2))
+        events.unsubscribe()
+        self.assertTrue(events.try_subscribe(2))
+        self.assertEqual(events.subscriber_count, 2)
+
+    def test_close_wakes_waiters(self):
+        events = EventBroadcaster()
+        done = threading.Event()
+
+        def subscriber():
+            events.wait(events.cursor, timeout=10)
+            done.set()
+
+        threading.Thread(target=subscriber).start()
+        time.sleep(0.05)
+        events.close()
+        self.assertTrue(done.wait(timeout=5))
+        self.assertTrue(events.closed)
+        self.assertFalse(events.try_subscribe(10))
+
+
+    def test_poll_and_wakers(self):
+        events = EventBroadcaster()
+        woken = []
+
+        def waker():
+            woken.append(events.cursor)
+
+        events.add_waker(waker)
+        cursor = events.cursor
+        self.assertEqual(events.poll(cursor), ([], 0))
+        events.publish([(1.0, b'a')])
+        self.assertEqual(woken, [1])
+        self.assertEqual(events.poll(cursor), ([(1.0, b'a')], 1))
+        events.close()
+        self.assertEqual(woken, [1, 1])
+        events.remove_waker(waker)
+        events.publish([(2.0, b'b')])
+        self.assertEqual(len(woken), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Tests for RowFrame — row tuples rendered as list, columnar or binary."""
+
+import struct
+import unittest
+from array import array
+
+from storm_sense.frame import BINARY_MAGIC, RowFrame
+
+COLUMNS = ('timestamp', 'pressure', 'storm_level')
+ROWS = [
+    (1700000000.0, 1013.25, 0),
+    (1700000005.0, 1012.5, 1),
+    (1700000010.0, 1011.75, 2),
+]
+
+
+def _unpack(body: bytes) -> dict:
+    """Reference decoder for the SSC1 layout, as a client would write it."""
+    magic, rows, ncols, _ = struct.unpack_from('<4sIHH', body)
+    assert magic == BINARY_MAGIC
+    offset = 12
+    specs = []
+    for _ in range(ncols):
+        size = body[offset]
+        name = body[offset + 1:offset + 1 + size].decode()
+        typecode = chr(body[offset + 1 + size])
+        specs.append((name, typecode))
+        offset += size + 2
+    offset += -offset % 8
+    columns = {}
+    for name, typecode in specs:
+        values = array(typecode)
+        width = values.itemsize * rows
+        values.frombytes(body[offset:offset + width])
+        columns[name] = values.tolist()
+        offset += width + (-width % 8)
+    assert offset == len(body)
+    return columns
+
+
+class TestRowFrameShapes(unittest.TestCase):
+    """dicts() and to_columns() render the same rows."""
+
+    def setUp(self):
+        self.frame = RowFrame(COLUMNS, list(ROWS))
+
+    def test_dicts(self):
+        self.assertEqual(
+            self.frame.dicts()[1],
+            {'timestamp': 1700000005.0, 'pressure': 1012.5, 'storm_level': 1},
+        )
+        self.assertEqual(len(self.frame), 3)
+
+    def test_to_columns(self):
+        self.assertEqual(self.frame.to_columns(), {
+            'timestamp': [1700000000.0, 1700000005.0, 1700000010.0],
+            'pressure': [1013.25, 1012.5, 1011.75],
+            'storm_level': [0, 1, 2],
+        })
+
+    def test_empty_frame_keeps_column_names(self):
+        frame = RowFrame(COLUMNS, [])
+        self.assertEqual(frame.dicts(), [])
+        self.assertEqual(frame.to_columns(), {name: [] for name in COLUMNS})
+
+    def test_select_projects_columns(self):
+        frame = self.frame.select(('timestamp', 'storm_level'))
+        self.assertEqual(frame.columns, ('timestamp', 'storm_level'))
+        self.assertEqual(frame.rows[2], (1700000010.0, 2))
+        self.assertIs(self.frame.select(COLUMNS), self.frame)
+
+    def test_from_dicts_orders_by_columns(self):
+        frame = RowFrame.from_dicts(COLUMNS, self.frame.dicts())
+        self.assertEqual(frame.rows, ROWS)
+
+
+class TestRowFramePack(unittest.TestCase):
+    """pack() produces aligned little-endian column arrays."""
+
+    def test_round_trip(self):
+        body = RowFrame(COLUMNS, list(ROWS)).pack()
+        self.assertEqual(_unpack(body), RowFrame(COLUMNS, list(ROWS)).to_columns())
+
+    def test_columns_are_8_byte_aligned(self):
+        body = RowFrame(COLUMNS, list(ROWS)).pack()
+        self.assertEqual(len(body) % 8, 0)
+        # Header (12) + names (11+2, 8+2, 11+2) = 48, already aligned
+        ts = struct.unpack_from('<3d', body, 48)
+        self.assertEqual(ts, (1700000000.0, 1700000005.0, 1700000010.0))
+
+    def test_int_columns_packed_as_int32(self):
+        body = RowFrame(('storm_level',), [(1,), (2,), (3,)]).pack()
+        self.assertEqual(_unpack(body), {'storm_level': [1, 2, 3]})
+        # 12 header + 14 name spec, padded to 32; 12 value bytes padded to 16
+        self.assertEqual(len(body), 48)
+
+    def test_empty_frame(self):
+        body = RowFrame(COLUMNS, []).pack()
+        self.assertEqual(_unpack(body), {name: [] for name in COLUMNS})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 """Tests for HATInterface -- display, LEDs, buzzer, and button callbacks."""
 
+import threading
 import unittest
 from unittest.mock import MagicMock, call, patch
 
@@ -314,5 +315,156 @@ class TestShowText(unittest.TestCase):
         mock_rh.display.print_str.assert_called_with("HELL")
 
 
+
+class TestActuatorWorker(unittest.TestCase):
+    """With the worker started, calls queue, coalesce and run in order."""
+
+    def setUp(self) -> None:
+        patcher = patch(MODULE)
+        self.mock_rh = patcher.start()
+        self.addCleanup(patcher.stop)
+        time_patcher = patch("storm_sense.hat_interface.time")
+        time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+
+        from storm_sense.hat_interface import HATInterface
+
+        self.hat = HATInterface()
+        self.hat.start_worker()
+        self.addCleanup(self.hat.stop_worker, 2.0)
+
+        # The first note holds the worker until release is set
+        self.playing = threading.Event()
+        self.release = threading.Event()
+
+        def note(*_args) -> None:
+            self.playing.set()
+            self.release.wait(2.0)
+
+        self.mock_rh.buzzer.midi_note.side_effect = note
+
+    def _hold_worker(self) -> None:
+        self.hat.buzz_alert(StormLevel.CHANGE)
+        self.assertTrue(self.playing.wait(2.0))
+
+    def _drain(self) -> None:
+        self.release.set()
+        self.assertTrue(self.hat.wait_idle(2.0))
+
+    def test_alert_does_not_block_caller(self) -> None:
+        self._hold_worker()
+        # The note is still playing, yet the call returned
+        self.assertFalse(self.release.is_set())
+        self.hat.show_text("FAIR")
+        self.mock_rh.display.print_str.assert_not_called()
+        self._drain()
+        self.mock_rh.display.print_str.assert_called_once_with("FAIR")
+
+    def test_superseded_updates_coalesce(self) -> None:
+        self._hold_worker()
+        self.hat.show_temperature(20.0)
+        self.hat.update_leds(StormLevel.FAIR)
+        self.hat.show_pressure(1013.0)
+        self.hat.update_leds(StormLevel.RAIN)
+        self.assertEqual(self.hat.queue_depth, 2)
+        self._drain()
+        self.mock_rh.display.print_str.assert_called_once_with("1013")
+        self.mock_rh.rainbow.set_pixel.assert_called_once_with(5, 80, 30, 0)
+
+    def test_alerts_are_never_coalesced(self) -> None:
+        self._hold_worker()
+        self.hat.buzz_alert(StormLevel.CHANGE)
+        self.hat.buzz_alert(StormLevel.CHANGE)
+        self._drain()
+        self.assertEqual(self.mock_rh.buzzer.midi_note.call_count, 3)
+
+    def test_newer_update_runs_after_clear(self) -> None:
+        self._hold_worker()
+        self.hat.show_text("OLD ")
+        self.hat.clear_all()
+        self.hat.show_text("NEW ")
+        self._drain()
+        names = [name for name, _, _ in self.mock_rh.display.method_calls]
+        self.assertEqual(names, ["clear", "print_str", "show"])
+        self.mock_rh.display.print_str.assert_called_once_with("NEW ")
+
+    def test_failing_command_does_not_stop_worker(self) -> None:
+        self.mock_rh.display.print_str.side_effect = [RuntimeError("i2c"), None]
+        with self.assertLogs("storm_sense.hat_interface", "ERROR"):
+            self.hat.show_text("ERR ")
+            self.assertTrue(self.hat.wait_idle(2.0))
+        self.hat.show_text("OK  ")
+        self.assertTrue(self.hat.wait_idle(2.0))
+        self.assertEqual(self.mock_rh.display.print_str.call_count, 2)
+
+    def test_stop_worker_drains_then_runs_inline(self) -> None:
+        self._hold_worker()
+        self.hat.show_text("LAST")
+        self.release.set()
+        self.hat.stop_worker(2.0)
+        self.mock_rh.display.print_str.assert_called_once_with("LAST")
+        self.hat.show_text("NOW ")
+        self.mock_rh.display.print_str.assert_called_with("NOW ")
+
+    def test_stop_worker_runs_commands_posted_during_shutdown(self) -> None:
+        worker = self.hat._worker
+
+        def join(timeout=None) -> None:
+            threading.Thread.join(worker, timeout)
+            # Posted after the worker's last look at the queue
+            self.hat.show_text("LATE")
+
+        worker.join = join
+        self.hat.stop_worker(2.0)
+        self.mock_rh.display.print_str.assert_called_once_with("LATE")
+        self.assertEqual(self.hat.queue_depth, 0)
+
+    def test_stop_worker_timeout_drops_queue(self) -> None:
+        self._hold_worker()
+        self.hat.show_text("LAST")
+        with self.assertLogs("storm_sense.hat_interface", "WARNING"):
+            self.hat.stop_worker(0.01)
+        self.assertEqual(self.hat.queue_depth, 0)
+        self.release.set()
+        self.mock_rh.display.print_str.assert_not_called()
+
+
+class TestActuatorRunner(unittest.TestCase):
+    """With a runner attached, calls queue until run_queued() drains them."""
+
+    def setUp(self) -> None:
+        patcher = patch(MODULE)
+        self.mock_rh = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        from storm_sense.hat_interface import HATInterface
+
+        self.hat = HATInterface()
+        self.notify = MagicMock()
+        self.hat.attach_runner(self.notify)
+
+    def test_queues_and_notifies(self) -> None:
+        self.hat.show_text("WAIT")
+        self.hat.update_leds(StormLevel.FAIR)
+        self.mock_rh.display.print_str.assert_not_called()
+        self.assertEqual(self.notify.call_count, 2)
+        self.assertEqual(self.hat.queue_depth, 2)
+        self.assertEqual(self.hat.run_queued(), 2)
+        self.mock_rh.display.print_str.assert_called_once_with("WAIT")
+        self.assertEqual(self.hat.queue_depth, 0)
+
+    def test_updates_coalesce_until_run(self) -> None:
+        self.hat.show_temperature(20.0)
+        self.hat.show_pressure(1013.0)
+        self.assertEqual(self.hat.run_queued(), 1)
+        self.mock_rh.display.print_str.assert_called_once_with("1013")
+
+    def test_detach_runs_inline(self) -> None:
+        self.hat.detach_runner()
+        self.hat.show_text("NOW ")
+        self.mock_rh.display.print_str.assert_called_once_with("NOW ")
+        self.notify.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,13 +3,23 @@
 from __future__ import annotations
 
 import os
+import shutil
 import sqlite3
 import tempfile
+import threading
 import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
-from storm_sense.history_store import HistoryStore, PRUNE_MAX_AGE_S
+from storm_sense.history_store import (
+    BUCKET_COLUMNS,
+    CursorExpired,
+    HistoryStore,
+    PRUNE_MAX_AGE_S,
+    bucket_columns,
+    bucket_readings,
+    history_columns,
+)
 
 
 def _make_store(db_path: str | None = None) -> tuple[HistoryStore, str]:
@@ -98,7 +108,10 @@ class TestHistoryStoreBasics(unittest.TestCase):
             self.store.add_reading(_sample_reading(ts=1700000000.0 + i))
 
         rows = self.store.get_history(limit=2, since=1700000004.5)
-        self.assertEqual(len(rows), 2)
+        self.assertLessEqual(len(rows), 2)
+        # Only the 5 readings after since are aggregated
+        self.assertEqual(sum(r['count'] for r in rows), 5)
+        self.assertTrue(all(r['timestamp'] > 1700000004.5 for r in rows))
 
     def test_reading_dict_has_all_fields(self):
         self.store.add_reading(_sample_reading())
@@ -110,6 +123,374 @@ class TestHistoryStoreBasics(unittest.TestCase):
         self.assertEqual(set(row.keys()), expected_keys)
 
 
+class TestHistoryStoreRollups(unittest.TestCase):
+    """Rollup tiers are maintained on write and serve wide history queries."""
+
+    START = 1700006400.0  # aligned to the hour
+
+    def setUp(self):
+        self.store, self.path = _make_store()
+        # Two hours of 5-second readings with a pressure dip in the middle
+        for i in range(1440):
+            pressure = 990.0 if i == 700 else 1013.0 + (i % 12) * 0.1
+            self.store.add_reading(
+                _sample_reading(ts=self.START + i * 5, pressure=pressure),
+            )
+
+    def tearDown(self):
+        self.store.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.unlink(self.path + suffix)
+
+    def test_small_range_returns_raw_rows(self):
+        rows = self.store.get_history(limit=100, since=self.START + 7000)
+        self.assertEqual(len(rows), 39)
+        self.assertNotIn('count', rows[0])
+
+    def test_picks_minute_tier_when_it_fits(self):
+        rows = self.store.get_history(limit=200, since=self.START - 1)
+        self.assertEqual(len(rows), 120)
+        self.assertTrue(all(r['count'] == 12 for r in rows))
+
+    def test_picks_quarter_hour_tier(self):
+        rows = self.store.get_history(limit=10, since=self.START - 1)
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[1]['timestamp'], self.START + 900)
+
+    def test_first_bucket_clipped_to_since(self):
+        # since lands half-way into the first minute
+        rows = self.store.get_history(limit=200, since=self.START + 30)
+        self.assertEqual(len(rows), 120)
+        self.assertEqual(rows[0]['timestamp'], self.START + 35)
+        self.assertEqual(rows[0]['count'], 5)
+        self.assertEqual(rows[1]['timestamp'], self.START + 60)
+        self.assertEqual(sum(r['count'] for r in rows), 1440 - 7)
+
+    def test_widens_buckets_until_limit_fits(self):
+        rows = self.store.get_history(limit=1, since=self.START - 1)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['count'], 1440)
+
+    def test_bucket_aggregates(self):
+        rows = self.store.get_history(limit=10, since=self.START - 1)
+        # Reading 700 (t = 3500 s) lands in the fourth 15-minute bucket
+        dip = rows[3]
+        self.assertAlmostEqual(dip['pressure_min'], 990.0)
+        self.assertAlmostEqual(dip['pressure_max'], 1014.1)
+        self.assertEqual(dip['count'], 180)
+        self.assertLess(dip['pressure'], dip['pressure_max'])
+        self.assertIsInstance(dip['storm_level'], int)
+
+    def test_rollups_backfilled_for_existing_database(self):
+        self.store.close()
+        conn = sqlite3.connect(self.path)
+        for table in ('readings_1m', 'readings_15m', 'readings_1h'):
+            conn.execute(f'DROP TABLE {table}')
+        conn.commit()
+        conn.close()
+
+        self.store = HistoryStore(db_path=self.path)
+        rows = self.store.get_history(limit=10, since=self.START - 1)
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(sum(r['count'] for r in rows), 1440)
+
+    def test_clear_empties_rollups(self):
+        self.store.clear()
+        self.assertEqual(self.store.get_history(limit=10, since=1), [])
+
+
+class TestHistoryStoreBuckets(unittest.TestCase):
+    """get_buckets() aggregates min/mean/max per fixed-width time bucket."""
+
+    START = 1700006400.0  # aligned to the hour
+
+    def setUp(self):
+        self.store, self.path = _make_store()
+        # One hour of 5-second readings; pressure ramps 1000 -> 1071.9
+        for i in range(720):
+            self.store.add_reading(
+                _sample_reading(ts=self.START + i * 5, pressure=1000.0 + i * 0.1),
+            )
+
+    def tearDown(self):
+        self.store.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.unlink(self.path + suffix)
+
+    def test_sub_minute_buckets_from_raw_rows(self):
+        rows = self.store.get_buckets(30, since=self.START, limit=1000)
+        self.assertEqual(len(rows), 120)
+        first = rows[0]
+        self.assertEqual(first['timestamp'], self.START)
+        self.assertEqual(first['count'], 6)
+        self.assertAlmostEqual(first['pressure_min'], 1000.0)
+        self.assertAlmostEqual(first['pressure_max'], 1000.5)
+        self.assertAlmostEqual(first['pressure'], 1000.25)
+
+    def test_tier_buckets_match_raw_aggregation(self):
+        raw = bucket_readings(self.store.get_latest(limit=1000), 120)
+        rows = self.store.get_buckets(120, since=self.START, limit=1000)
+        self.assertEqual(len(rows), len(raw))
+        for got, want in zip(rows, raw):
+            self.assertEqual(got['timestamp'], want['timestamp'])
+            self.assertEqual(got['count'], want['count'])
+            self.assertAlmostEqual(got['pressure'], want['pressure'])
+            self.assertAlmostEqual(got['pressure_min'], want['pressure_min'])
+            self.assertAlmostEqual(got['pressure_max'], want['pressure_max'])
+
+    def test_limit_keeps_most_recent_buckets(self):
+        rows = self.store.get_buckets(600, since=self.START, limit=2)
+        self.assertEqual(
+            [r['timestamp'] for r in rows],
+            [self.START + 2400, self.START + 3000],
+        )
+
+    def test_since_zero_returns_latest_buckets(self):
+        rows = self.store.get_buckets(900, limit=2)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[-1]['timestamp'], self.START + 2700)
+
+    def test_buffered_readings_are_aggregated(self):
+        self.store.add_reading(
+            _sample_reading(ts=self.START + 3600, pressure=950.0),
+        )
+        self.assertGreater(self.store.pending_count, 0)
+        rows = self.store.get_buckets(3600, since=self.START, limit=10)
+        self.assertEqual(len(rows), 2)
+        self.assertAlmostEqual(rows[-1]['pressure_min'], 950.0)
+        self.assertEqual(rows[-1]['count'], 1)
+
+    def test_auto_width_sized_to_oldest_reading(self):
+        # A window reaching far before the first reading must not flatten it
+        rows = self.store.get_history(limit=500, since=1)
+        self.assertEqual(len(rows), 360)
+        self.assertEqual(rows[0]['timestamp'], self.START)
+        self.assertEqual(rows[0]['count'], 2)
+        self.assertEqual(rows, self.store.get_history(limit=500, since=self.START - 1))
+
+    def test_auto_width_keeps_extremes(self):
+        rows = self.store.get_history(limit=50, since=self.START - 1)
+        self.assertLessEqual(len(rows), 50)
+        self.assertAlmostEqual(min(r['pressure_min'] for r in rows), 1000.0)
+        self.assertAlmostEqual(max(r['pressure_max'] for r in rows), 1071.9)
+
+    def test_unavailable_store_returns_empty(self):
+        self.store.close()
+        self.assertEqual(self.store.get_buckets(60), [])
+
+
+class TestHistoryStoreLttb(unittest.TestCase):
+    """get_history_lttb() returns real readings chosen to keep the shape."""
+
+    def setUp(self):
+        self.store, self.path = _make_store()
+        for i in range(500):
+            pressure = 990.0 if i == 321 else 1013.0
+            self.store.add_reading(
+                _sample_reading(ts=1700000000.0 + i * 5, pressure=pressure),
+            )
+
+    def tearDown(self):
+        self.store.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.unlink(self.path + suffix)
+
+    def test_limits_rows_and_keeps_extreme(self):
+        rows = self.store.get_history_lttb(limit=20, since=1)
+        self.assertEqual(len(rows), 20)
+        self.assertIn(990.0, [r['pressure'] for r in rows])
+        self.assertEqual(rows[-1]['timestamp'], 1700000000.0 + 499 * 5)
+
+    def test_rows_are_raw_readings(self):
+        rows = self.store.get_history_lttb(limit=20)
+        expected_keys = {
+            'timestamp', 'temperature', 'temperature_f',
+            'raw_temperature', 'pressure', 'storm_level',
+        }
+        self.assertEqual(set(rows[0].keys()), expected_keys)
+        self.assertIsInstance(rows[0]['storm_level'], int)
+
+    def test_small_range_returned_whole(self):
+        rows = self.store.get_history_lttb(limit=20, since=1700000000.0 + 490 * 5)
+        self.assertEqual(len(rows), 9)
+
+    def test_unknown_field_rejected(self):
+        with self.assertRaises(ValueError):
+            self.store.get_history_lttb(field='humidity')
+
+    def test_repeated_timestamps_not_duplicated(self):
+        # Every stored timestamp appears twice; only selected rows come back
+        for i in range(500):
+            self.store.add_reading(
+                _sample_reading(ts=1700000000.0 + i * 5, pressure=1013.0),
+            )
+        self.store.flush()
+        rows = self.store.get_history_lttb(limit=20, since=1)
+        self.assertEqual(len(rows), 20)
+        # The dip's twin reads 1013.0; only the selected reading is returned
+        self.assertEqual([r['pressure'] for r in rows].count(990.0), 1)
+
+    def test_wide_range_selects_over_minute_tier(self):
+        # 500 readings for 20 points is past LTTB_TIER_RATIO
+        since = 1700000000.0 + 7  # part-way into a minute
+        self.store.add_reading(_sample_reading(ts=1700002500.0, pressure=980.0))
+        with patch.object(self.store, '_rows_at', side_effect=AssertionError):
+            rows = self.store.get_history_lttb(limit=20, since=since)
+        self.assertEqual(len(rows), 20)
+        pressures = [r['pressure'] for r in rows]
+        self.assertIn(990.0, pressures)
+        self.assertEqual(rows[-1]['pressure'], 980.0)
+        timestamps = [r['timestamp'] for r in rows]
+        self.assertEqual(timestamps, sorted(set(timestamps)))
+        self.assertGreater(timestamps[0], since)
+        # Every row is a stored reading
+        raw = {
+            (r['timestamp'], r['pressure'])
+            for r in self.store.get_history(limit=1000, since=since)
+        }
+        self.assertTrue(all((r['timestamp'], r['pressure']) in raw for r in rows))
+
+
+class TestHistoryStoreFrames(unittest.TestCase):
+    """The *_frame() queries return the dict queries' rows as tuples."""
+
+    START = 1700006400.0
+
+    def setUp(self):
+        self.store, self.path = _make_store()
+        for i in range(100):
+            self.store.add_reading(
+                _sample_reading(ts=self.START + i * 5, pressure=1000.0 + i),
+            )
+        self.store.flush()
+        # A couple of readings still buffered
+        for i in range(100, 102):
+            self.store.add_reading(
+                _sample_reading(ts=self.START + i * 5, pressure=1000.0 + i),
+            )
+
+    def tearDown(self):
+        self.store.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.unlink(self.path + suffix)
+
+    def test_history_frame_matches_get_history(self):
+        frame = self.store.get_history_frame(limit=50, since=self.START + 400)
+        self.assertEqual(len(frame), 21)
+        self.assertIsInstance(frame.rows[0], tuple)
+        self.assertEqual(
+            frame.dicts(), self.store.get_history(limit=50, since=self.START + 400),
+        )
+
+    def test_latest_frame_matches_get_latest(self):
+        frame = self.store.get_latest_frame(limit=10)
+        self.assertEqual(frame.to_columns()['pressure'][-1], 1101.0)
+        self.assertEqual(frame.dicts(), self.store.get_latest(limit=10))
+
+    def test_auto_bucketed_history_frame_uses_bucket_columns(self):
+        frame = self.store.get_history_frame(limit=10, since=self.START - 1)
+        self.assertEqual(frame.columns, BUCKET_COLUMNS)
+        self.assertEqual(sum(frame.to_columns()['count']), 102)
+
+    def test_buckets_frame_matches_get_buckets(self):
+        frame = self.store.get_buckets_frame(60, since=self.START - 1)
+        self.assertEqual(frame.columns, BUCKET_COLUMNS)
+        self.assertEqual(frame.dicts(), self.store.get_buckets(60, since=self.START - 1))
+        self.assertIsInstance(frame.to_columns()['storm_level'][0], int)
+
+    def test_lttb_frame_matches_get_history_lttb(self):
+        frame = self.store.get_lttb_frame(limit=20, since=1)
+        self.assertEqual(len(frame), 20)
+        self.assertEqual(frame.dicts(), self.store.get_history_lttb(limit=20, since=1))
+
+    def test_unavailable_store_returns_empty_frame(self):
+        self.store.close()
+        frame = self.store.get_history_frame(since=1)
+        self.assertEqual(len(frame), 0)
+        self.assertEqual(frame.to_columns()['timestamp'], [])
+
+
+class TestHistoryStoreProjection(unittest.TestCase):
+    """fields= narrows every query to the requested columns."""
+
+    START = 1700006400.0
+
+    def setUp(self):
+        self.store, self.path = _make_store()
+        for i in range(100):
+            self.store.add_reading(
+                _sample_reading(ts=self.START + i * 5, pressure=1000.0 + i),
+            )
+        self.store.flush()
+        self.store.add_reading(_sample_reading(ts=self.START + 500, pressure=1100.0))
+
+    def tearDown(self):
+        self.store.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.unlink(self.path + suffix)
+
+    def test_history_columns_canonical_order(self):
+        self.assertEqual(
+            history_columns(['storm_level', 'pressure']),
+            ('timestamp', 'pressure', 'storm_level'),
+        )
+        self.assertEqual(len(history_columns(None)), 6)
+        with self.assertRaises(ValueError):
+            history_columns(['humidity'])
+
+    def test_bucket_columns_follow_fields(self):
+        self.assertEqual(
+            bucket_columns(('timestamp', 'pressure')),
+            ('timestamp', 'pressure', 'pressure_min', 'pressure_max', 'count'),
+        )
+
+    def test_projected_rows_include_buffered(self):
+        full = self.store.get_history(limit=50, since=self.START + 400)
+        rows = self.store.get_history(
+            limit=50, since=self.START + 400, fields=['pressure'],
+        )
+        self.assertEqual(
+            rows, [{'timestamp': r['timestamp'], 'pressure': r['pressure']} for r in full],
+        )
+        self.assertEqual(rows[-1]['pressure'], 1100.0)
+
+    def test_latest_and_lttb_projected(self):
+        latest = self.store.get_latest(limit=3, fields=['temperature'])
+        self.assertEqual(set(latest[0]), {'timestamp', 'temperature'})
+        self.assertEqual(latest[-1]['timestamp'], self.START + 500)
+        lttb = self.store.get_history_lttb(limit=10, fields=['storm_level'])
+        self.assertEqual(len(lttb), 10)
+        self.assertEqual(set(lttb[-1]), {'timestamp', 'storm_level'})
+
+    def test_buckets_projected(self):
+        rows = self.store.get_buckets(3600, since=1, fields=['pressure'])
+        self.assertEqual(
+            tuple(rows[0]), bucket_columns(('timestamp', 'pressure')),
+        )
+        self.assertEqual(rows[-1]['pressure_max'], 1100.0)
+        auto = self.store.get_history(limit=5, since=1, fields=['pressure'])
+        self.assertIn('pressure_min', auto[0])
+        self.assertNotIn('temperature', auto[0])
+
+    def test_after_id_projected(self):
+        rows = self.store.get_after_id(99, fields=['pressure'])
+        self.assertEqual(
+            rows, [
+                {'id': 100, 'timestamp': self.START + 495, 'pressure': 1099.0},
+                {'id': 101, 'timestamp': self.START + 500, 'pressure': 1100.0},
+            ],
+        )
+
+    def test_unknown_field_rejected(self):
+        with self.assertRaises(ValueError):
+            self.store.get_history(fields=['humidity'])
+
+
 class TestHistoryStorePruning(unittest.TestCase):
     """Pruning deletes old rows and respects the hourly rate limit."""
 
@@ -120,6 +501,7 @@ class TestHistoryStorePruning(unittest.TestCase):
         self.store.close()
         if os.path.exists(self.path):
             os.unlink(self.path)
+        shutil.rmtree(self.path[:-3] + '_archive', ignore_errors=True)
 
     def test_prune_removes_old_readings(self):
         now = time.time()
@@ -136,6 +518,27 @@ class TestHistoryStorePruning(unittest.TestCase):
         self.assertEqual(deleted, 1)
         self.assertEqual(self.store.count(), 1)
 
+        # Rollup tiers outlive raw rows
+        for table in ('readings_1m', 'readings_15m', 'readings_1h'):
+            total = self.store._conn.execute(
+                f'SELECT SUM(n) FROM {table}',
+            ).fetchone()[0]
+            self.assertEqual(total, 2, table)
+
+    def test_prune_drops_tiers_past_their_own_retention(self):
+        now = time.time()
+        self.store.add_reading(_sample_reading(ts=now - 60 * 24 * 3600))
+        self.store.add_reading(_sample_reading(ts=now - 8 * 24 * 3600))
+        self.store._last_prune = 0
+        self.store.prune_if_due()
+
+        expected = {'readings_1m': 1, 'readings_15m': 2, 'readings_1h': 2}
+        for table, n in expected.items():
+            total = self.store._conn.execute(
+                f'SELECT SUM(n) FROM {table}',
+            ).fetchone()[0]
+            self.assertEqual(total, n, table)
+
     def test_prune_skips_when_recently_pruned(self):
         self.store._last_prune = time.time()  # just pruned
         deleted = self.store.prune_if_due()
@@ -151,6 +554,477 @@ class TestHistoryStorePruning(unittest.TestCase):
         self.assertEqual(deleted, 0)
         self.assertEqual(self.store.count(), 5)
 
+    def _add_backlog(self, n: int = 230) -> float:
+        """Add *n* readings older than the retention window plus 3 recent ones."""
+        now = time.time()
+        old = now - 30 * 24 * 3600
+        for i in range(n):
+            self.store.add_reading(_sample_reading(ts=old + i * 60))
+        for i in range(3):
+            self.store.add_reading(_sample_reading(ts=now - i * 60))
+        self.store.flush()
+        return now
+
+    def test_backlog_deleted_in_batches(self):
+        self._add_backlog()
+        self.store._last_prune = 0
+        with patch('storm_sense.history_store.PRUNE_BATCH_ROWS', 50), \
+             patch('storm_sense.history_store.PRUNE_BATCH_MIN_ROWS', 50), \
+             patch('storm_sense.history_store.PRUNE_BATCH_MAX_ROWS', 50), \
+             patch('storm_sense.history_store.PRUNE_PAUSE_S', 0):
+            deleted = self.store.prune_if_due()
+        self.assertEqual(deleted, 230)
+        self.assertEqual(self.store.count(), 3)
+        stats = self.store.prune_stats
+        self.assertEqual(stats['rows'], 230)
+        # 5 batches for readings, then tiers
+        self.assertGreaterEqual(stats['batches'], 5)
+        self.assertGreaterEqual(stats['total_ms'], stats['max_batch_ms'])
+
+    def test_background_prune(self):
+        self._add_backlog()
+        self.store._last_prune = 0
+        self.assertEqual(self.store.prune_if_due(block=False), 0)
+        self.store._prune_thread.join(timeout=5)
+        self.assertEqual(self.store.count(), 3)
+        self.assertEqual(self.store.prune_stats['rows'], 230)
+
+    def test_background_prune_not_doubled(self):
+        self.store._prune_thread = Mock()
+        self.store._prune_thread.is_alive.return_value = True
+        self.store._last_prune = 0
+        self.assertEqual(self.store.prune_if_due(), 0)
+        self.assertEqual(self.store._last_prune, 0)
+        self.store._prune_thread = None
+
+    def test_writer_lock_released_between_batches(self):
+        self._add_backlog()
+        self.store._last_prune = 0
+        acquired = []
+
+        def pause(_seconds):
+            # Runs between batches: the writer lock must be free here
+            acquired.append(self.store._lock.acquire(blocking=False))
+            self.store._lock.release()
+
+        with patch('storm_sense.history_store.PRUNE_BATCH_ROWS', 100), \
+             patch('storm_sense.history_store.PRUNE_BATCH_MAX_ROWS', 100), \
+             patch('storm_sense.history_store.time.sleep', side_effect=pause):
+            self.store.prune_if_due()
+        self.assertTrue(acquired)
+        self.assertTrue(all(acquired))
+
+    def test_batch_size_tracks_budget(self):
+        from storm_sense.history_store import (
+            PRUNE_BATCH_BUDGET_S,
+            PRUNE_BATCH_MAX_ROWS,
+            PRUNE_BATCH_MIN_ROWS,
+            _next_batch_size,
+        )
+        self.assertEqual(_next_batch_size(1000, PRUNE_BATCH_BUDGET_S), 1000)
+        self.assertEqual(_next_batch_size(1000, PRUNE_BATCH_BUDGET_S * 4), 500)
+        self.assertEqual(_next_batch_size(1000, PRUNE_BATCH_BUDGET_S / 4), 2000)
+        self.assertEqual(_next_batch_size(60, 10.0), PRUNE_BATCH_MIN_ROWS)
+        self.assertEqual(_next_batch_size(PRUNE_BATCH_MAX_ROWS, 0.0), PRUNE_BATCH_MAX_ROWS)
+
+
+class TestHistoryStoreGroupCommit(unittest.TestCase):
+    """Readings are buffered and written in batches, but stay readable."""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        os.unlink(self.path)
+        self.store = HistoryStore(
+            db_path=self.path, flush_max_rows=5, flush_interval_s=3600,
+        )
+
+    def tearDown(self):
+        self.store.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.unlink(self.path + suffix)
+
+    def _persisted_count(self) -> int:
+        """Count rows visible to an independent connection."""
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute('SELECT COUNT(*) FROM readings').fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_readings_buffered_until_size_threshold(self):
+        for i in range(4):
+            self.store.add_reading(_sample_reading(ts=1700000000.0 + i))
+        self.assertEqual(self.store.pending_count, 4)
+        self.assertEqual(self._persisted_count(), 0)
+
+        self.store.add_reading(_sample_reading(ts=1700000004.0))
+        self.assertEqual(self.store.pending_count, 0)
+        self.assertEqual(self._persisted_count(), 5)
+
+    def test_flush_on_time_threshold(self):
+        self.store.add_reading(_sample_reading(ts=1700000000.0))
+        self.assertEqual(self.store.pending_count, 1)
+
+        with patch(
+            'storm_sense.history_store.time.monotonic',
+            return_value=time.monotonic() + 7200,
+        ):
+            self.store.add_reading(_sample_reading(ts=1700000001.0))
+        self.assertEqual(self.store.pending_count, 0)
+        self.assertEqual(self._persisted_count(), 2)
+
+    def test_reads_include_buffered_readings(self):
+        for i in range(7):
+            self.store.add_reading(_sample_reading(ts=1700000000.0 + i))
+        self.assertEqual(self.store.pending_count, 2)
+
+        self.assertEqual(self.store.count(), 7)
+        self.assertEqual(len(self.store.get_history()), 7)
+        self.assertEqual(len(self.store.get_history(since=1699999999.0)), 7)
+        latest = self.store.get_latest(limit=3)
+        self.assertEqual(
+            [r['timestamp'] for r in latest],
+            [1700000004.0, 1700000005.0, 1700000006.0],
+        )
+
+    def test_rollups_include_buffered_tail(self):
+        for i in range(9):
+            self.store.add_reading(_sample_reading(ts=1700000000.0 + i))
+        self.assertEqual(self.store.pending_count, 4)
+
+        rows = self.store.get_history(limit=3, since=1699999999.0)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['count'], 9)
+
+    def test_close_flushes_buffer(self):
+        for i in range(3):
+            self.store.add_reading(_sample_reading(ts=1700000000.0 + i))
+        self.store.close()
+        self.assertEqual(self._persisted_count(), 3)
+
+    def test_clear_drops_buffer(self):
+        self.store.add_reading(_sample_reading())
+        self.store.clear()
+        self.assertEqual(self.store.count(), 0)
+        self.assertEqual(self.store.get_latest(), [])
+
+    def test_wal_journal_mode_applied(self):
+        mode = self.store._conn.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode.upper(), 'WAL')
+
+    def test_invalid_journal_mode_rejected(self):
+        with self.assertRaises(ValueError):
+            HistoryStore(db_path=':memory:', journal_mode='bogus')
+
+    def test_invalid_synchronous_level_rejected(self):
+        with self.assertRaises(ValueError):
+            HistoryStore(db_path=':memory:', synchronous='sometimes')
+
+
+class TestHistoryStoreReadPool(unittest.TestCase):
+    """Reads use read-only WAL connections and never wait on the writer."""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        os.unlink(self.path)
+        self.store = HistoryStore(
+            db_path=self.path, flush_max_rows=5, flush_interval_s=3600,
+        )
+        for i in range(12):
+            self.store.add_reading(_sample_reading(ts=1700000000.0 + i * 5))
+
+    def tearDown(self):
+        self.store.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.unlink(self.path + suffix)
+
+    def _read_in_thread(self, fn):
+        """Run *fn* on another thread; return its result or None on timeout."""
+        result = []
+        worker = threading.Thread(target=lambda: result.append(fn()))
+        worker.start()
+        worker.join(timeout=5)
+        return result[0] if result else None
+
+    def test_reads_do_not_wait_for_writer_lock(self):
+        with self.store._lock:
+            rows = self._read_in_thread(self.store.get_history)
+            count = self._read_in_thread(self.store.count)
+        self.assertIsNotNone(rows)
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(count, 12)
+
+    def test_reader_connections_are_read_only(self):
+        with self.store._read() as (conn, _):
+            self.assertIsNot(conn, self.store._conn)
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute('DELETE FROM readings')
+
+    def test_readers_are_reused(self):
+        with self.store._read() as (first, _):
+            pass
+        with self.store._read() as (second, _):
+            pass
+        self.assertIs(first, second)
+
+    def test_concurrent_reads(self):
+        results = []
+
+        def read():
+            for _ in range(20):
+                results.append(len(self.store.get_history()))
+
+        workers = [threading.Thread(target=read) for _ in range(6)]
+        for worker in workers:
+            worker.start()
+        for i in range(12, 40):
+            self.store.add_reading(_sample_reading(ts=1700000000.0 + i * 5))
+        for worker in workers:
+            worker.join()
+        self.assertEqual(len(results), 120)
+        self.assertTrue(all(12 <= n <= 40 for n in results))
+        self.assertEqual(self.store.count(), 40)
+
+    def test_rows_committed_during_read_not_duplicated(self):
+        # Simulate a flush landing after the buffer was snapshotted
+        self.assertEqual(self.store.pending_count, 2)
+        with self.store._conn:
+            self.store._conn.executemany(
+                '''INSERT INTO readings
+                   (timestamp, temperature, temperature_f,
+                    raw_temperature, pressure, storm_level)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                list(self.store._pending),
+            )
+        rows = self.store.get_history()
+        timestamps = [row['timestamp'] for row in rows]
+        self.assertEqual(len(timestamps), len(set(timestamps)))
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(self.store.count(), 12)
+        self.assertEqual(len(self.store.get_latest(limit=100)), 12)
+        buckets = self.store.get_buckets(bucket_s=3600, since=1)
+        self.assertEqual(sum(b['count'] for b in buckets), 12)
+
+    def test_memory_database_shares_writer_connection(self):
+        store = HistoryStore(db_path=':memory:')
+        try:
+            store.add_reading(_sample_reading())
+            store.flush()
+            with store._read() as (conn, _):
+                self.assertIs(conn, store._conn)
+            self.assertEqual(store.count(), 1)
+        finally:
+            store.close()
+
+    def test_close_releases_idle_readers(self):
+        self.store.get_history()
+        self.assertFalse(self.store._idle_readers.empty())
+        self.store.close()
+        self.assertTrue(self.store._idle_readers.empty())
+        self.assertEqual(self.store.get_history(), [])
+
+
+class TestHistoryStoreAfterId(unittest.TestCase):
+    """get_after_id() pages through readings by row id."""
+
+    def setUp(self):
+        self.store, self.path = _make_store()
+        self.store._flush_max_rows = 5
+        # Same timestamp twice: a since= query cannot tell these apart
+        for i in range(12):
+            self.store.add_reading(_sample_reading(ts=1700000000.0 + (i // 2) * 5))
+
+    def tearDown(self):
+        self.store.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.unlink(self.path + suffix)
+
+    def test_ids_are_contiguous_across_flushed_and_buffered_rows(self):
+        self.assertEqual(self.store.pending_count, 2)
+        rows = self.store.get_after_id(0)
+        self.assertEqual([row['id'] for row in rows], list(range(1, 13)))
+        self.assertEqual(rows[0]['timestamp'], rows[1]['timestamp'])
+
+    def test_pages_cover_every_row_exactly_once(self):
+        seen = []
+        cursor = 0
+        while True:
+            page = self.store.get_after_id(cursor, limit=5)
+            if not page:
+                break
+            seen.extend(row['id'] for row in page)
+            cursor = page[-1]['id']
+        self.assertEqual(seen, list(range(1, 13)))
+
+    def test_buffered_rows_keep_their_id_once_flushed(self):
+        before = self.store.get_after_id(10)
+        self.store.flush()
+        self.assertEqual(self.store.pending_count, 0)
+        self.assertEqual(self.store.get_after_id(10), before)
+
+    def test_ids_not_reused_after_clear_or_reopen(self):
+        self.store.clear()
+        self.store.add_reading(_sample_reading(ts=1800000000.0))
+        self.store.close()
+        self.store = HistoryStore(db_path=self.path)
+        self.store.add_reading(_sample_reading(ts=1800000005.0))
+        ids = [row['id'] for row in self.store.get_after_id(0)]
+        self.assertEqual(ids[0], 13)
+        self.assertGreater(ids[1], 13)
+
+    def test_cursor_survives_crash_that_loses_the_buffer(self):
+        cursor = self.store.get_after_id(0)[-1]['id']
+        self.assertEqual(self.store.pending_count, 2)
+        # Crash: the buffered readings (and their ids) never reach the disk
+        with self.store._pending_lock:
+            self.store._pending.clear()
+        self.store.close()
+
+        self.store = HistoryStore(db_path=self.path)
+        for i in range(15):
+            self.store.add_reading(_sample_reading(ts=1800000000.0 + i * 5))
+        rows = self.store.get_after_id(cursor)
+        self.assertEqual(len(rows), 15)
+        self.assertEqual(rows[0]['timestamp'], 1800000000.0)
+
+    def test_rows_committed_during_read_not_duplicated(self):
+        # Simulate a flush landing after the buffer was snapshotted
+        with self.store._conn:
+            self.store._conn.executemany(
+                '''INSERT INTO readings
+                   (id, timestamp, temperature, temperature_f,
+                    raw_temperature, pressure, storm_level)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                [(11 + i, *row) for i, row in enumerate(self.store._pending)],
+            )
+        ids = [row['id'] for row in self.store.get_after_id(0)]
+        self.assertEqual(ids, list(range(1, 13)))
+
+    def test_unavailable_store_returns_empty(self):
+        self.store.close()
+        self.assertEqual(self.store.get_after_id(0), [])
+
+
+class TestHistoryStoreArchive(unittest.TestCase):
+    """Pruned rows move to the archive and stay queryable."""
+
+    DAY = 24 * 3600
+
+    def setUp(self):
+        self.store, self.path = _make_store()
+        self.archive_dir = self.path[:-3] + '_archive'
+        now = time.time()
+        # 2 hours of 1-minute readings, 20 days ago, then 10 recent ones
+        self.old_start = now - 20 * self.DAY
+        for i in range(120):
+            self.store.add_reading(_sample_reading(
+                ts=self.old_start + i * 60, pressure=1000.0 + i,
+            ))
+        for i in range(10):
+            self.store.add_reading(_sample_reading(ts=now - 600 + i * 60))
+        self.store._last_prune = 0
+        self.deleted = self.store.prune_if_due()
+
+    def tearDown(self):
+        self.store.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+
+    def test_pruned_rows_are_archived(self):
+        self.assertEqual(self.deleted, 120)
+        self.assertEqual(self.store.count(), 10)
+        self.assertTrue(os.listdir(self.archive_dir))
+        archived = self.store._archive.rows(0, time.time())
+        self.assertEqual(len(archived), 120)
+        self.assertEqual(archived[5][4], 1005.0)
+
+    def test_history_spans_archive_and_live_table(self):
+        rows = self.store.get_history(since=self.old_start - 1)
+        self.assertEqual(len(rows), 130)
+        timestamps = [row['timestamp'] for row in rows]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual(rows[0]['pressure'], 1000.0)
+
+    def test_history_since_inside_archive(self):
+        rows = self.store.get_history(since=self.old_start + 59 * 60)
+        self.assertEqual(len(rows), 60 + 10)
+        self.assertEqual(rows[0]['pressure'], 1060.0)
+
+    def test_long_range_is_bucketed_across_archive(self):
+        rows = self.store.get_history(limit=20, since=self.old_start - 1)
+        self.assertLessEqual(len(rows), 20)
+        self.assertEqual(sum(row['count'] for row in rows), 130)
+
+    def test_buckets_read_archive_when_no_tier_covers(self):
+        # 1-minute tier is gone for 20-day-old data in a 30 s width query
+        self.store._conn.execute('DELETE FROM readings_1m')
+        self.store._conn.commit()
+        rows = self.store.get_buckets(
+            bucket_s=30, since=self.old_start - 1, limit=100000,
+        )
+        self.assertEqual(sum(row['count'] for row in rows), 130)
+        self.assertEqual(rows[0]['pressure_min'], 1000.0)
+
+    def test_lttb_reads_archive(self):
+        rows = self.store.get_history_lttb(limit=20, since=self.old_start - 1)
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(rows[0]['pressure'], 1000.0)
+        self.assertLess(rows[1]['timestamp'], time.time() - self.DAY)
+
+    def test_wide_lttb_reads_archive(self):
+        archived = {row[0]: row[4] for row in self.store._archive.rows(0, time.time())}
+        for clear_tier in (False, True):
+            if clear_tier:
+                # Past the 1-minute tier's retention every point is raw
+                self.store._conn.execute('DELETE FROM readings_1m')
+                self.store._conn.commit()
+            rows = self.store.get_history_lttb(limit=5, since=self.old_start - 1)
+            self.assertEqual(len(rows), 5)
+            self.assertEqual(rows[0]['pressure'], 1000.0)
+            old = [row for row in rows if row['timestamp'] in archived]
+            self.assertGreater(len(old), 1)
+            for row in old:
+                self.assertEqual(row['pressure'], archived[row['timestamp']])
+
+    def test_after_id_behind_archive_expires(self):
+        with self.assertRaises(CursorExpired) as ctx:
+            self.store.get_after_id(0)
+        self.assertEqual(ctx.exception.resume_after_id, 120)
+        rows = self.store.get_after_id(ctx.exception.resume_after_id)
+        self.assertEqual(len(rows), 10)
+
+    def test_rows_pending_deletion_not_duplicated(self):
+        # An archived row still in the live table is read from the table only
+        row = self.store._archive.rows(0, time.time())[-1]
+        with self.store._conn:
+            self.store._conn.execute(
+                '''INSERT INTO readings
+                   (timestamp, temperature, temperature_f,
+                    raw_temperature, pressure, storm_level)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                row,
+            )
+        rows = self.store.get_history(since=self.old_start - 1)
+        timestamps = [r['timestamp'] for r in rows]
+        self.assertEqual(len(timestamps), len(set(timestamps)))
+        self.assertEqual(len(rows), 130)
+
+    def test_clear_removes_archive(self):
+        self.store.clear()
+        self.assertEqual(self.store.get_history(since=1), [])
+        self.assertEqual(os.listdir(self.archive_dir), [])
+
+    def test_memory_database_has_no_archive(self):
+        store = HistoryStore(db_path=':memory:')
+        self.assertIsNone(store._archive)
+        store.close()
+
 
 class TestHistoryStoreGracefulDegradation(unittest.TestCase):
     """Store degrades to no-op when the database path is inaccessible."""
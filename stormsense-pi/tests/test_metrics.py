@@ -0,0 +1,117 @@
+"""Tests for the metrics registry and its text exposition output."""
+
+import unittest
+
+from storm_sense.metrics import Counter, Gauge, Histogram, Registry, Total
+
+
+class TestCounter(unittest.TestCase):
+    """Counters add up per label set."""
+
+    def test_inc_per_label_set(self):
+        c = Counter('requests_total', 'Requests.', ('route',))
+        c.inc('/a')
+        c.inc('/a', amount=2)
+        c.inc('/b')
+        self.assertEqual(c.value('/a'), 3)
+        self.assertEqual(c.value('/b'), 1)
+        self.assertEqual(c.value('/missing'), 0)
+
+    def test_wrong_label_count_raises(self):
+        c = Counter('requests_total', 'Requests.', ('route',))
+        with self.assertRaises(ValueError):
+            c.inc()
+
+    def test_render(self):
+        c = Counter('requests_total', 'Requests.', ('route',))
+        c.inc('/a')
+        self.assertEqual(c.render(), [
+            '# HELP requests_total Requests.',
+            '# TYPE requests_total counter',
+            'requests_total{route="/a"} 1',
+        ])
+
+
+class TestGauge(unittest.TestCase):
+    """Gauges keep the last value set."""
+
+    def test_set_overwrites(self):
+        gauge = Gauge('items', 'Items.', ('buffer',))
+        gauge.set(5, 'log')
+        gauge.set(3, 'log')
+        self.assertEqual(gauge.value('log'), 3)
+
+    def test_total_renders_as_counter(self):
+        t = Total('hits_total', 'Hits.')
+        t.set(12)
+        self.assertEqual(t.render()[1:], ['# TYPE hits_total counter', 'hits_total 12'])
+
+
+class TestHistogram(unittest.TestCase):
+    """Histograms render cumulative buckets, sum and count."""
+
+    def test_render_cumulative_buckets(self):
+        h = Histogram('latency_seconds', 'Latency.', buckets=(0.1, 1.0))
+        h.observe(0.05)
+        h.observe(0.1)
+        h.observe(0.5)
+        h.observe(2.0)
+        self.assertEqual(h.render()[2:], [
+            'latency_seconds_bucket{le="0.1"} 2',
+            'latency_seconds_bucket{le="1"} 3',
+            'latency_seconds_bucket{le="+Inf"} 4',
+            'latency_seconds_sum 2.65',
+            'latency_seconds_count 4',
+        ])
+
+    def test_labels_precede_le(self):
+        h = Histogram('latency_seconds', 'Latency.', ('phase',), buckets=(1.0,))
+        h.observe(0.5, 'sensor')
+        self.assertIn('latency_seconds_bucket{phase="sensor",le="1"} 1', h.render())
+
+    def test_time_and_timed(self):
+        h = Histogram('latency_seconds', 'Latency.', ('method',))
+        with h.time('block'):
+            pass
+
+        @h.timed('fn')
+        def fn(x):
+            return x * 2
+
+        self.assertEqual(fn(4), 8)
+        self.assertEqual(h.count('block'), 1)
+        self.assertEqual(h.count('fn'), 1)
+
+    def test_timed_records_when_function_raises(self):
+        h = Histogram('latency_seconds', 'Latency.')
+
+        @h.timed()
+        def boom():
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            boom()
+        self.assertEqual(h.count(), 1)
+
+
+class TestRegistry(unittest.TestCase):
+    """The registry renders every metric once, sorted by name."""
+
+    def test_duplicate_name_raises(self):
+        registry = Registry()
+        registry.register(Counter('a_total', 'A.'))
+        with self.assertRaises(ValueError):
+            registry.register(Gauge('a_total', 'A.'))
+
+    def test_render_sorted_and_escaped(self):
+        registry = Registry()
+        registry.register(Gauge('b', 'B.')).set(1)
+        registry.register(Counter('a_total', 'A.', ('path',))).inc('say "hi"\n')
+        text = registry.render()
+        self.assertTrue(text.endswith('\n'))
+        self.assertLess(text.index('# HELP a_total'), text.index('# HELP b '))
+        self.assertIn('a_total{path="say \\"hi\\"\\n"} 1', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Tests for oversampling -- sub-sample window and robust reducers."""
+
+import unittest
+
+from storm_sense.oversample import SubsampleWindow, mad_mean, median
+
+
+class TestReducers(unittest.TestCase):
+    """median and mad_mean reduce a window and report rejections."""
+
+    def test_median_odd_and_even(self):
+        self.assertEqual(median([3.0, 1.0, 2.0]), (2.0, 0))
+        self.assertEqual(median([4.0, 1.0, 3.0, 2.0]), (2.5, 0))
+
+    def test_mad_mean_rejects_spike(self):
+        value, rejected = mad_mean([1013.1, 1013.2, 1013.3, 1013.2, 1090.0])
+        self.assertAlmostEqual(value, 1013.2)
+        self.assertEqual(rejected, 1)
+
+    def test_mad_mean_keeps_normal_noise(self):
+        values = [1013.0, 1013.2, 1012.9, 1013.1, 1012.8]
+        value, rejected = mad_mean(values)
+        self.assertAlmostEqual(value, sum(values) / 5)
+        self.assertEqual(rejected, 0)
+
+    def test_mad_mean_small_windows_are_averaged(self):
+        self.assertEqual(mad_mean([5.0]), (5.0, 0))
+        self.assertEqual(mad_mean([1.0, 1000.0]), (500.5, 0))
+
+    def test_mad_mean_identical_majority(self):
+        self.assertEqual(mad_mean([2.0, 2.0, 2.0, 9.0]), (2.0, 1))
+
+    def test_noise_floor_keeps_quantization_steps(self):
+        # Quantized readings: the MAD is 0, but one step away is noise
+        values = [1013.25, 1013.25, 1013.25, 1013.28, 1013.25]
+        self.assertEqual(mad_mean(values)[1], 1)
+        value, rejected = mad_mean(values, noise_floor=0.03)
+        self.assertEqual(rejected, 0)
+        self.assertAlmostEqual(value, sum(values) / 5)
+
+    def test_noise_floor_still_rejects_spikes(self):
+        value, rejected = mad_mean([1013.25, 1013.25, 1013.25, 1013.28, 1090.0], 0.03)
+        self.assertAlmostEqual(value, (3 * 1013.25 + 1013.28) / 4)
+        self.assertEqual(rejected, 1)
+
+
+class TestSubsampleWindow(unittest.TestCase):
+    """The window fills, reduces and empties."""
+
+    def test_fill_and_reduce(self):
+        window = SubsampleWindow(3, 'median')
+        self.assertFalse(window.add(1.0))
+        self.assertFalse(window.add(3.0))
+        self.assertTrue(window.add(2.0))
+        self.assertEqual(window.reduce(), (2.0, 0))
+        self.assertEqual(len(window), 0)
+
+    def test_partial_window_reduces(self):
+        window = SubsampleWindow(5)
+        window.add(4.0)
+        window.add(6.0)
+        self.assertEqual(window.reduce(), (5.0, 0))
+
+    def test_overfull_window_replaces_newest(self):
+        window = SubsampleWindow(2, 'median')
+        window.add(1.0)
+        window.add(2.0)
+        self.assertTrue(window.add(5.0))
+        self.assertEqual(len(window), 2)
+        self.assertEqual(window.reduce(), (3.0, 0))
+
+    def test_noise_floor_passed_to_reducer(self):
+        window = SubsampleWindow(4, noise_floor=0.5)
+        for value in (20.0, 20.0, 20.0, 20.5):
+            window.add(value)
+        self.assertEqual(window.reduce(), (20.125, 0))
+
+    def test_empty_reduce_raises(self):
+        with self.assertRaises(ValueError):
+            SubsampleWindow(3).reduce()
+
+    def test_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            SubsampleWindow(0)
+        with self.assertRaises(ValueError):
+            SubsampleWindow(3, 'mode')
+
+
+if __name__ == '__main__':
+    unittest.main()
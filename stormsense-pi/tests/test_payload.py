@@ -0,0 +1,90 @@
+"""Tests for EncodedPayload — pre-encoded JSON bodies."""
+
+import gzip
+import json
+import unittest
+
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from storm_sense import payload as payload_module
+from storm_sense.payload import IncrementalGzip, compress, encode_payload
+
+
+def _accept(header: str) -> Accept:
+    return parse_accept_header(header)
+
+
+class TestEncodePayload(unittest.TestCase):
+    """encode_payload() builds the body and its compressed variants once."""
+
+    def setUp(self):
+        self.data = {'pressure': 1013.25, 'storm_label': 'CLEAR', 'values': list(range(50))}
+        self.payload = encode_payload(self.data, 3)
+
+    def test_body_is_compact_json(self):
+        self.assertEqual(self.payload.version, 3)
+        self.assertEqual(json.loads(self.payload.body), self.data)
+        self.assertNotIn(b', ', self.payload.body)
+
+    def test_variants_decode_to_body(self):
+        variants = dict(self.payload.encoded)
+        self.assertEqual(gzip.decompress(variants['gzip']), self.payload.body)
+        if payload_module.brotli is not None:
+            self.assertEqual(
+                payload_module.brotli.decompress(variants['br']), self.payload.body,
+            )
+
+    def test_variants_larger_than_body_dropped(self):
+        self.assertEqual(encode_payload({}, 1).encoded, ())
+
+
+class TestSelect(unittest.TestCase):
+    """select() honours Accept-Encoding, preferring brotli."""
+
+    def setUp(self):
+        self.payload = encode_payload({'values': list(range(50))}, 1)
+
+    def test_prefers_brotli(self):
+        coding, _ = self.payload.select(_accept('gzip, deflate, br'))
+        expected = 'br' if payload_module.brotli is not None else 'gzip'
+        self.assertEqual(coding, expected)
+
+    def test_gzip_only(self):
+        coding, body = self.payload.select(_accept('gzip'))
+        self.assertEqual(coding, 'gzip')
+        self.assertEqual(body, dict(self.payload.encoded)['gzip'])
+
+    def test_identity(self):
+        self.assertEqual(self.payload.select(_accept('')), (None, self.payload.body))
+        self.assertEqual(
+            self.payload.select(_accept('gzip;q=0, br;q=0')),
+            (None, self.payload.body),
+        )
+
+
+
+class TestCompress(unittest.TestCase):
+    """compress() and IncrementalGzip produce standard bodies."""
+
+    def test_compress_gzip(self):
+        body = b'[' + b','.join(b'1013.25' for _ in range(100)) + b']'
+        self.assertEqual(gzip.decompress(compress(body, 'gzip')), body)
+
+    def test_unknown_coding(self):
+        with self.assertRaises(ValueError):
+            compress(b'[]', 'zstd')
+
+    def test_incremental_gzip_appends_before_last_byte(self):
+        stream = IncrementalGzip(b'[1,2]')
+        self.assertEqual(gzip.decompress(stream.finish()), b'[1,2]')
+        stream.append(b',3')
+        stream.append(b',4')
+        self.assertEqual(gzip.decompress(stream.finish()), b'[1,2,3,4]')
+        # finish() leaves the stream open for further appends
+        stream.append(b',5')
+        self.assertEqual(gzip.decompress(stream.finish()), b'[1,2,3,4,5]')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+"""Tests for ResponseCache — LRU of encoded history responses."""
+
+import gzip
+import json
+import unittest
+
+from storm_sense.response_cache import (
+    APPEND,
+    INCREMENTAL_GZIP_MIN_BYTES,
+    KEEP,
+    ResponseCache,
+)
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data).encode()
+
+
+class TestResponseCacheLookup(unittest.TestCase):
+    """get() serves only bodies produced at the current version."""
+
+    def setUp(self):
+        self.cache = ResponseCache()
+
+    def test_hit_and_miss_counted(self):
+        self.assertIsNone(self.cache.get(('history', 0, 10), 1))
+        self.cache.put(('history', 0, 10), b'[]', 1)
+        self.assertEqual(self.cache.get(('history', 0, 10), 1), b'[]')
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 0.5)
+
+    def test_stale_version_not_served(self):
+        self.cache.put('key', b'[]', 1)
+        self.assertIsNone(self.cache.get('key', 2))
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_oversized_body_not_cached(self):
+        cache = ResponseCache(max_bytes=100)
+        cache.put('key', b'x' * 1000, 1)
+        self.assertIsNone(cache.get('key', 1))
+
+
+class TestResponseCacheEviction(unittest.TestCase):
+    """Both the entry and the byte bound evict least recently used first."""
+
+    def test_entry_bound(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put('a', b'1', 1)
+        cache.put('b', b'2', 1)
+        cache.get('a', 1)
+        cache.put('c', b'3', 1)
+
+        self.assertIsNone(cache.get('b', 1))
+        self.assertEqual(cache.get('a', 1), b'1')
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_byte_bound(self):
+        cache = ResponseCache(max_bytes=2000)
+        for key in 'abc':
+            cache.put(key, b'x' * 600, 1)
+
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], 2000)
+        self.assertEqual(stats['entries'], 2)
+        self.assertIsNone(cache.get('a', 1))
+
+    def test_clear(self):
+        cache = ResponseCache()
+        cache.put('a', b'1', 1)
+        cache.clear()
+        self.assertEqual(cache.stats()['bytes'], 0)
+        self.assertIsNone(cache.get('a', 1))
+
+
+class TestResponseCacheOnAppend(unittest.TestCase):
+    """on_append() extends, keeps or drops entries by policy."""
+
+    def setUp(self):
+        self.cache = ResponseCache()
+        self.rows = [{'timestamp': 100.0}, {'timestamp': 105.0}]
+        self.reading = {'timestamp': 110.0}
+
+    def _append(self, version=2):
+        self.cache.on_append(self.reading, _encode(self.reading), version)
+
+    def test_append_splices_reading_into_body(self):
+        self.cache.put(
+            'h', _encode(self.rows), 1,
+            policy=APPEND, since=50.0, room=3, last_ts=105.0,
+        )
+        self._append()
+
+        body = self.cache.get('h', 2)
+        self.assertEqual(json.loads(body), self.rows + [self.reading])
+        self.assertEqual(self.cache.stats()['appended'], 1)
+
+    def test_append_to_empty_body(self):
+        self.cache.put('h', b'[]', 1, policy=APPEND, since=50.0, room=3, last_ts=50.0)
+        self._append()
+        self.assertEqual(json.loads(self.cache.get('h', 2)), [self.reading])
+
+    def test_append_without_room_drops(self):
+        self.cache.put(
+            'h', _encode(self.rows), 1,
+            policy=APPEND, since=50.0, room=0, last_ts=105.0,
+        )
+        self._append()
+        self.assertIsNone(self.cache.get('h', 2))
+
+    def test_reading_already_included_not_duplicated(self):
+        rows = self.rows + [self.reading]
+        self.cache.put(
+            'h', _encode(rows), 1,
+            policy=APPEND, since=50.0, room=3, last_ts=110.0,
+        )
+        self._append()
+        self.assertEqual(json.loads(self.cache.get('h', 2)), rows)
+
+    def test_keep_moves_to_new_version(self):
+        self.cache.put('page', b'{}', 1, policy=KEEP)
+        self._append()
+        self.assertEqual(self.cache.get('page', 2), b'{}')
+
+    def test_drop_policy_and_missed_versions_evicted(self):
+        self.cache.put('latest', b'[]', 1)
+        self.cache.put('old', b'{}', 0, policy=KEEP)
+        self._append()
+
+        self.assertEqual(self.cache.stats()['entries'], 0)
+        self.assertEqual(self.cache.stats()['invalidated'], 2)
+
+    def test_entries_already_current_untouched(self):
+        self.cache.put('latest', b'[]', 2)
+        self._append()
+        self.assertEqual(self.cache.get('latest', 2), b'[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+class TestResponseCacheEncoded(unittest.TestCase):
+    """get_encoded() compresses each cached body once per coding."""
+
+    def setUp(self):
+        self.cache = ResponseCache()
+        self.rows = [{'timestamp': 1700000000.0 + i, 'pressure': 1013.25} for i in range(50)]
+        self.body = _encode(self.rows)
+        self.cache.put('key', self.body, 1)
+
+    def test_compressed_once(self):
+        first = self.cache.get_encoded('key', 1, 'gzip')
+        second = self.cache.get_encoded('key', 1, 'gzip')
+
+        self.assertIs(first, second)
+        self.assertEqual(gzip.decompress(first), self.body)
+        self.assertEqual(self.cache.stats()['compressions'], 1)
+
+    def test_variant_counted_against_budget(self):
+        before = self.cache.stats()['bytes']
+        encoded = self.cache.get_encoded('key', 1, 'gzip')
+        self.assertEqual(self.cache.stats()['bytes'], before + len(encoded))
+
+    def test_stale_or_missing_not_encoded(self):
+        self.assertIsNone(self.cache.get_encoded('key', 2, 'gzip'))
+        self.assertIsNone(self.cache.get_encoded('other', 1, 'gzip'))
+        self.assertEqual(self.cache.stats()['compressions'], 0)
+
+    def test_incompressible_body_remembered(self):
+        self.cache.put('tiny', b'[]', 1)
+        self.assertIsNone(self.cache.get_encoded('tiny', 1, 'gzip'))
+        self.assertIsNone(self.cache.get_encoded('tiny', 1, 'gzip'))
+        self.assertEqual(self.cache.stats()['compressions'], 1)
+
+    def test_keep_entry_keeps_variant(self):
+        self.cache.put('page', self.body, 1, policy=KEEP)
+        encoded = self.cache.get_encoded('page', 1, 'gzip')
+        self.cache.on_append({'timestamp': 1800000000.0}, b'{}', 2)
+        self.assertIs(self.cache.get_encoded('page', 2, 'gzip'), encoded)
+
+
+class TestResponseCacheIncrementalGzip(unittest.TestCase):
+    """Large APPEND bodies extend their gzip stream instead of recompressing."""
+
+    def setUp(self):
+        self.cache = ResponseCache()
+        self.rows = [
+            {'timestamp': 1700000000.0 + i * 5, 'pressure': 1013.25 + i * 0.01}
+            for i in range(INCREMENTAL_GZIP_MIN_BYTES // 40)
+        ]
+        self.cache.put(
+            'key', _encode(self.rows), 1,
+            policy=APPEND, since=1.0, room=10, last_ts=self.rows[-1]['timestamp'],
+        )
+
+    def _append(self, version):
+        reading = {'timestamp': 1700000000.0 + len(self.rows) * 5, 'pressure': 990.0}
+        self.rows.append(reading)
+        self.cache.on_append(reading, _encode(reading), version)
+
+    def test_appended_reading_compressed_incrementally(self):
+        self.cache.get_encoded('key', 1, 'gzip')
+        self._append(2)
+        self._append(3)
+
+        encoded = self.cache.get_encoded('key', 3, 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(encoded)), self.rows)
+        self.assertEqual(gzip.decompress(encoded), self.cache.get('key', 3))
+        # Only the first request compressed the whole body
+        self.assertEqual(self.cache.stats()['compressions'], 1)
+
+    def test_stream_memory_charged(self):
+        before = self.cache.stats()['bytes']
+        self.cache.get_encoded('key', 1, 'gzip')
+        self.assertGreater(self.cache.stats()['bytes'] - before, 256 * 1024)
+
+    def test_small_append_body_recompressed(self):
+        self.cache.put(
+            'small', b'[]', 1, policy=APPEND, since=1.0, room=10, last_ts=1.0,
+        )
+        self.cache.get_encoded('small', 1, 'gzip')
+        self.cache.on_append({'timestamp': 2.0}, b'{"timestamp":2.0}', 2)
+        self.cache.get_encoded('small', 2, 'gzip')
+        self.assertEqual(self.cache.stats()['compressions'], 2)
@@ -0,0 +1,179 @@
+"""Tests for ColumnarRing — fixed-capacity columnar ring buffer."""
+
+from __future__ import annotations
+
+import unittest
+
+from storm_sense.ring_buffer import ColumnarRing
+
+FIELDS = (('timestamp', 'd'), ('pressure', 'd'), ('storm_level', 'b'))
+
+
+def _ring(capacity: int = 5, rows: int = 0) -> ColumnarRing:
+    """A ring holding *rows* readings with timestamps 0, 1, 2, ..."""
+    ring = ColumnarRing(FIELDS, capacity)
+    for i in range(rows):
+        ring.append((float(i), 1000.0 + i, i % 5))
+    return ring
+
+
+class TestColumnarRingAppend(unittest.TestCase):
+    """Appending fills the ring and then overwrites the oldest rows."""
+
+    def test_empty(self):
+        ring = _ring()
+        self.assertEqual(len(ring), 0)
+        self.assertEqual(ring.view().dicts(), [])
+        with self.assertRaises(IndexError):
+            ring[0]
+
+    def test_append_and_index(self):
+        ring = _ring(rows=3)
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(ring[0], (0.0, 1000.0, 0))
+        self.assertEqual(ring[-1], (2.0, 1002.0, 2))
+
+    def test_wraps_at_capacity(self):
+        ring = _ring(capacity=5, rows=8)
+        self.assertEqual(len(ring), 5)
+        self.assertEqual(ring[0][0], 3.0)
+        self.assertEqual(ring.view().column('timestamp'), [3.0, 4.0, 5.0, 6.0, 7.0])
+
+    def test_append_row_dict(self):
+        ring = _ring()
+        ring.append_row({'pressure': 990.5, 'storm_level': 4, 'timestamp': 9.0})
+        self.assertEqual(ring.view().dicts(), [
+            {'timestamp': 9.0, 'pressure': 990.5, 'storm_level': 4},
+        ])
+
+    def test_typed_values(self):
+        ring = _ring(rows=1)
+        row = ring.view().dicts()[0]
+        self.assertIsInstance(row['timestamp'], float)
+        self.assertIsInstance(row['storm_level'], int)
+
+    def test_clear(self):
+        ring = _ring(rows=8)
+        ring.clear()
+        self.assertEqual(len(ring), 0)
+        ring.append((1.0, 2.0, 3))
+        self.assertEqual(ring.view().tuples(), [(1.0, 2.0, 3)])
+
+    def test_rejects_zero_capacity(self):
+        with self.assertRaises(ValueError):
+            ColumnarRing(FIELDS, 0)
+
+
+class TestColumnarRingBulk(unittest.TestCase):
+    """Whole-ring column export and import."""
+
+    def test_round_trip_across_wrap(self):
+        source = _ring(capacity=5, rows=8)
+        target = _ring(capacity=5)
+        target.load_columns(source.to_columns())
+        self.assertEqual(list(target), list(source))
+        target.append((8.0, 1008.0, 3))
+        self.assertEqual(target[0][0], 4.0)
+
+    def test_load_keeps_newest_rows(self):
+        target = _ring(capacity=3)
+        target.load_columns(_ring(capacity=10, rows=10).to_columns())
+        self.assertEqual(target.view().column('timestamp'), [7.0, 8.0, 9.0])
+
+    def test_load_rejects_other_layout(self):
+        other = ColumnarRing((('timestamp', 'd'), ('pressure', 'd'), ('storm_level', 'd')), 5)
+        other.append((1.0, 2.0, 3.0))
+        ring = _ring(rows=2)
+        with self.assertRaises(ValueError):
+            ring.load_columns(other.to_columns())
+        self.assertEqual(len(ring), 2)
+
+
+class TestRingView(unittest.TestCase):
+    """Slices are lazy views that only materialise the rows asked for."""
+
+    def test_slice_across_wrap(self):
+        ring = _ring(capacity=5, rows=8)
+        self.assertEqual(ring[-3:].column('timestamp'), [5.0, 6.0, 7.0])
+        self.assertEqual(ring[1:4].column('timestamp'), [4.0, 5.0, 6.0])
+
+    def test_nested_slices(self):
+        ring = _ring(capacity=10, rows=10)
+        view = ring[2:9][1:-1]
+        self.assertEqual(len(view), 5)
+        self.assertEqual(view.column('timestamp'), [3.0, 4.0, 5.0, 6.0, 7.0])
+
+    def test_limit_larger_than_ring(self):
+        ring = _ring(rows=3)
+        self.assertEqual(len(ring[-1000:]), 3)
+
+    def test_view_is_not_affected_by_later_appends(self):
+        ring = _ring(capacity=5, rows=5)
+        view = ring[-2:]
+        ring.append((5.0, 1005.0, 0))
+        self.assertEqual(view.column('timestamp'), [3.0, 4.0])
+
+    def test_overwritten_rows_are_dropped_from_view(self):
+        ring = _ring(capacity=5, rows=5)
+        view = ring.view()
+        for i in range(5, 8):
+            ring.append((float(i), 1000.0 + i, 0))
+        # Rows 0-2 were overwritten; they must not reappear as newer rows
+        self.assertEqual(view.column('timestamp'), [3.0, 4.0])
+
+    def test_iteration_yields_tuples(self):
+        ring = _ring(rows=2)
+        self.assertEqual(list(ring), [(0.0, 1000.0, 0), (1.0, 1001.0, 1)])
+
+    def test_step_slices_rejected(self):
+        ring = _ring(rows=4)
+        with self.assertRaises(ValueError):
+            ring[::2]
+
+
+
+class TestColumnarRingAfter(unittest.TestCase):
+    """after() finds the start of a monotonic field by bisection."""
+
+    def test_matches_linear_scan(self):
+        for rows in (0, 1, 3, 7, 12, 23):
+            ring = _ring(capacity=7, rows=rows)
+            timestamps = ring.view().column('timestamp')
+            for value in (-1.0, 0.0, 2.5, 5.0, 15.0, 17.0, 22.0, 30.0):
+                expected = [ts for ts in timestamps if ts > value]
+                self.assertEqual(
+                    ring.after('timestamp', value).column('timestamp'),
+                    expected,
+                    (rows, value),
+                )
+
+    def test_inclusive_matches_linear_scan(self):
+        for rows in (0, 1, 7, 12, 23):
+            ring = _ring(capacity=7, rows=rows)
+            timestamps = ring.view().column('timestamp')
+            for value in (-1.0, 0.0, 6.0, 15.0, 16.0, 22.0, 30.0):
+                expected = [ts for ts in timestamps if ts >= value]
+                self.assertEqual(
+                    ring.after('timestamp', value, inclusive=True).column('timestamp'),
+                    expected,
+                    (rows, value),
+                )
+
+    def test_duplicate_values(self):
+        ring = ColumnarRing(FIELDS, 6)
+        for ts in (1.0, 2.0, 2.0, 2.0, 3.0, 3.0, 4.0):
+            ring.append((ts, 0.0, 0))
+        self.assertEqual(ring.after('timestamp', 2.0).column('timestamp'), [3.0, 3.0, 4.0])
+        self.assertEqual(ring.after('timestamp', 3.0).column('timestamp'), [4.0])
+
+    def test_result_is_a_sliceable_view(self):
+        ring = _ring(capacity=5, rows=9)
+        tail = ring.after('timestamp', 5.0)
+        self.assertEqual(len(tail), 3)
+        self.assertEqual(tail[-1:].dicts(), [
+            {'timestamp': 8.0, 'pressure': 1008.0, 'storm_level': 3},
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
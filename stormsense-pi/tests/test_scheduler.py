@@ -0,0 +1,161 @@
+"""Tests for TickScheduler -- absolute deadlines, missed ticks and jitter."""
+
+import asyncio
+import threading
+import unittest
+
+from storm_sense.scheduler import TickScheduler
+
+
+class _FakeTime:
+    """Clock plus a stop event whose wait() advances the clock."""
+
+    def __init__(self, start: float = 100.0) -> None:
+        self.now = start
+        self.waits: list[float] = []
+        self.stopped = False
+        # Extra delay added to every wait (oversleeping)
+        self.oversleep = 0.0
+
+    def clock(self) -> float:
+        return self.now
+
+    def is_set(self) -> bool:
+        return self.stopped
+
+    def set(self) -> None:
+        self.stopped = True
+
+    def wait(self, timeout: float) -> bool:
+        self.waits.append(timeout)
+        self.now += timeout + self.oversleep
+        return self.stopped
+
+
+def _scheduler(fake: _FakeTime, interval: float = 5.0) -> TickScheduler:
+    return TickScheduler(interval, stop_event=fake, clock=fake.clock)
+
+
+class TestTickSchedulerDeadlines(unittest.TestCase):
+    """Ticks land on start + n * interval regardless of work time."""
+
+    def test_first_tick_is_immediate(self):
+        fake = _FakeTime()
+        ticks = _scheduler(fake)
+        self.assertTrue(ticks.wait_next())
+        self.assertEqual(fake.waits, [])
+        self.assertEqual(ticks.stats['ticks'], 1)
+
+    def test_work_time_does_not_drift(self):
+        fake = _FakeTime()
+        ticks = _scheduler(fake)
+        starts = []
+        for _ in range(5):
+            ticks.wait_next()
+            starts.append(fake.now)
+            fake.now += 1.5  # work
+        self.assertEqual(starts, [100.0, 105.0, 110.0, 115.0, 120.0])
+        self.assertEqual(fake.waits, [3.5] * 4)
+        self.assertEqual(ticks.stats['overruns'], 0)
+
+    def test_oversleep_recorded_as_jitter_without_drift(self):
+        fake = _FakeTime()
+        fake.oversleep = 0.25
+        ticks = _scheduler(fake)
+        ticks.wait_next()
+        ticks.wait_next()
+        self.assertEqual(ticks.last_jitter_s, 0.25)
+        ticks.wait_next()
+        # Deadline is 110, not 110.25
+        self.assertEqual(fake.waits, [5.0, 4.75])
+        stats = ticks.stats
+        self.assertEqual(stats['max_jitter_s'], 0.25)
+        self.assertAlmostEqual(stats['mean_jitter_s'], 0.5 / 3)
+
+
+class TestTickSchedulerOverruns(unittest.TestCase):
+    """Late work starts the next tick at once and skips whole missed ticks."""
+
+    def test_overrun_runs_next_tick_immediately(self):
+        fake = _FakeTime()
+        ticks = _scheduler(fake)
+        ticks.wait_next()
+        fake.now += 6.0  # one second past the next deadline
+        ticks.wait_next()
+        self.assertEqual(fake.waits, [])
+        self.assertEqual(ticks.last_jitter_s, 1.0)
+        self.assertEqual(ticks.stats['overruns'], 1)
+        self.assertEqual(ticks.stats['missed'], 0)
+        # Back on the grid for the following tick
+        ticks.wait_next()
+        self.assertEqual(fake.now, 110.0)
+
+    def test_whole_missed_deadlines_are_skipped(self):
+        fake = _FakeTime()
+        ticks = _scheduler(fake)
+        ticks.wait_next()
+        fake.now += 17.0  # deadlines 105, 110 and 115 all passed
+        ticks.wait_next()
+        stats = ticks.stats
+        self.assertEqual(stats['missed'], 2)
+        self.assertEqual(stats['overruns'], 1)
+        self.assertEqual(ticks.last_jitter_s, 2.0)
+        ticks.wait_next()
+        self.assertEqual(fake.now, 120.0)
+        self.assertEqual(ticks.stats['ticks'], 3)
+
+
+class TestTickSchedulerStop(unittest.TestCase):
+    """Stopping ends waits early and makes later waits return False."""
+
+    def test_stop_before_wait(self):
+        ticks = TickScheduler(5.0)
+        ticks.stop()
+        self.assertFalse(ticks.wait_next())
+
+    def test_stop_interrupts_sleep(self):
+        stop = threading.Event()
+        ticks = TickScheduler(60.0, stop_event=stop)
+        self.assertTrue(ticks.wait_next())
+        threading.Timer(0.05, stop.set).start()
+        self.assertFalse(ticks.wait_next())
+        self.assertEqual(ticks.stats['ticks'], 1)
+
+    def test_interval_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            TickScheduler(0)
+
+
+class TestTickSchedulerAsync(unittest.TestCase):
+    """wait_next_async keeps the same grid without blocking a thread."""
+
+    def test_async_ticks_on_grid(self):
+        ticks = TickScheduler(0.02)
+
+        async def run():
+            started = []
+            loop = asyncio.get_running_loop()
+            while len(started) < 3 and await ticks.wait_next_async():
+                started.append(loop.time())
+            return started
+
+        started = asyncio.run(run())
+        self.assertEqual(ticks.stats['ticks'], 3)
+        self.assertGreaterEqual(started[2] - started[0], 0.035)
+        self.assertLess(ticks.stats['max_jitter_s'], 0.02)
+
+    def test_async_stop(self):
+        stop = threading.Event()
+        ticks = TickScheduler(0.05, stop_event=stop)
+
+        async def run():
+            self.assertTrue(await ticks.wait_next_async())
+            asyncio.get_running_loop().call_later(0.01, stop.set)
+            return await ticks.wait_next_async()
+
+        self.assertFalse(asyncio.run(run()))
+        self.assertEqual(ticks.stats['ticks'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,12 @@
 
 from __future__ import annotations
 
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
 import unittest
 from collections import deque
 from unittest.mock import patch, MagicMock
@@ -12,7 +18,7 @@ from storm_sense.config import (
     SESSION_LOG_MAX,
     StormLevel,
 )
-from storm_sense.sensor_service import SensorService, CPU_TEMP_PATH
+from storm_sense.sensor_service import SNAPSHOT_INTERVAL_S, SensorService, CPU_TEMP_PATH
 
 
 def _make_service_with_mock_rh(
@@ -343,6 +349,180 @@ class TestGetHistory(unittest.TestCase):
             self.assertIsInstance(entry['pressure'], float)
             self.assertIsInstance(entry['storm_level'], int)
 
+    def test_session_log_fallback_since_and_limit(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+        svc._store.close()
+
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0), \
+             patch('storm_sense.sensor_service.time') as mock_time:
+            for i in range(10):
+                mock_time.time.return_value = 1700000000.0 + i * 5
+                svc.read()
+
+        self.assertEqual(len(svc.get_history()), 10)
+        self.assertEqual(
+            [r['timestamp'] for r in svc.get_history(limit=2)],
+            [1700000040.0, 1700000045.0],
+        )
+        recent = svc.get_history(since=1700000030.0)
+        self.assertEqual([r['timestamp'] for r in recent], [1700000035.0, 1700000040.0, 1700000045.0])
+        self.assertEqual(len(svc.get_history(since=1700000030.0, limit=1)), 1)
+        self.assertEqual(svc.get_history(since=1800000000.0), [])
+
+
+class TestGetHistoryAfterId(unittest.TestCase):
+    """get_history_after_id() returns cursor pages from SQLite."""
+
+    def test_pages_and_cursor(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            for _ in range(3):
+                svc.read()
+
+        page = svc.get_history_after_id(0, limit=2)
+        self.assertEqual([r['id'] for r in page['readings']], [1, 2])
+        self.assertEqual(page['next_after_id'], 2)
+        self.assertTrue(page['has_more'])
+
+        page = svc.get_history_after_id(page['next_after_id'], limit=2)
+        self.assertEqual([r['id'] for r in page['readings']], [3])
+        self.assertFalse(page['has_more'])
+
+        page = svc.get_history_after_id(3)
+        self.assertEqual(page, {'readings': [], 'next_after_id': 3, 'has_more': False})
+
+    def test_none_when_store_unavailable(self):
+        svc, _ = _make_service_with_mock_rh()
+        svc._store.close()
+        self.assertIsNone(svc.get_history_after_id(0))
+
+
+class TestGetHistoryBuckets(unittest.TestCase):
+    """get_history_buckets() aggregates per time bucket."""
+
+    def test_buckets_from_store(self):
+        svc, mock_rh = _make_service_with_mock_rh(pressure=1013.0)
+
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            for _ in range(3):
+                svc.read()
+
+        rows = svc.get_history_buckets(3600)
+        self.assertEqual(sum(r['count'] for r in rows), 3)
+        self.assertAlmostEqual(rows[-1]['pressure_max'], 1013.0)
+
+    def test_buckets_from_session_log_when_store_unavailable(self):
+        svc, mock_rh = _make_service_with_mock_rh(pressure=1013.0)
+        svc._store.close()
+
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            mock_rh.weather.pressure.return_value = 1010.0
+            svc.read()
+            mock_rh.weather.pressure.return_value = 1012.0
+            svc.read()
+
+        rows = svc.get_history_buckets(86400)
+        self.assertEqual(sum(r['count'] for r in rows), 2)
+        self.assertAlmostEqual(min(r['pressure_min'] for r in rows), 1010.0)
+
+
+class TestGetHistoryFrame(unittest.TestCase):
+    """get_history_frame() selects the same rows as the dict queries."""
+
+    def setUp(self):
+        # Recent enough that pruning never drops a flushed reading mid-test
+        self.start = float(int(time.time()) // 10 * 10 - 600)
+
+    def _read(self, svc, mock_rh, n):
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0), \
+             patch('storm_sense.sensor_service.time') as mock_time:
+            for i in range(n):
+                mock_time.time.return_value = self.start + i * 5
+                svc.read()
+
+    def test_matches_dict_queries_from_store(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+        self._read(svc, mock_rh, 6)
+
+        self.assertEqual(svc.get_history_frame(limit=3).dicts(), svc.get_history(limit=3))
+        self.assertEqual(
+            svc.get_history_frame(since=self.start + 10).dicts(),
+            svc.get_history(since=self.start + 10),
+        )
+        self.assertEqual(
+            svc.get_history_frame(bucket_s=10).dicts(), svc.get_history_buckets(10),
+        )
+        self.assertEqual(
+            svc.get_history_frame(limit=3, lttb_field='pressure').dicts(),
+            svc.get_history_lttb(limit=3),
+        )
+
+    def test_session_log_fallback(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+        svc._store.close()
+        self._read(svc, mock_rh, 6)
+
+        frame = svc.get_history_frame(limit=2)
+        self.assertEqual(
+            frame.to_columns()['timestamp'], [self.start + 20, self.start + 25],
+        )
+        self.assertEqual(frame.dicts(), svc.get_history(limit=2))
+        self.assertEqual(
+            svc.get_history_frame(bucket_s=10).dicts(), svc.get_history_buckets(10),
+        )
+        self.assertEqual(
+            svc.get_history_frame(limit=3, lttb_field='pressure').dicts(),
+            svc.get_history_lttb(limit=3),
+        )
+
+
+class TestHistoryFields(unittest.TestCase):
+    """fields= projects history rows, from SQLite and the session log."""
+
+    def setUp(self):
+        self.start = float(int(time.time()) // 10 * 10 - 600)
+
+    def _read(self, svc, mock_rh, n):
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0), \
+             patch('storm_sense.sensor_service.time') as mock_time:
+            for i in range(n):
+                mock_time.time.return_value = self.start + i * 5
+                svc.read()
+
+    def _check(self, svc):
+        rows = svc.get_history(fields=['pressure'])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(set(rows[0]), {'timestamp', 'pressure'})
+        buckets = svc.get_history_buckets(60, fields=['pressure'])
+        self.assertEqual(
+            set(buckets[0]),
+            {'timestamp', 'pressure', 'pressure_min', 'pressure_max', 'count'},
+        )
+        lttb = svc.get_history_lttb(limit=2, fields=['storm_level'])
+        self.assertEqual(set(lttb[0]), {'timestamp', 'storm_level'})
+        frame = svc.get_history_frame(bucket_s=60, fields=['pressure'])
+        self.assertEqual(frame.dicts(), buckets)
+
+    def test_from_store(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+        self._read(svc, mock_rh, 4)
+        self._check(svc)
+        page = svc.get_history_after_id(0, fields=['pressure'])
+        self.assertEqual(set(page['readings'][0]), {'id', 'timestamp', 'pressure'})
+
+    def test_from_session_log(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+        svc._store.close()
+        self._read(svc, mock_rh, 4)
+        self._check(svc)
+
 
 class TestResetHistory(unittest.TestCase):
     """reset_history() clears everything and resets storm state."""
@@ -399,5 +579,393 @@ class TestCpuTempFallback(unittest.TestCase):
         self.assertAlmostEqual(result, 52.0)
 
 
+
+
+class TestDataVersion(unittest.TestCase):
+    """data_version / last_modified track every visible state change."""
+
+    def test_read_bumps_version(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+        before = svc.data_version
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc.read()
+        self.assertGreater(svc.data_version, before)
+        self.assertEqual(svc.last_modified, svc.get_history()[-1]['timestamp'])
+
+    def test_display_mode_and_reset_bump_version(self):
+        svc, _ = _make_service_with_mock_rh()
+        version = svc.data_version
+        svc.display_mode = DisplayMode.PRESSURE
+        self.assertEqual(svc.display_mode, DisplayMode.PRESSURE)
+        self.assertGreater(svc.data_version, version)
+        version = svc.data_version
+        svc.reset_history()
+        self.assertGreater(svc.data_version, version)
+
+    def test_display_mode_keeps_history_version(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+        history_version = svc.history_version
+        svc.display_mode = DisplayMode.PRESSURE
+        self.assertEqual(svc.history_version, history_version)
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc.read()
+        self.assertEqual(svc.history_version, history_version + 1)
+        svc.reset_history()
+        self.assertEqual(svc.history_version, history_version + 2)
+
+
+class TestStatusPayload(unittest.TestCase):
+    """status_payload is re-encoded once per state change."""
+
+    def test_read_publishes_payload(self):
+        svc, mock_rh = _make_service_with_mock_rh(pressure=1001.5)
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc.read()
+
+        payload = svc._status_payload
+        self.assertIsNotNone(payload)
+        self.assertEqual(payload.version, svc.data_version)
+        self.assertEqual(json.loads(payload.body), svc.get_status())
+        self.assertIs(svc.status_payload, payload)
+
+    def test_display_mode_change_republishes(self):
+        svc, _ = _make_service_with_mock_rh()
+        before = svc.status_payload
+        svc.display_mode = DisplayMode.PRESSURE
+        after = svc.status_payload
+        self.assertGreater(after.version, before.version)
+        self.assertEqual(json.loads(after.body)['display_mode'], 'PRESSURE')
+
+
+class TestReadingListeners(unittest.TestCase):
+    """Listeners see every reading together with the previous storm level."""
+
+    def test_listener_called_after_read(self):
+        svc, mock_rh = _make_service_with_mock_rh(pressure=1013.0)
+        calls = []
+        svc.add_listener(lambda reading, level: calls.append((reading, level)))
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc.read()
+        self.assertEqual(len(calls), 1)
+        reading, level = calls[0]
+        self.assertEqual(reading['pressure'], 1013.0)
+        self.assertEqual(level, StormLevel.FAIR)
+
+    def test_failing_listener_does_not_break_read(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+        svc.add_listener(MagicMock(side_effect=RuntimeError('boom')))
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc.read()
+        self.assertEqual(len(svc._session_log), 1)
+
+    def test_get_session_log(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0), \
+             patch('storm_sense.sensor_service.time') as mock_time:
+            for i in range(4):
+                mock_time.time.return_value = 1700000000.0 + i * 5
+                svc.read()
+        rows = svc.get_session_log(1700000005.0)
+        self.assertEqual([r['timestamp'] for r in rows], [1700000010.0, 1700000015.0])
+        rows = svc.get_session_log(1700000005.0, inclusive=True)
+        self.assertEqual(len(rows), 3)
+
+
+class TestSensorState(unittest.TestCase):
+    """Each change publishes a new frozen SensorState."""
+
+    def test_state_is_frozen(self):
+        svc, _ = _make_service_with_mock_rh()
+        with self.assertRaises(AttributeError):
+            svc.state.pressure = 1000.0
+
+    def test_read_swaps_in_new_state(self):
+        svc, mock_rh = _make_service_with_mock_rh(pressure=1005.0)
+        before = svc.state
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc.read()
+        after = svc.state
+        self.assertIsNot(after, before)
+        self.assertEqual(before.pressure, 0.0)
+        self.assertEqual(after.pressure, 1005.0)
+        self.assertEqual(after.version, svc.data_version)
+        self.assertEqual(after.samples_collected, 1)
+        self.assertEqual(svc.get_status(), after.to_status())
+
+    def test_reset_keeps_display_mode(self):
+        svc, _ = _make_service_with_mock_rh()
+        svc.display_mode = DisplayMode.PRESSURE
+        svc.reset_history()
+        self.assertEqual(svc.state.display_mode, DisplayMode.PRESSURE)
+        self.assertEqual(svc.state.samples_collected, 0)
+
+    def test_concurrent_readers_never_see_torn_state(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+        mock_rh.weather.temperature.side_effect = lambda: 20.0 + time.perf_counter() % 5
+        mock_rh.weather.pressure.side_effect = lambda: 1000.0 + time.perf_counter() % 20
+        done = threading.Event()
+        torn = []
+
+        def reader():
+            while not done.is_set():
+                status = svc.get_status()
+                expected_f = status['temperature'] * 9.0 / 5.0 + 32.0
+                if abs(status['temperature_f'] - expected_f) > 1e-9:
+                    torn.append(status)
+                if (status['pressure_delta_3h'] is None) != (status['samples_collected'] < 2):
+                    torn.append(status)
+
+        threads = [threading.Thread(target=reader) for _ in range(2)]
+        for t in threads:
+            t.start()
+        try:
+            with patch('storm_sense.sensor_service.rh', mock_rh), \
+                 patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+                for i in range(300):
+                    svc.read()
+                    if i % 50 == 49:
+                        svc.reset_history()
+        finally:
+            done.set()
+            for t in threads:
+                t.join()
+        self.assertEqual(torn, [])
+
+
+class TestOversampling(unittest.TestCase):
+    """sample() collects sub-samples; read() stores one reduced reading."""
+
+    def test_window_reduced_to_one_reading(self):
+        mock_rh = MagicMock()
+        mock_rh.weather.temperature.return_value = 25.0
+        mock_rh.weather.pressure.side_effect = [1013.0, 1013.2, 1013.1, 1013.3, 1080.0]
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc = SensorService(db_path=':memory:', oversample=5)
+            full = [svc.sample() for _ in range(5)]
+            svc.read()
+        self.assertEqual(full, [False, False, False, False, True])
+        # The 1080 hPa spike is rejected; the rest are averaged
+        self.assertAlmostEqual(svc.pressure, 1013.15)
+        self.assertEqual(len(svc._session_log), 1)
+        self.assertEqual(svc._store.count(), 1)
+
+    def test_quantized_samples_not_counted_as_outliers(self):
+        from storm_sense.sensor_service import _OUTLIERS
+        mock_rh = MagicMock()
+        mock_rh.weather.temperature.return_value = 25.0
+        mock_rh.weather.pressure.side_effect = [1013.25, 1013.25, 1013.28, 1013.25, 1013.25]
+        before = _OUTLIERS.value()
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc = SensorService(db_path=':memory:', oversample=5)
+            while not svc.sample():
+                pass
+            svc.read()
+        self.assertEqual(_OUTLIERS.value(), before)
+        self.assertAlmostEqual(svc.pressure, 1013.256)
+
+    def test_median_reducer(self):
+        mock_rh = MagicMock()
+        mock_rh.weather.temperature.return_value = 25.0
+        mock_rh.weather.pressure.side_effect = [1013.0, 1020.0, 1012.0]
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc = SensorService(db_path=':memory:', oversample=3, reducer='median')
+            while not svc.sample():
+                pass
+            svc.read()
+        self.assertEqual(svc.pressure, 1013.0)
+
+    def test_failed_sub_sample_stores_no_channel(self):
+        mock_rh = MagicMock()
+        mock_rh.weather.temperature.return_value = 25.0
+        mock_rh.weather.pressure.side_effect = [1013.0, OSError('i2c'), 1013.2, 1013.4]
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc = SensorService(db_path=':memory:', oversample=3)
+            svc.sample()
+            with self.assertRaises(OSError):
+                svc.sample()
+            self.assertEqual([len(window) for window in svc._windows], [1, 1, 1])
+            svc.sample()
+            self.assertTrue(svc.sample())
+            svc.read()
+        self.assertAlmostEqual(svc.pressure, 1013.2)
+
+    def test_read_without_sub_samples_reads_directly(self):
+        svc, mock_rh = _make_service_with_mock_rh(pressure=1009.0)
+        self.assertEqual(svc.oversample, 1)
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc.read()
+            svc.read()
+        self.assertEqual(mock_rh.weather.pressure.call_count, 2)
+        self.assertEqual(svc.pressure, 1009.0)
+
+
+class TestReadMetrics(unittest.TestCase):
+    """read() records a duration per phase; buffer sizes are exposed."""
+
+    def test_each_phase_observed(self):
+        from storm_sense.sensor_service import _READ_SECONDS
+        phases = (
+            'sensor', 'reduce', 'calibration', 'db_write', 'publish',
+            'snapshot_prune', 'listeners', 'total',
+        )
+        before = {phase: _READ_SECONDS.count(phase) for phase in phases}
+        svc, mock_rh = _make_service_with_mock_rh()
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc.read()
+        for phase in phases:
+            self.assertEqual(_READ_SECONDS.count(phase), before[phase] + 1, phase)
+
+    def test_oversampled_read_not_timed_as_sensor_io(self):
+        from storm_sense.sensor_service import _READ_SECONDS, _SUBSAMPLE_SECONDS
+        mock_rh = MagicMock()
+        mock_rh.weather.temperature.return_value = 25.0
+        mock_rh.weather.pressure.return_value = 1013.0
+        before = (
+            _READ_SECONDS.count('sensor'),
+            _READ_SECONDS.count('reduce'),
+            _SUBSAMPLE_SECONDS.count(),
+        )
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc = SensorService(db_path=':memory:', oversample=4)
+            while not svc.sample():
+                pass
+            svc.read()
+        self.assertEqual(_READ_SECONDS.count('sensor'), before[0])
+        self.assertEqual(_READ_SECONDS.count('reduce'), before[1] + 1)
+        self.assertEqual(_SUBSAMPLE_SECONDS.count(), before[2] + 4)
+
+    def test_buffer_sizes(self):
+        svc, mock_rh = _make_service_with_mock_rh()
+        with patch('storm_sense.sensor_service.rh', mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=45.0):
+            svc.read()
+            svc.read()
+        self.assertEqual(svc.buffer_sizes, {
+            'pressure_history': 2,
+            'session_log': 2,
+            'history_pending': svc._store.pending_count,
+        })
+
+
+class TestWarmStart(unittest.TestCase):
+    """State is restored from the snapshot instead of a full SQLite reseed."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.dir, 'history.db')
+        self.mock_rh = MagicMock()
+        self.mock_rh.weather.temperature.return_value = 28.0
+        self.mock_rh.weather.pressure.return_value = 1010.0
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _service(self) -> SensorService:
+        with patch('storm_sense.sensor_service.rh', self.mock_rh):
+            return SensorService(db_path=self.db_path)
+
+    def _read(self, svc: SensorService, n: int) -> None:
+        with patch('storm_sense.sensor_service.rh', self.mock_rh), \
+             patch('storm_sense.sensor_service.SensorService._read_cpu_temp', return_value=52.0):
+            for _ in range(n):
+                svc.read()
+
+    def test_restores_state_from_snapshot(self):
+        svc = self._service()
+        self._read(svc, 5)
+        status = svc.get_status()
+        cpu_ema = svc._cpu_temp_ema
+        svc.close()
+        self.assertTrue(os.path.exists(self.db_path[:-3] + '.snapshot'))
+
+        with patch.object(SensorService, '_seed_from_store') as seed:
+            restored = self._service()
+        seed.assert_not_called()
+        self.assertEqual(restored._cpu_temp_ema, cpu_ema)
+        self.assertEqual(len(restored._session_log), 5)
+        self.assertEqual(len(restored._pressure_history), 5)
+        self.assertEqual(restored.get_status(), status)
+        restored.close()
+
+    def test_tops_up_readings_newer_than_snapshot(self):
+        svc = self._service()
+        self._read(svc, 3)
+        svc.save_snapshot()
+        self._read(svc, 2)
+        svc.flush()  # crash: no clean close, no final snapshot
+        svc._store.close()
+
+        restored = self._service()
+        self.assertEqual(len(restored._session_log), 5)
+        timestamps = restored._session_log.view().column('timestamp')
+        self.assertEqual(timestamps, sorted(timestamps))
+        restored.close()
+
+    def test_stale_snapshot_falls_back_to_sqlite(self):
+        svc = self._service()
+        self._read(svc, 4)
+        svc.close()
+
+        with patch('storm_sense.sensor_service.SNAPSHOT_MAX_AGE_S', -1):
+            restored = self._service()
+        self.assertEqual(len(restored._session_log), 4)
+        self.assertIsNone(restored._cpu_temp_ema)
+        restored.close()
+
+    def test_reset_removes_snapshot(self):
+        svc = self._service()
+        self._read(svc, 2)
+        svc.save_snapshot()
+        svc.reset_history()
+        self.assertFalse(os.path.exists(self.db_path[:-3] + '.snapshot'))
+        svc._store.close()
+
+    def test_periodic_snapshot_written_off_the_sensor_thread(self):
+        svc = self._service()
+        writing = threading.Event()
+        release = threading.Event()
+
+        def slow_write(path, data):
+            writing.set()
+            release.wait(5)
+
+        svc._last_snapshot -= SNAPSHOT_INTERVAL_S
+        with patch('storm_sense.sensor_service.write_snapshot', side_effect=slow_write):
+            self._read(svc, 1)  # returns while the write is still blocked
+            self.assertTrue(writing.wait(5))
+            self.assertTrue(svc._snapshot_thread.is_alive())
+            release.set()
+            svc._snapshot_thread.join(5)
+        svc.close()
+
+    def test_reset_waits_for_background_snapshot(self):
+        svc = self._service()
+        self._read(svc, 2)
+        svc.save_snapshot(block=False)
+        svc.reset_history()
+        # The background write finished before the file was removed
+        self.assertFalse(svc._snapshot_thread.is_alive())
+        self.assertFalse(os.path.exists(self.db_path[:-3] + '.snapshot'))
+        svc._store.close()
+
+    def test_memory_database_has_no_snapshot(self):
+        svc, _ = _make_service_with_mock_rh()
+        self.assertIsNone(svc._snapshot_path)
+
+
 if __name__ == '__main__':
     unittest.main()
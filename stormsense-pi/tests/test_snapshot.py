@@ -0,0 +1,79 @@
+"""Tests for snapshot — binary dump of in-memory sensor state."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from storm_sense.ring_buffer import ColumnarRing
+from storm_sense.snapshot import load_snapshot, save_snapshot
+
+FIELDS = (('timestamp', 'd'), ('pressure', 'd'), ('storm_level', 'b'))
+
+
+def _rings(rows: int = 0) -> tuple[ColumnarRing, ColumnarRing]:
+    log = ColumnarRing(FIELDS, 100)
+    window = ColumnarRing((('timestamp', 'd'), ('pressure', 'd')), 10)
+    for i in range(rows):
+        log.append((1700000000.0 + i * 5, 1013.0 - i * 0.1, i % 5))
+        window.append((1700000000.0 + i * 5, 1013.0 - i * 0.1))
+    return log, window
+
+
+class TestSnapshot(unittest.TestCase):
+    """Snapshots round-trip exactly and refuse anything unusable."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'state.snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_round_trip(self):
+        saved = _rings(150)
+        save_snapshot(self.path, saved, (44.5, None))
+        loaded = _rings()
+        written_at, values = load_snapshot(self.path, loaded, 2, 60)
+        self.assertAlmostEqual(written_at, time.time(), delta=5)
+        self.assertEqual(values, [44.5, None])
+        for before, after in zip(saved, loaded):
+            self.assertEqual(after.view().tuples(), before.view().tuples())
+        self.assertEqual(len(loaded[0]), 100)
+        self.assertEqual(len(loaded[1]), 10)
+
+    def test_missing_file(self):
+        self.assertIsNone(load_snapshot(self.path, _rings(), 2, 60))
+
+    def test_stale_snapshot_ignored(self):
+        save_snapshot(self.path, _rings(5), (1.0, 2.0))
+        loaded = _rings(3)
+        with patch('storm_sense.snapshot.time.time', return_value=time.time() + 120):
+            self.assertIsNone(load_snapshot(self.path, loaded, 2, 60))
+        self.assertEqual(len(loaded[0]), 3)
+
+    def test_layout_mismatch_ignored(self):
+        save_snapshot(self.path, _rings(5), (1.0, 2.0))
+        self.assertIsNone(load_snapshot(self.path, _rings(), 3, 60))
+        other = (ColumnarRing((('timestamp', 'd'),), 10), _rings()[1])
+        self.assertIsNone(load_snapshot(self.path, other, 2, 60))
+
+    def test_truncated_snapshot_ignored(self):
+        save_snapshot(self.path, _rings(50), (1.0, 2.0))
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 7)
+        loaded = _rings()
+        self.assertIsNone(load_snapshot(self.path, loaded, 2, 60))
+        self.assertEqual(len(loaded[0]), 0)
+
+    def test_write_is_atomic(self):
+        save_snapshot(self.path, _rings(5), (1.0, 2.0))
+        self.assertEqual(os.listdir(self.dir), ['state.snapshot'])
+
+
+if __name__ == '__main__':
+    unittest.main()
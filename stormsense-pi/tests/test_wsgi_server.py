@@ -0,0 +1,163 @@
+"""Tests for PooledWSGIServer — bounded worker pool serving."""
+
+import http.client
+import threading
+import time
+import unittest
+
+from storm_sense.wsgi_server import PooledWSGIServer
+
+
+class _SlowApp:
+    """WSGI app that records concurrency; /slow blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __call__(self, environ, start_response):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if environ['PATH_INFO'] == '/slow':
+                self.release.wait(5)
+            body = b'ok'
+            start_response('200 OK', [
+                ('Content-Type', 'text/plain'),
+                ('Content-Length', str(len(body))),
+            ])
+            return [body]
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class _CountingServer(PooledWSGIServer):
+    """Counts connections taken off the listen backlog."""
+
+    accepted = 0
+
+    def get_request(self):
+        request = super().get_request()
+        self.accepted += 1
+        return request
+
+
+class TestPooledWSGIServer(unittest.TestCase):
+    """Requests are served by at most ``threads`` workers at once."""
+
+    def setUp(self):
+        self.app = _SlowApp()
+        self.server = _CountingServer(
+            '127.0.0.1', 0, self.app, threads=2, backlog=8, keepalive_s=2.0,
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.app.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(timeout=5)
+
+    def _get(self, path, results, server=None):
+        port = (server or self.server).server_port
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        try:
+            conn.request('GET', path)
+            results.append(conn.getresponse().status)
+        finally:
+            conn.close()
+
+    def test_concurrency_bounded_by_pool(self):
+        results = []
+        clients = [
+            threading.Thread(target=self._get, args=('/slow', results))
+            for _ in range(5)
+        ]
+        for client in clients:
+            client.start()
+        time.sleep(0.3)
+        self.assertEqual(self.app.active, 2)
+        self.app.release.set()
+        for client in clients:
+            client.join(timeout=5)
+
+        self.assertEqual(results, [200] * 5)
+        self.assertEqual(self.app.peak, 2)
+
+    def test_full_pool_leaves_connections_in_backlog(self):
+        results = []
+        clients = [
+            threading.Thread(target=self._get, args=('/slow', results))
+            for _ in range(3)
+        ]
+        for client in clients:
+            client.start()
+        time.sleep(0.3)
+        # Both workers are busy, so the third connection is not accepted
+        self.assertEqual(self.server.accepted, 2)
+        self.app.release.set()
+        for client in clients:
+            client.join(timeout=5)
+        self.assertEqual(results, [200] * 3)
+        self.assertEqual(self.server.accepted, 3)
+
+    def test_shutdown_while_pool_full(self):
+        results = []
+        clients = [
+            threading.Thread(target=self._get, args=('/slow', results))
+            for _ in range(3)
+        ]
+        for client in clients:
+            client.start()
+        time.sleep(0.3)
+        started = time.monotonic()
+        # Returns without waiting for a worker to come free
+        self.server.shutdown()
+        self.assertLess(time.monotonic() - started, 2.0)
+        self.thread.join(timeout=2)
+        self.assertFalse(self.thread.is_alive())
+        self.app.release.set()
+        for client in clients:
+            client.join(timeout=5)
+
+    def test_keep_alive_reuses_connection(self):
+        conn = http.client.HTTPConnection('127.0.0.1', self.server.server_port, timeout=5)
+        try:
+            conn.request('GET', '/')
+            first = conn.getresponse()
+            first.read()
+            sock = conn.sock
+            conn.request('GET', '/')
+            second = conn.getresponse()
+            second.read()
+            self.assertEqual((first.status, second.status), (200, 200))
+            self.assertIs(conn.sock, sock)
+        finally:
+            conn.close()
+
+    def test_idle_connection_closed_after_keepalive(self):
+        server = PooledWSGIServer('127.0.0.1', 0, self.app, threads=1, keepalive_s=0.2)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            idle = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=5)
+            idle.request('GET', '/')
+            idle.getresponse().read()
+            # The only worker is free again once the idle connection times out
+            results = []
+            self._get('/', results, server)
+            self.assertEqual(results, [200])
+            idle.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join(timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()